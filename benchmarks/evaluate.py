@@ -0,0 +1,503 @@
+"""
+Accuracy and latency evaluation for endtrace.
+
+Generates synthetic ground truth with a fixed seed: strongholds from the
+game's own placement (see utils.seed), and throws made a set distance from
+each stronghold, spread over a set angle around it, aimed with a little
+noise and rounded to the precision the angles are read off at. Every solver
+mode predicts all of them in bulk, and the error (in blocks) of each mode is
+reported as percentiles alongside its throughput, as JSON and optionally as
+a plot. Each factor is swept on its own around a baseline scenario, and a
+previous run can be passed with --compare to flag regressions in speed or
+accuracy.
+
+Usage:
+    python benchmarks/evaluate.py
+    python benchmarks/evaluate.py --cases 5000 --plot evaluation.png
+    python benchmarks/evaluate.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.suite import _result, compare
+
+# the scenario every sweep varies one factor of: throws 1500 blocks from the
+# stronghold, 10 degrees apart (as seen from it) and read off the f3 screen
+BASELINE = {"distance": 1500.0, "separation": 10.0, "angle_step": 0.1}
+
+SWEEPS = {
+    "distance": (250.0, 500.0, 1000.0, 2000.0, 4000.0, 8000.0),
+    "separation": (1.0, 2.0, 5.0, 10.0, 20.0, 45.0),
+    "angle_step": (0.01, 0.05, 0.1, 0.2, 0.5)
+}
+
+# the aiming error of a careful player (in degrees), on top of the rounding
+AIM_STD = 0.03
+
+PERCENTILES = (50, 90, 99)
+
+_AXIS_LABELS = {
+    "distance": "distance (blocks)",
+    "separation": "separation (degrees)",
+    "angle_step": "angle step (degrees)"
+}
+
+
+class Scenario(NamedTuple):
+    """
+    The geometry and precision of one set of throws.
+
+    Attributes:
+        distance (float): About how far each throw is from the stronghold
+            (in blocks).
+        separation (float): About the angle between the first and last
+            throw as seen from the stronghold (in degrees).
+        angle_step (float): The precision angles are rounded to (in
+            degrees, 0 for none).
+    """
+    distance: float
+    separation: float
+    angle_step: float
+
+
+class Dataset(NamedTuple):
+    """
+    Synthetic throws at known strongholds.
+
+    Attributes:
+        true_x (np.ndarray): X-coords of the strongholds, one per case.
+        true_z (np.ndarray): Z-coords of the strongholds.
+        x (np.ndarray): X-coords of the throws, cases x throws.
+        z (np.ndarray): Z-coords of the throws.
+        theta (np.ndarray): Minecraft angles of the throws (in degrees).
+    """
+    true_x: np.ndarray
+    true_z: np.ndarray
+    x: np.ndarray
+    z: np.ndarray
+    theta: np.ndarray
+
+
+def _jitter(rng: np.random.Generator, shape: tuple) -> np.ndarray:
+    """Random factors between 0.9 and 1.1."""
+    return rng.uniform(0.9, 1.1, shape)
+
+
+def make_dataset(
+    scenario: Scenario,
+    cases: int,
+    rng: np.random.Generator,
+    aim_std: float = AIM_STD,
+    throws: int = 3
+) -> Dataset:
+    """
+    Generates throws at strongholds picked from random seeds' placements.
+    Each case's throws start from a random bearing and are spread over
+    about the scenario's separation, at about the scenario's distance.
+
+    Args:
+        scenario (Scenario): The geometry and precision of the throws.
+        cases (int): The number of strongholds.
+        rng (np.random.Generator): The source of randomness.
+        aim_std (float): The standard deviation of the aiming error (in
+            degrees).
+        throws (int): The number of throws per stronghold (at least 2).
+
+    Returns:
+        Dataset: The strongholds and their throws.
+    """
+    from utils.batch import transform_cartesian_rads_to_minecraft_angles
+    from utils.rings import CELL_OFFSET, CHUNK, STRONGHOLD_COUNT
+    from utils.seed import seed_strongholds
+
+    seeds = rng.integers(-2**63, 2**63, cases, dtype=np.int64)
+    table = seed_strongholds(seeds)
+    index = rng.integers(0, STRONGHOLD_COUNT, cases)
+    rows = np.arange(cases)
+    true_x = table.chunk_x[rows, index]*CHUNK + CELL_OFFSET
+    true_z = table.chunk_z[rows, index]*CHUNK + CELL_OFFSET
+
+    # bearing of each throw from the stronghold, walking either way round.
+    # separations and distances vary by up to 10%, as exact multiples of the
+    # angle step would make the throws' rounding errors cancel out
+    spread = np.sort(rng.uniform(0.0, 1.0, (cases, throws)), axis=1)
+    spread[:, 0], spread[:, -1] = 0.0, 1.0
+    spread *= math.radians(scenario.separation)*_jitter(rng, (cases, 1))
+    sign = rng.choice((-1.0, 1.0), (cases, 1))
+    bearing = rng.uniform(-math.pi, math.pi, (cases, 1)) + sign*spread
+    distance = scenario.distance*_jitter(rng, (cases, throws))
+    x = true_x[:, None] + distance*np.cos(bearing)
+    z = true_z[:, None] + distance*np.sin(bearing)
+
+    theta = transform_cartesian_rads_to_minecraft_angles(
+        np.arctan2(true_z[:, None] - z, true_x[:, None] - x)
+    ).reshape(x.shape)
+    theta = (theta + rng.normal(0.0, aim_std, theta.shape) + 180) % 360 - 180
+    if scenario.angle_step:
+        # the second rounding snaps e.g. 109.90000000000001 to 109.9
+        step = scenario.angle_step
+        theta = np.round(np.round(theta/step)*step, 6)
+
+    return Dataset(true_x, true_z, x, z, theta)
+
+
+def _solve_scalar(data: Dataset) -> tuple[np.ndarray, np.ndarray]:
+    """solve_stronghold on the first and last throw, one case at a time."""
+    from endtrace import solve_stronghold
+    from utils.validators import AngleError
+
+    pred_x = np.full(len(data.true_x), np.nan)
+    pred_z = np.full(len(data.true_x), np.nan)
+    rows = zip(
+        data.x[:, 0].tolist(), data.z[:, 0].tolist(),
+        data.theta[:, 0].tolist(), data.x[:, -1].tolist(),
+        data.z[:, -1].tolist(), data.theta[:, -1].tolist()
+    )
+    for i, row in enumerate(rows):
+        try:
+            prediction = solve_stronghold(*row)
+        except AngleError:
+            continue
+        pred_x[i], pred_z[i] = prediction.x, prediction.z
+    return pred_x, pred_z
+
+
+def _solve_batch(data: Dataset) -> tuple[np.ndarray, np.ndarray]:
+    """predict_strongholds on the first and last throw of every case."""
+    from utils.batch import predict_strongholds
+
+    prediction = predict_strongholds(
+        data.x[:, 0], data.z[:, 0], data.theta[:, 0],
+        data.x[:, -1], data.z[:, -1], data.theta[:, -1]
+    )
+    return prediction.x, prediction.z
+
+
+def _solve_least_squares(data: Dataset) -> tuple[np.ndarray, np.ndarray]:
+    """MultiThrowSolver on every throw, one case at a time."""
+    from utils.multithrow import MultiThrowSolver
+    from utils.validators import AngleError
+
+    pred_x = np.full(len(data.true_x), np.nan)
+    pred_z = np.full(len(data.true_x), np.nan)
+    rows = zip(data.x.tolist(), data.z.tolist(), data.theta.tolist())
+    for i, throws in enumerate(rows):
+        try:
+            prediction = MultiThrowSolver(zip(*throws)).solve()
+        except AngleError:
+            continue
+        pred_x[i], pred_z[i] = prediction.x, prediction.z
+    return pred_x, pred_z
+
+
+def _solve_robust(data: Dataset) -> tuple[np.ndarray, np.ndarray]:
+    """fuse_throws on every throw of every case."""
+    from utils.robust import fuse_throws
+
+    prediction = fuse_throws(data.x, data.z, data.theta)
+    return prediction.x, prediction.z
+
+
+# solver modes and whether they use every throw (or the first and last)
+MODES = {
+    "scalar": (_solve_scalar, False),
+    "batch": (_solve_batch, False),
+    "least_squares": (_solve_least_squares, True),
+    "robust": (_solve_robust, True)
+}
+
+
+def score(
+    data: Dataset, pred_x: np.ndarray, pred_z: np.ndarray
+) -> dict:
+    """
+    Measures how far the predictions are from the strongholds.
+
+    Args:
+        data (Dataset): The strongholds and throws.
+        pred_x (np.ndarray): Predicted x-coords (NaN where failed).
+        pred_z (np.ndarray): Predicted z-coords (NaN where failed).
+
+    Returns:
+        dict: The number of failed cases, the error percentiles and the
+            largest error (in blocks).
+    """
+    errors = np.hypot(pred_x - data.true_x, pred_z - data.true_z)
+    failed = ~np.isfinite(errors)
+    errors = errors[~failed]
+
+    entry = {"failed": int(failed.sum())}
+    for q in PERCENTILES:
+        entry[f"p{q}"] = (
+            round(float(np.percentile(errors, q)), 3) if len(errors)
+            else None
+        )
+    entry["max"] = round(float(errors.max()), 3) if len(errors) else None
+    return entry
+
+
+def evaluate(
+    cases: int = 2000,
+    seed: int = 0,
+    aim_std: float = AIM_STD,
+    throws: int = 3,
+    modes: list[str] | None = None
+) -> dict:
+    """
+    Runs every solver mode on the baseline scenario and on each sweep.
+    Datasets only depend on the seed and the scenario, so the errors of a
+    run are reproducible (the throughputs are not).
+
+    Args:
+        cases (int): The number of strongholds per scenario.
+        seed (int): The seed of the synthetic data.
+        aim_std (float): The standard deviation of the aiming error (in
+            degrees).
+        throws (int): The number of throws per stronghold for the modes
+            that use every throw.
+        modes (list[str] | None): The modes to run (defaults to all).
+
+    Returns:
+        dict: One entry per scenario and mode ("scenarios"), plus each
+            mode's overall throughput and baseline errors ("modes").
+    """
+    modes = modes or list(MODES)
+    sweeps = [("baseline", None, None)]
+    sweeps += [
+        (name, name, value) for name, values in SWEEPS.items()
+        for value in values
+    ]
+
+    scenarios = []
+    totals = {mode: [0, 0.0] for mode in modes}
+    baseline = {}
+    for i, (sweep, factor, value) in enumerate(sweeps):
+        scenario = Scenario(**(
+            BASELINE if factor is None else {**BASELINE, factor: value}
+        ))
+        data = make_dataset(
+            scenario, cases, np.random.default_rng([seed, i]), aim_std, throws
+        )
+
+        for mode in modes:
+            solve, every_throw = MODES[mode]
+            start = time.perf_counter()
+            pred_x, pred_z = solve(data)
+            seconds = time.perf_counter() - start
+
+            entry = {
+                "sweep": sweep,
+                **scenario._asdict(),
+                "mode": mode,
+                "throws": throws if every_throw else 2,
+                "cases": cases,
+                **score(data, pred_x, pred_z),
+                "rows_per_s": round(cases/seconds, 3)
+            }
+            scenarios.append(entry)
+            totals[mode][0] += cases
+            totals[mode][1] += seconds
+            if factor is None:
+                baseline[mode] = entry
+
+    summary = []
+    for mode in modes:
+        rows, seconds = totals[mode]
+        summary.append({
+            "mode": mode,
+            "rows_per_s": round(rows/seconds, 3),
+            **{
+                key: baseline[mode][key]
+                for key in ("failed", *(f"p{q}" for q in PERCENTILES), "max")
+            }
+        })
+
+    return {"scenarios": scenarios, "modes": summary}
+
+
+def results(report: dict) -> list[dict]:
+    """
+    Flattens a report's per-mode summary into benchmark result entries,
+    which benchmarks/suite.py's compare can check against a baseline.
+
+    Args:
+        report (dict): The report from evaluate.
+
+    Returns:
+        list[dict]: Throughput and baseline error entries of every mode.
+    """
+    entries = []
+    for mode in report["modes"]:
+        name = mode["mode"]
+        entries.append(
+            _result(f"{name}_throughput", mode["rows_per_s"], "rows/s", True)
+        )
+        for q in PERCENTILES:
+            if mode[f"p{q}"] is not None:
+                entries.append(
+                    _result(f"{name}_error_p{q}", mode[f"p{q}"], "blocks")
+                )
+    return entries
+
+
+def plot(report: dict, path: str) -> None:
+    """
+    Plots the median and 90th percentile error of every mode against each
+    swept factor, one panel per factor.
+
+    Args:
+        report (dict): The report from evaluate.
+        path (str): The image file (its extension picks the format).
+    """
+    # use the Agg canvas directly, like utils.plotting.GraphRenderer
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(5*len(SWEEPS), 4.5))
+    FigureCanvasAgg(figure)
+    axes = figure.subplots(1, len(SWEEPS), squeeze=False)[0]
+    modes = [mode["mode"] for mode in report["modes"]]
+
+    for ax, factor in zip(axes, SWEEPS):
+        entries = [e for e in report["scenarios"] if e["sweep"] == factor]
+        for i, mode in enumerate(modes):
+            points = [e for e in entries if e["mode"] == mode]
+            values = [e[factor] for e in points]
+            color = f"C{i}"
+            ax.plot(
+                values, [e["p50"] for e in points], "o-", color=color,
+                label=f"{mode} (median)"
+            )
+            ax.plot(
+                values, [e["p90"] for e in points], "s--", color=color,
+                label=f"{mode} (90th percentile)"
+            )
+
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xticks(SWEEPS[factor], [f"{v:g}" for v in SWEEPS[factor]])
+        ax.set_xticks([], minor=True)
+        ax.set_xlabel(_AXIS_LABELS[factor])
+        ax.set_ylabel("error (blocks)")
+        ax.grid(True, which="both", alpha=0.3)
+
+    axes[0].legend(fontsize="small")
+    figure.suptitle("endtrace prediction error")
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="measures the accuracy and speed of endtrace's solvers "
+            "on synthetic throws"
+    )
+    arg_parser.add_argument(
+        "--cases",
+        type=int,
+        default=2000,
+        help="the number of strongholds per scenario (default: 2000)"
+    )
+    arg_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="the seed of the synthetic data (default: 0)"
+    )
+    arg_parser.add_argument(
+        "--aim-std",
+        type=float,
+        default=AIM_STD,
+        metavar="DEGREES",
+        help=f"the standard deviation of the aiming error (default: "
+            f"{AIM_STD})"
+    )
+    arg_parser.add_argument(
+        "--throws",
+        type=int,
+        default=3,
+        help="the throws per stronghold of the modes that use every throw "
+            "(default: 3)"
+    )
+    arg_parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(MODES),
+        help="only run these solver modes"
+    )
+    arg_parser.add_argument(
+        "--plot",
+        metavar="FILE",
+        help="also plot the errors to this image file (needs matplotlib)"
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        help="also write the report to this json file"
+    )
+    arg_parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="a previous report to check for regressions"
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the relative change counted as a regression (default: 0.2)"
+    )
+    args = arg_parser.parse_args()
+    if args.cases < 1:
+        arg_parser.error("--cases must be at least 1")
+    if args.throws < 2:
+        arg_parser.error("--throws must be at least 2")
+
+    report = {
+        "benchmark": "evaluate",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "cases": args.cases,
+        "aim_std": args.aim_std,
+        "baseline": BASELINE,
+        **evaluate(
+            args.cases, args.seed, args.aim_std, args.throws, args.only
+        )
+    }
+    report["results"] = results(report)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        report["comparison"] = compare(
+            report["results"], baseline, args.threshold
+        )
+        regressed = any(entry["regressed"] for entry in report["comparison"])
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if args.plot:
+        plot(report, args.plot)
+
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for endtrace.
+
+Measures how long a fresh interpreter takes to `import endtrace` (using
+`python -X importtime`) and to run a text-only prediction from the command
+line, and reports which heavy modules were loaded along the way. Results are
+printed as JSON so they can be compared between runs.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 --budget-ms 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_ARGS = ["0.586", "0.512", "109.9", "-350.193", "0.226", "115"]
+HEAVY_MODULES = ("matplotlib", "numpy")
+
+
+def _import_time_us() -> tuple[int, list[str]]:
+    """
+    Runs `python -X importtime -c "import endtrace"` in a fresh interpreter.
+
+    Returns:
+        tuple[int, list[str]]: The cumulative import time of endtrace (in
+            microseconds) and the heavy modules that were imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import endtrace"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    endtrace_us = 0
+    heavy = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == "endtrace":
+            endtrace_us = int(cumulative)
+        elif name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+
+    return endtrace_us, sorted(heavy)
+
+
+def _cli_wall_ms() -> float:
+    """
+    Runs a text-only prediction through the command line.
+
+    Returns:
+        float: The wall-clock time of the whole process (in milliseconds).
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "endtrace.py", *CLI_ARGS],
+        cwd=ROOT,
+        capture_output=True,
+        check=True
+    )
+    return (time.perf_counter() - start)*1000
+
+
+def _interpreter_wall_ms() -> float:
+    """
+    Runs an empty interpreter, the floor for any command-line invocation.
+
+    Returns:
+        float: The wall-clock time of the process (in milliseconds).
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start)*1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="measures endtrace's cold-start time"
+    )
+    arg_parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="the number of fresh interpreters to time (default: 10)"
+    )
+    arg_parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="exit with code 1 if the median CLI time exceeds this budget"
+    )
+    args = arg_parser.parse_args()
+
+    import_us, heavy = zip(*(_import_time_us() for _ in range(args.runs)))
+    cli_ms = [_cli_wall_ms() for _ in range(args.runs)]
+    floor_ms = [_interpreter_wall_ms() for _ in range(args.runs)]
+
+    results = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "import_endtrace_us_median": statistics.median(import_us),
+        "cli_text_only_ms_median": round(statistics.median(cli_ms), 3),
+        "interpreter_floor_ms_median": round(statistics.median(floor_ms), 3),
+        "heavy_modules_imported": sorted(set().union(*heavy)),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.budget_ms is not None:
+        if results["cli_text_only_ms_median"] > args.budget_ms:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
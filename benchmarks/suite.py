@@ -0,0 +1,686 @@
+"""
+Benchmark suite for endtrace.
+
+Measures the latency of the scalar prediction paths (with and without the
+prediction cache, profiling or formatting), the validators, the argument
+parser, stronghold session queries and seed snapping, the wall time of the
+command line and the throughput of bulk validation, the batch API, the
+parallel batch runner, binary throw file replays, route planning, robust
+throw fusion and seed table generation, plus headless graph renders per
+second. Results are printed (or written) as JSON, and a previous run can be
+passed with --compare to flag regressions.
+
+Usage:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.2
+    python benchmarks/suite.py --only batch --max-rows 10000000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+THROW = (0.586, 0.512, 109.9, -350.193, 0.226, 115)
+OFF_GRID_THROW = (0.586, 0.512, 109.93, -350.193, 0.226, 115.07)
+CLI_ARGS = [str(value) for value in THROW]
+
+
+def _result(name: str, value: float, unit: str, higher_is_better=False):
+    """
+    Builds one machine-readable result entry.
+
+    Args:
+        name (str): The unique name of the measurement.
+        value (float): The measured value.
+        unit (str): The unit of the value (e.g., "ns/call", "rows/s").
+        higher_is_better (bool): Whether larger values are improvements.
+
+    Returns:
+        dict: The result entry.
+    """
+    return {
+        "name": name,
+        "value": round(value, 3),
+        "unit": unit,
+        "higher_is_better": higher_is_better
+    }
+
+
+def _ns_per_call(func, number: int = 20000, repeat: int = 5) -> float:
+    """
+    Times a zero-argument callable with timeit.
+
+    Returns:
+        float: The best time per call (in nanoseconds).
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best/number*1e9
+
+
+def bench_scalar() -> list[dict]:
+    """Latency of the scalar prediction functions."""
+    from endtrace import (
+        predict_stronghold, solve_stronghold, solve_stronghold_fast
+    )
+
+    sink = io.StringIO()
+
+    def predict():
+        # predict_stronghold always prints, so discard the output cheaply
+        with contextlib.redirect_stdout(sink):
+            predict_stronghold(*THROW)
+        sink.seek(0)
+        sink.truncate()
+
+    return [
+        _result("predict_stronghold", _ns_per_call(predict), "ns/call"),
+        _result(
+            "solve_stronghold",
+            _ns_per_call(lambda: solve_stronghold(*THROW)),
+            "ns/call"
+        ),
+        _result(
+            "solve_stronghold_fast",
+            _ns_per_call(lambda: solve_stronghold_fast(*THROW)),
+            "ns/call"
+        ),
+        # angles off the f3 screen's 0.1 degree grid miss the table
+        _result(
+            "solve_stronghold_fast_untabled",
+            _ns_per_call(lambda: solve_stronghold_fast(*OFF_GRID_THROW)),
+            "ns/call"
+        )
+    ]
+
+
+def bench_cache() -> list[dict]:
+    """Latency of cached predictions and of the angle transform table."""
+    from endtrace import (
+        _compute_cartesian_rads, _transform_minecraft_angle_to_cartesian_rads
+    )
+    from utils.cache import PredictionCache
+
+    cache = PredictionCache()
+    cache.predict(*THROW)
+
+    return [
+        _result(
+            "cache_hit",
+            _ns_per_call(lambda: cache.predict(*THROW)),
+            "ns/call"
+        ),
+        _result(
+            "angle_transform_direct",
+            _ns_per_call(lambda: _compute_cartesian_rads(109.9)),
+            "ns/call"
+        ),
+        _result(
+            "angle_transform_table",
+            _ns_per_call(
+                lambda: _transform_minecraft_angle_to_cartesian_rads(109.9)
+            ),
+            "ns/call"
+        )
+    ]
+
+
+def bench_watch() -> list[dict]:
+    """Latency of handling one new F3+C line in watch mode."""
+    from utils.watch import ThrowTracker, parse_throw
+
+    lines = [
+        "[12:00:02] [Render thread/INFO]: [CHAT] Copied /execute in "
+        f"minecraft:overworld run tp @s {x:.2f} 75.00 0.51 {yaw:.2f} -31.65"
+        for x, yaw in ((0.59, 109.9), (-350.19, 115.0), (-700.0, 119.3))
+    ]
+    tracker = ThrowTracker()
+
+    def new_line():
+        # alternate throws so none is dropped as a repeat
+        tracker.add(parse_throw(lines[len(tracker) % 3]))
+        tracker.predict()
+
+    return [_result("watch_new_line", _ns_per_call(new_line), "ns/call")]
+
+
+def bench_session(strongholds: int = 128) -> list[dict]:
+    """Latency of nearest-stronghold queries and adds in a session."""
+    import math
+    import pickle
+    import random
+    from utils.session import StrongholdSession
+
+    rng = random.Random(0)
+    session = StrongholdSession()
+    while len(session) < strongholds:
+        distance = rng.uniform(1280, 24000)
+        angle = rng.uniform(-math.pi, math.pi)
+        session.add(distance*math.cos(angle), distance*math.sin(angle))
+
+    queries = [
+        (rng.uniform(-24000, 24000), rng.uniform(-24000, 24000))
+        for _ in range(64)
+    ]
+
+    def query():
+        for x, z in queries:
+            session.nearest(x, z)
+
+    data = pickle.dumps(session)
+    return [
+        _result(
+            "session_nearest", _ns_per_call(query, number=200)/len(queries),
+            "ns/call"
+        ),
+        _result(
+            "session_add", _ns_per_call(lambda: session.add(2000, 100)),
+            "ns/call"
+        ),
+        _result(
+            "session_unpickle",
+            _ns_per_call(lambda: pickle.loads(data), number=200),
+            "ns/call"
+        )
+    ]
+
+
+def bench_seed(seeds: int = 10000) -> list[dict]:
+    """Seed tables generated per second and the cost of snapping."""
+    from utils.seed import (
+        generate_strongholds, seed_strongholds, snap_prediction
+    )
+
+    values = list(range(seeds))
+    start = time.perf_counter()
+    seed_strongholds(values)
+    vectorized = seeds/(time.perf_counter() - start)
+
+    # the scalar tables are cached, so generate seeds that are not yet cached
+    generate_strongholds.cache_clear()
+    start = time.perf_counter()
+    for seed in range(200):
+        generate_strongholds(seed)
+    scalar = 200/(time.perf_counter() - start)
+
+    return [
+        _result("seed_tables_vectorized", vectorized, "seeds/s", True),
+        _result("seed_tables_scalar", scalar, "seeds/s", True),
+        _result(
+            "seed_snap", _ns_per_call(lambda: snap_prediction(1900, 800, 0)),
+            "ns/call"
+        )
+    ]
+
+
+def bench_profiling() -> list[dict]:
+    """Overhead of the instrumentation hooks with profiling off and on."""
+    from endtrace import solve_stronghold
+    from utils import profiling
+
+    off = _ns_per_call(lambda: solve_stronghold(*THROW))
+    with profiling.profile():
+        on = _ns_per_call(lambda: solve_stronghold(*THROW))
+
+    return [
+        _result("solve_profiling_off", off, "ns/call"),
+        _result("solve_profiling_on", on, "ns/call")
+    ]
+
+
+def bench_validators() -> list[dict]:
+    """Cost of the exception-based validators on valid and invalid input."""
+    from utils.validators import (
+        AngleError, validate_angles, validate_coords
+    )
+
+    def valid():
+        validate_coords(THROW[0], THROW[1], THROW[3], THROW[4])
+        validate_angles(THROW[2], THROW[5])
+
+    def invalid():
+        try:
+            validate_angles(45, 45)
+        except AngleError:
+            pass
+
+    return [
+        _result("validate_valid_pair", _ns_per_call(valid), "ns/call"),
+        _result("validate_invalid_pair", _ns_per_call(invalid), "ns/call")
+    ]
+
+
+def bench_bulk_validation(rows: int = 10**6) -> list[dict]:
+    """Throughput of vectorized validation with per-row error codes."""
+    import numpy as np
+    from utils.batch import validate_throws
+
+    rng = np.random.default_rng(0)
+    cols = (
+        rng.integers(-1000, 1000, rows).astype(float),
+        rng.integers(-1000, 1000, rows).astype(float),
+        np.round(rng.uniform(-181, 181, rows), 1),
+        rng.integers(-1000, 1000, rows).astype(float),
+        rng.integers(-1000, 1000, rows).astype(float),
+        np.round(rng.uniform(-181, 181, rows), 1)
+    )
+    best = min(timeit.repeat(
+        lambda: validate_throws(*cols).counts(), number=1, repeat=5
+    ))
+    return [_result("bulk_validation", rows/best, "rows/s", True)]
+
+
+def bench_parser() -> list[dict]:
+    """Cost of parsing the six positional floats with argparse."""
+    from utils.parser import parser
+
+    return [
+        _result(
+            "parser_parse_args",
+            _ns_per_call(lambda: parser.parse_args(CLI_ARGS), number=2000),
+            "ns/call"
+        )
+    ]
+
+
+def bench_cli(runs: int = 5) -> list[dict]:
+    """End-to-end wall time of a text-only command-line prediction."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "endtrace.py", *CLI_ARGS],
+            cwd=ROOT,
+            capture_output=True,
+            check=True
+        )
+        times.append((time.perf_counter() - start)*1000)
+
+    return [_result("cli_wall_time", statistics.median(times), "ms")]
+
+
+def bench_batch(max_rows: int = 10**6) -> list[dict]:
+    """Throughput of the vectorized batch API from 10^3 rows upwards."""
+    import numpy as np
+    from utils.batch import predict_strongholds
+
+    results = []
+    rng = np.random.default_rng(0)
+    rows = 10**3
+    while rows <= max_rows:
+        cols = (
+            rng.uniform(-1000, 1000, rows),
+            rng.uniform(-1000, 1000, rows),
+            np.round(rng.uniform(-180, 180, rows), 1),
+            rng.uniform(-1000, 1000, rows),
+            rng.uniform(-1000, 1000, rows),
+            np.round(rng.uniform(-180, 180, rows), 1)
+        )
+        repeat = max(3, min(100, 10**6//rows))
+        best = min(
+            timeit.repeat(lambda: predict_strongholds(*cols), number=1,
+                          repeat=repeat)
+        )
+        results.append(
+            _result(f"batch_{rows}_rows", rows/best, "rows/s", True)
+        )
+        rows *= 10
+
+    return results
+
+
+def bench_parallel(rows: int = 200000) -> list[dict]:
+    """Throughput of the multi-process batch runner on a CSV log."""
+    import random
+    import tempfile
+    from utils.parallel import run_batch
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "throws.csv")
+        with open(path, "w") as f:
+            for _ in range(rows):
+                f.write(
+                    f"{rng.uniform(-1000, 1000):.3f},"
+                    f"{rng.uniform(-1000, 1000):.3f},"
+                    f"{rng.randint(-1800, 1800)/10},"
+                    f"{rng.uniform(-1000, 1000):.3f},"
+                    f"{rng.uniform(-1000, 1000):.3f},"
+                    f"{rng.randint(-1800, 1800)/10}\n"
+                )
+
+        results = []
+        for workers in sorted({1, os.cpu_count() or 1}):
+            stats = run_batch(
+                [path], io.StringIO(), "csv", workers, 1024*1024,
+                io.StringIO()
+            )
+            results.append(_result(
+                f"parallel_{workers}_workers",
+                stats.rows_per_second,
+                "rows/s",
+                True
+            ))
+
+    return results
+
+
+def bench_binary(rows: int = 200000) -> list[dict]:
+    """Cost of opening and replaying a memory-mapped binary throw file."""
+    import tempfile
+    import numpy as np
+    from utils.binary import iter_predictions, read_throws, replay_file
+    from utils.binary import write_throws
+
+    rng = np.random.default_rng(0)
+    cols = np.column_stack([
+        rng.uniform(-1000, 1000, rows),
+        rng.uniform(-1000, 1000, rows),
+        np.round(rng.uniform(-180, 180, rows), 1),
+        rng.uniform(-1000, 1000, rows),
+        rng.uniform(-1000, 1000, rows),
+        np.round(rng.uniform(-180, 180, rows), 1)
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "throws.etb")
+        write_throws(path, cols.tolist())
+
+        open_ms = min(timeit.repeat(lambda: read_throws(path), number=1,
+                                    repeat=5))*1000
+        predict = min(timeit.repeat(
+            lambda: list(iter_predictions(read_throws(path))),
+            number=1, repeat=3
+        ))
+        replay = min(timeit.repeat(
+            lambda: replay_file(path, io.StringIO(), err=io.StringIO()),
+            number=1, repeat=3
+        ))
+        replay_route = min(timeit.repeat(
+            lambda: replay_file(
+                path, io.StringIO(), err=io.StringIO(), route=True
+            ),
+            number=1, repeat=3
+        ))
+
+    return [
+        _result("binary_open", open_ms, "ms"),
+        _result("binary_predict", rows/predict, "rows/s", True),
+        _result("binary_replay", rows/replay, "rows/s", True),
+        _result("binary_replay_route", rows/replay_route, "rows/s", True)
+    ]
+
+
+def bench_route(rows: int = 10**6) -> list[dict]:
+    """Throughput of vectorized route planning (Nether coords, yaw)."""
+    import numpy as np
+    from utils.batch import plan_routes, round_routes
+
+    rng = np.random.default_rng(0)
+    x, z, from_x, from_z = rng.uniform(-5000, 5000, (4, rows))
+    best = min(timeit.repeat(
+        lambda: round_routes(plan_routes(x, z, from_x, from_z)),
+        number=1, repeat=5
+    ))
+    return [_result("route_planning", rows/best, "rows/s", True)]
+
+
+def bench_graph(renders: int = 20) -> list[dict]:
+    """Renders per second of headless PNG/SVG and terminal graphs."""
+    import tempfile
+    from endtrace import solve_stronghold
+    from utils.plotting import GraphRenderer
+    from utils.quickplot import render_svg, render_terminal
+
+    prediction = solve_stronghold(*THROW)
+    renderer = GraphRenderer()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("png", "svg"):
+            path = os.path.join(tmp, f"graph.{fmt}")
+            seconds = min(timeit.repeat(
+                lambda: renderer.render(prediction, path),
+                number=renders, repeat=3
+            ))
+            results.append(
+                _result(f"graph_{fmt}", renders/seconds, "renders/s", True)
+            )
+
+        # a new renderer per graph, i.e. rebuilding the figure every time
+        path = os.path.join(tmp, "graph.png")
+        seconds = min(timeit.repeat(
+            lambda: GraphRenderer().render(prediction, path),
+            number=renders, repeat=3
+        ))
+        results.append(
+            _result("graph_png_new_figure", renders/seconds, "renders/s", True)
+        )
+
+    # the dependency-free renderers
+    for name, render in (
+        ("graph_svg_builtin", render_svg), ("graph_terminal", render_terminal)
+    ):
+        per_call = _ns_per_call(lambda: render(prediction), number=200)
+        results.append(_result(name, 1e9/per_call, "renders/s", True))
+
+    return results
+
+
+def bench_robust(sessions: int = 2000, throws: int = 20) -> list[dict]:
+    """Throughput of outlier-robust fusion of many throws per session."""
+    import numpy as np
+    from utils.robust import fuse_throws
+
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-300, 300, (sessions, throws))
+    z = rng.uniform(-300, 300, (sessions, throws))
+    theta = np.degrees(np.arctan2(x + 1500, 800 - z))
+    theta += rng.normal(0, 0.05, theta.shape)
+    theta[:, :3] += 10  # three misaligned throws per session
+
+    results = []
+    for method in ("ransac", "tukey"):
+        seconds = min(timeit.repeat(
+            lambda: fuse_throws(x, z, theta, method=method),
+            number=1, repeat=3
+        ))
+        results.append(_result(
+            f"robust_{method}_{throws}_throws", sessions/seconds,
+            "sessions/s", True
+        ))
+    return results
+
+
+def bench_uncertainty() -> list[dict]:
+    """Latency of the analytic and Monte Carlo uncertainty estimates."""
+    from utils.uncertainty import (
+        error_ellipse, estimate_uncertainty, monte_carlo_uncertainty,
+        probability_grid
+    )
+
+    def analytic():
+        error_ellipse(estimate_uncertainty(*THROW))
+
+    def grid():
+        probability_grid(estimate_uncertainty(*THROW))
+
+    def monte_carlo():
+        monte_carlo_uncertainty(*THROW, samples=10000)
+
+    return [
+        _result("uncertainty_analytic", _ns_per_call(analytic), "ns/call"),
+        _result(
+            "uncertainty_grid",
+            _ns_per_call(grid, number=500),
+            "ns/call"
+        ),
+        _result(
+            "uncertainty_monte_carlo_10k",
+            _ns_per_call(monte_carlo, number=20),
+            "ns/call"
+        )
+    ]
+
+
+def bench_rings() -> list[dict]:
+    """Cost of building the ring index and of ranking candidates."""
+    from utils import rings
+
+    start = time.perf_counter()
+    for ring in rings.RINGS:
+        rings.ring_cells(ring.index)
+    rings.nearer_strongholds_table()
+    build = time.perf_counter() - start
+
+    throws = [THROW[:3], THROW[3:]]
+    return [
+        _result("rings_index_build", build*1000, "ms"),
+        _result(
+            "rings_rank_two_throws",
+            _ns_per_call(lambda: rings.rank_candidates(throws), number=500),
+            "ns/call"
+        ),
+        _result(
+            "rings_single_throw",
+            _ns_per_call(lambda: rings.single_throw(*THROW[:3]), number=2000),
+            "ns/call"
+        )
+    ]
+
+
+BENCHMARKS = {
+    "scalar": bench_scalar,
+    "cache": bench_cache,
+    "watch": bench_watch,
+    "session": bench_session,
+    "seed": bench_seed,
+    "profiling": bench_profiling,
+    "validators": bench_validators,
+    "bulk_validation": bench_bulk_validation,
+    "parser": bench_parser,
+    "cli": bench_cli,
+    "batch": bench_batch,
+    "parallel": bench_parallel,
+    "binary": bench_binary,
+    "route": bench_route,
+    "robust": bench_robust,
+    "graph": bench_graph,
+    "uncertainty": bench_uncertainty,
+    "rings": bench_rings,
+}
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float):
+    """
+    Compares results against a previous run.
+
+    Args:
+        results (list[dict]): The current results.
+        baseline (list[dict]): The results of a previous run.
+        threshold (float): The relative slowdown that counts as a
+            regression (e.g., 0.2 for 20%).
+
+    Returns:
+        list[dict]: One entry per shared measurement with its relative
+            change and whether it regressed.
+    """
+    previous = {entry["name"]: entry for entry in baseline}
+    report = []
+    for entry in results:
+        old = previous.get(entry["name"])
+        if old is None or old["value"] == 0:
+            continue
+
+        change = (entry["value"] - old["value"])/old["value"]
+        slowdown = -change if entry["higher_is_better"] else change
+        report.append({
+            "name": entry["name"],
+            "baseline": old["value"],
+            "value": entry["value"],
+            "change": round(change, 4),
+            "regressed": slowdown > threshold
+        })
+
+    return report
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="benchmarks endtrace's prediction, validation and cli "
+            "paths"
+    )
+    arg_parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=sorted(BENCHMARKS),
+        help="only run these groups of benchmarks"
+    )
+    arg_parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=10**6,
+        help="the largest batch size to measure (default: 10^6)"
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        help="also write the results to this json file"
+    )
+    arg_parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="a previous results file to check for regressions"
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the relative slowdown counted as a regression (default: 0.2)"
+    )
+    args = arg_parser.parse_args()
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        if name == "batch":
+            results.extend(bench_batch(args.max_rows))
+        else:
+            results.extend(BENCHMARKS[name]())
+
+    report = {
+        "benchmark": "suite",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        report["comparison"] = compare(results, baseline, args.threshold)
+        regressed = any(entry["regressed"] for entry in report["comparison"])
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
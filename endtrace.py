@@ -12,22 +12,40 @@ program can display a graph visualizing the prediction.
 Usage:
     python endtrace.py x1 z1 theta1 x2 z2 theta2
     python endtrace.py x1 z1 theta1 x2 z2 theta2 --graph
+    python endtrace.py x1 z1 theta1 x2 z2 theta2 --graph-out graph.png
+    python endtrace.py x1 z1 theta1 x2 z2 theta2 --terminal-graph
+    python endtrace.py x1 z1 theta1 x2 z2 theta2 --uncertainty
+    python endtrace.py x1 z1 theta1 x2 z2 theta2 --route
+    python endtrace.py x1 z1 theta1 x2 z2 theta2 --seed SEED
+    python endtrace.py serve [--port PORT | --unix PATH] [--cache-size N]
+    python endtrace.py stream [FILE] [--format csv|jsonl|binary] [--output FILE]
+                              [--route]
+    python endtrace.py convert FILE OUTPUT.etb [--float32]
+    python endtrace.py batch FILE [FILE ...] [--workers N] [--output FILE]
+                             [--route]
+    python endtrace.py watch FILE [--from-start] [--reset-after SECONDS]
+                             [--robust]
+    python endtrace.py single x z theta
+    python endtrace.py seed SEED [--ring N]
 
 Attributes:
     None
 """
 
-from utils.parser import parser
+from utils import profiling
+from utils.parser import commands, parser
 from utils.validators import *
+import contextlib
 import math
-import matplotlib.pyplot as plt
 import sys
+import time
+from typing import NamedTuple
 
 
-def _transform_minecraft_angle_to_cartesian_rads(theta: float) -> float:
+def _compute_cartesian_rads(theta: float) -> float:
     """
     Transforms a Minecraft angle (in degrees) to a Cartesian angle (in
-    radians).
+    radians), without the lookup table.
 
     Args:
         theta (float): The angle from Minecraft (in degrees).
@@ -49,6 +67,47 @@ def _transform_minecraft_angle_to_cartesian_rads(theta: float) -> float:
         return -math.radians(-theta - 90)
 
 
+# the f3 screen shows angles to 0.1 degrees, so every angle a player can
+# read off it is one of 3601 keys (-180.0, -179.9, ..., 180.0). the table
+# fills on first use so importing stays cheap
+_ANGLE_TABLE: dict[float, float] = {}
+
+
+def _transform_minecraft_angle_to_cartesian_rads(theta: float) -> float:
+    """
+    Transforms a Minecraft angle (in degrees) to a Cartesian angle (in
+    radians). F3 angles are cached in a table of at most 3601 entries; any
+    other angle is computed directly, with the same result.
+
+    Args:
+        theta (float): The angle from Minecraft (in degrees).
+
+    Returns:
+        float: The new Cartesian angle (in radians).
+    """
+    rads = _ANGLE_TABLE.get(theta)
+    if rads is None:
+        rads = _compute_cartesian_rads(theta)
+        if round(theta, 1) == theta and -180 <= theta <= 180:
+            _ANGLE_TABLE[theta] = rads
+    return rads
+
+
+def _transform_cartesian_rads_to_minecraft_angle(phi: float) -> float:
+    """
+    Transforms a Cartesian angle (in radians) to a Minecraft angle (in
+    degrees), the inverse of _transform_minecraft_angle_to_cartesian_rads.
+
+    Args:
+        phi (float): The Cartesian angle (in radians).
+
+    Returns:
+        float: The Minecraft angle (in degrees, wrapped into [-180, 180)).
+    """
+    # both branches of the forward transform are phi = theta + 90 degrees
+    return (math.degrees(phi) + 90) % 360 - 180
+
+
 def _clean_zero(val: float) -> float:
     """
     Normalizes -0.0 to 0.0 for cleaner output.
@@ -62,14 +121,227 @@ def _clean_zero(val: float) -> float:
     return 0.0 if val == 0 else val
 
 
+# pairs whose condition number exceeds this are treated as parallel (the
+# prediction would be lost in rounding error)
+MAX_CONDITION = 1e12
+
+
+class Prediction(NamedTuple):
+    """
+    The result of a stronghold prediction, without any output side effects.
+
+    Attributes:
+        x (float): Unrounded x-coord of the prediction.
+        z (float): Unrounded z-coord of the prediction.
+        rounded_x (float): X-coord rounded to 2 decimals (as printed).
+        rounded_z (float): Z-coord rounded to 2 decimals (as printed).
+        m1 (float): Slope of the first throw.
+        m2 (float): Slope of the second throw.
+        b1 (float): Z-intercept of the first throw.
+        b2 (float): Z-intercept of the second throw.
+        condition (float): Condition number of the pair (1 for
+            perpendicular throws, growing as they approach parallel). The
+            relative error of the prediction is about condition*epsilon.
+    """
+    x: float
+    z: float
+    rounded_x: float
+    rounded_z: float
+    m1: float
+    m2: float
+    b1: float
+    b2: float
+    condition: float
+
+
+def _condition(cos1: float, sin1: float, cos2: float, sin2: float) -> float:
+    """
+    Computes the 2-norm condition number of the matrix whose rows are the
+    two throws' unit directions.
+
+    Returns:
+        float: (1 + |cos|)/|sin| of the angle between the throws, or inf if
+            they are exactly parallel.
+    """
+    cross = cos1*sin2 - sin1*cos2
+    if cross == 0:
+        return math.inf
+    return (1 + abs(cos1*cos2 + sin1*sin2))/abs(cross)
+
+
+def pair_condition(theta1: float, theta2: float) -> float:
+    """
+    Computes the condition number of a pair of throws from their angles
+    alone, so badly conditioned pairs can be rejected before solving.
+
+    Args:
+        theta1 (float): Angle of the first throw (in Minecraft degrees).
+        theta2 (float): Angle of the second throw (in Minecraft degrees).
+
+    Returns:
+        float: The condition number (see Prediction.condition).
+    """
+    phi1 = _transform_minecraft_angle_to_cartesian_rads(theta1)
+    phi2 = _transform_minecraft_angle_to_cartesian_rads(theta2)
+    return _condition(
+        math.cos(phi1), math.sin(phi1), math.cos(phi2), math.sin(phi2)
+    )
+
+
+def solve_stronghold(
+    x1: float, z1: float, theta1: float,
+    x2: float, z2: float, theta2: float
+) -> Prediction:
+    """
+    Predicts the (Cartesian) stronghold coordinates based on data from
+    two Eye of Ender throws. Pure computation: nothing is printed or
+    plotted and the inputs are not validated.
+
+    Args:
+        x1 (float): X-coord of the first throw.
+        z1 (float): Z-coord of the first throw.
+        theta1 (float): Angle of the first throw (in Minecraft degrees).
+        x2 (float): X-coord of the second throw.
+        z2 (float): Z-coord of the second throw.
+        theta2 (float): Angle of the second throw (in Minecraft degrees).
+
+    Returns:
+        Prediction: The raw and rounded prediction plus each throw's line.
+
+    Raises:
+        AngleError: If the throws are (numerically) parallel.
+    """
+    # checked inline (rather than with profiling.stage) to stay cheap
+    profiler = profiling.active
+    if profiler is not None:
+        start = time.perf_counter()
+
+    # transform minecraft angles to radians in the cartesian plane
+    phi1 = _transform_minecraft_angle_to_cartesian_rads(theta1)
+    phi2 = _transform_minecraft_angle_to_cartesian_rads(theta2)
+
+    if profiler is not None:
+        converted = time.perf_counter()
+        profiler.record("angle_conversion", converted - start)
+
+    # intersect the rays p_i + t*(cos_i, sin_i) directly, which stays
+    # accurate near north/south where the slopes blow up
+    cos1, sin1 = math.cos(phi1), math.sin(phi1)
+    cos2, sin2 = math.cos(phi2), math.sin(phi2)
+    condition = _condition(cos1, sin1, cos2, sin2)
+    if not condition <= MAX_CONDITION:
+        if profiler is not None:
+            profiler.count("parallel_throws")
+        raise AngleError("throws must not be parallel")
+
+    # distance along the first ray (cramer's rule)
+    t = ((x2 - x1)*sin2 - (z2 - z1)*cos2)/(cos1*sin2 - sin1*cos2)
+    pred_x = x1 + t*cos1
+    pred_z = z1 + t*sin1
+
+    # slopes and intercepts are only needed to draw the lines
+    m1 = math.tan(phi1)
+    m2 = math.tan(phi2)
+
+    prediction = Prediction(
+        pred_x,
+        pred_z,
+        _clean_zero(round(pred_x, 2)),
+        _clean_zero(round(pred_z, 2)),
+        m1,
+        m2,
+        -m1*x1 + z1,
+        -m2*x2 + z2,
+        condition
+    )
+
+    if profiler is not None:
+        profiler.record("solve", time.perf_counter() - converted)
+        profiler.count("predictions")
+    return prediction
+
+
+# unit direction (cos, sin) of the cartesian angle of every f3 angle, filled
+# on first use like _ANGLE_TABLE
+_DIRECTION_TABLE: dict[float, tuple[float, float]] = {}
+
+
+def _direction(theta: float) -> tuple[float, float]:
+    """
+    Computes the unit direction of a Minecraft angle, caching F3 angles in
+    _DIRECTION_TABLE.
+
+    Args:
+        theta (float): The angle from Minecraft (in degrees).
+
+    Returns:
+        tuple[float, float]: The cosine and sine of its Cartesian angle.
+    """
+    phi = _transform_minecraft_angle_to_cartesian_rads(theta)
+    direction = (math.cos(phi), math.sin(phi))
+    if round(theta, 1) == theta and -180 <= theta <= 180:
+        _DIRECTION_TABLE[theta] = direction
+    return direction
+
+
+def solve_stronghold_fast(
+    x1: float, z1: float, theta1: float,
+    x2: float, z2: float, theta2: float
+) -> tuple[float, float]:
+    """
+    Minimal-overhead version of solve_stronghold for hot loops that only
+    need the coords (e.g., an overlay redrawing every frame). F3 angles (to
+    0.1 degrees) look their sines and cosines up in a table, and nothing is
+    rounded, formatted or profiled. Any other angle still works, at about
+    the cost of solve_stronghold.
+
+    Args:
+        x1 (float): X-coord of the first throw.
+        z1 (float): Z-coord of the first throw.
+        theta1 (float): Angle of the first throw (in Minecraft degrees).
+        x2 (float): X-coord of the second throw.
+        z2 (float): Z-coord of the second throw.
+        theta2 (float): Angle of the second throw (in Minecraft degrees).
+
+    Returns:
+        tuple[float, float]: The unrounded (x, z) coords of the prediction,
+            equal to solve_stronghold's x and z.
+
+    Raises:
+        AngleError: If the throws are (numerically) parallel.
+    """
+    try:
+        cos1, sin1 = _DIRECTION_TABLE[theta1]
+    except KeyError:
+        cos1, sin1 = _direction(theta1)
+    try:
+        cos2, sin2 = _DIRECTION_TABLE[theta2]
+    except KeyError:
+        cos2, sin2 = _direction(theta2)
+
+    # the condition number is at most 2/|cross|, so only nearly parallel
+    # pairs (or NaNs) need the exact check of solve_stronghold
+    cross = cos1*sin2 - sin1*cos2
+    if not abs(cross)*MAX_CONDITION >= 2:
+        if not _condition(cos1, sin1, cos2, sin2) <= MAX_CONDITION:
+            raise AngleError("throws must not be parallel")
+
+    t = ((x2 - x1)*sin2 - (z2 - z1)*cos2)/cross
+    return (x1 + t*cos1, z1 + t*sin1)
+
+
 def predict_stronghold(
     x1: float, z1: float, theta1: float,
     x2: float, z2: float, theta2: float,
-    graph: bool = False
+    graph: bool = False,
+    graph_out: str | None = None,
+    graph_backend: str = "auto",
+    terminal_graph: bool = False
 ) -> tuple[float, float]:
     """
     Predicts the (Cartesian) stronghold coordinates based on data from
-    two Eye of Ender throws. Prints the stronghold prediction.
+    two Eye of Ender throws. Prints the stronghold prediction (see
+    solve_stronghold for a version without output).
 
     Args:
         x1 (float): X-coord of the first throw.
@@ -78,102 +350,235 @@ def predict_stronghold(
         x2 (float): X-coord of the second throw.
         z2 (float): Z-coord of the second throw.
         theta2 (float): Angle of the second throw (in Cartesian radians).
+        graph (bool): Whether to show a graph of the prediction.
+        graph_out (str | None): An image file (e.g., PNG or SVG) to save the
+            graph to, without needing a display.
+        graph_backend (str): The renderer for graph_out, "builtin" (SVG
+            only, without matplotlib), "matplotlib" or "auto" (see
+            utils.quickplot.save_graph).
+        terminal_graph (bool): Whether to also print the graph as text.
 
     Returns:
         tuple[float, float]: The approximated (x, z) coords of the stronghold.
-    """
-    # transform minecraft angles to radians in the cartesian plane
-    theta1 = _transform_minecraft_angle_to_cartesian_rads(theta1)
-    theta2 = _transform_minecraft_angle_to_cartesian_rads(theta2)
 
-    # get the slopes of each throw
-    m1 = math.tan(theta1)
-    m2 = math.tan(theta2)
-    rounded_m1 = round(m1, 2)
-    rounded_m2 = round(m2, 2)
+    Raises:
+        AngleError: If the throws are (numerically) parallel.
+        ValueError: If the builtin graph backend is asked for a non-SVG file.
+    """
+    prediction = solve_stronghold(x1, z1, theta1, x2, z2, theta2)
+    _show_prediction(
+        prediction, graph, graph_out, graph_backend, terminal_graph
+    )
+    return (prediction.rounded_x, prediction.rounded_z)
 
-    # check images/endtrace-math.pdf for work
-    pred_x = (m2*x2 - m1*x1 + z1 - z2)/(m2 - m1)
-    pred_z = (m1*m2*(x2 - x1) + m2*z1 - m1*z2)/(m2 - m1)
-    rounded_pred_x = _clean_zero(round(pred_x, 2))
-    rounded_pred_z = _clean_zero(round(pred_z, 2))
 
+def _show_prediction(
+    prediction: Prediction,
+    graph: bool,
+    graph_out: str | None,
+    graph_backend: str,
+    terminal_graph: bool
+) -> None:
+    """
+    Prints a solved prediction and draws the graphs asked for (see
+    predict_stronghold for the arguments).
+    """
     # print regardless of graphing or not
-    print(
-        f"predicted stronghold coords:",
-        f"(x={rounded_pred_x},",
-        f"y=?,",
-        f"z={rounded_pred_z})"
-    )
+    with profiling.stage("format"):
+        print(
+            f"predicted stronghold coords:",
+            f"(x={prediction.rounded_x},",
+            f"y=?,",
+            f"z={prediction.rounded_z})"
+        )
 
     if graph:
-        fig, ax = plt.subplots(figsize=(8, 5))
-
-        # set up the plot
-        ax.invert_yaxis()
-        ax.set_title("endtrace visualization")
-        ax.set_xlabel("x-axis")
-        ax.set_ylabel("z-axis (inverted)")
-        plt.tight_layout(pad=3.0)
-
-        # round the intercepts for visual appeal
-        intercept1 = round(-m1*x1 + z1, 2)
-        intercept2 = round(-m2*x2 + z2, 2)
-        sign1 = sign2 = "+"
-
-        # format the intercept for the first throw
-        if intercept1 < 0:
-            sign1 = "-"
-            intercept1 = abs(intercept1)
-
-        # format the intercept for the second throw
-        if intercept2 < 0: 
-            sign2 = "-"
-            intercept2 = abs(intercept2)
-
-        # calculate the slope-intercept form
-        throw1 = f"throw1: z = {rounded_m1}x {sign1} {intercept1}"
-        throw2 = f"throw2: z = {rounded_m2}x {sign2} {intercept2}"
-
-        # plot the throws and prediction
-        dx = dz = 250  # the block distance around the prediction
-        bounds = [pred_x - dx, pred_x, pred_x + dz]
-        ax.plot(
-            bounds,
-            list(map(lambda x: m1*x - m1*x1 + z1, bounds)),
-            "-",
-            lw=2.0,
-            label=throw1,
-            color="#316364"
+        # imported lazily so text-only predictions never load matplotlib
+        with profiling.stage("plot"):
+            from utils.plotting import plot_prediction
+            plot_prediction(prediction)
+
+    if graph_out:
+        with profiling.stage("plot"):
+            from utils.quickplot import save_graph
+            save_graph(prediction, graph_out, graph_backend)
+
+    if terminal_graph:
+        with profiling.stage("plot"):
+            from utils.quickplot import render_terminal, supports_color
+            print(
+                render_terminal(prediction, color=supports_color(sys.stdout)),
+                end=""
+            )
+
+
+def _run_command(name: str, args) -> None:
+    """
+    Runs one of the named commands (e.g., `endtrace serve`). Each command's
+    module is imported lazily so plain predictions stay fast to start.
+
+    Args:
+        name (str): The command name (a key of utils.parser.commands).
+        args (argparse.Namespace): The command's parsed arguments.
+    """
+    if name == "serve":
+        import asyncio
+        from utils.server import serve
+        try:
+            asyncio.run(
+                serve(args.host, args.port, args.unix, args.cache_size)
+            )
+        except KeyboardInterrupt:
+            pass
+    elif name == "stream":
+        from utils.stream import detect_format, stream_file
+        fmt = args.format or detect_format(args.input)
+        if fmt == "binary" and args.input == "-":
+            print("binary throw files must be read from a file, not stdin")
+            sys.exit(1)
+        with contextlib.ExitStack() as stack:
+            src = out = None
+            if args.output != "-":
+                out = stack.enter_context(open(args.output, "w", newline=""))
+            if fmt == "binary":
+                from utils.binary import BinaryFormatError, replay_file
+                try:
+                    stats = replay_file(
+                        args.input, out or sys.stdout, route=args.route
+                    )
+                except BinaryFormatError as format_error:
+                    print(f"BinaryFormatError: {format_error}")
+                    sys.exit(1)
+            else:
+                if args.input != "-":
+                    src = stack.enter_context(open(args.input, newline=""))
+                stats = stream_file(
+                    src or sys.stdin, out or sys.stdout, fmt,
+                    route=args.route
+                )
+        print(
+            f"processed {stats.rows} rows ({stats.errors} invalid)",
+            f"in {stats.seconds:.3f}s",
+            f"({stats.rows_per_second:.0f} rows/s)",
+            file=sys.stderr
         )
-        ax.plot(
-            bounds,
-            list(map(lambda x: m2*x - m2*x2 + z2, bounds)),
-            "-",
-            lw=2.0,
-            label=throw2,
-            color="#659B7D"
+    elif name == "convert":
+        from utils.binary import convert
+        from utils.stream import detect_format
+        fmt = args.format or detect_format(args.input)
+        dtype = "float32" if args.float32 else "float64"
+        with contextlib.ExitStack() as stack:
+            src = sys.stdin
+            if args.input != "-":
+                src = stack.enter_context(open(args.input, newline=""))
+            stats = convert(src, args.output, fmt, dtype)
+        print(
+            f"converted {stats.rows - stats.errors} rows",
+            f"({stats.errors} skipped) in {stats.seconds:.3f}s",
+            file=sys.stderr
         )
-        sh = f"stronghold prediction: ({rounded_pred_x}, {rounded_pred_z})"
-        ax.plot(pred_x, pred_z, "o", label=sh, color="#102C31")
-
-        plt.legend(loc="upper left")
-        plt.grid()
-        plt.show()
-
-    return (rounded_pred_x, rounded_pred_z)
-
+    elif name == "batch":
+        from utils.parallel import run_batch
+        from utils.stream import detect_format
+        fmt = args.format or detect_format(args.inputs[0])
+        shard_bytes = max(1, int(args.shard_size*1024*1024))
+        with contextlib.ExitStack() as stack:
+            out = None
+            if args.output != "-":
+                out = stack.enter_context(open(args.output, "w", newline=""))
+            stats = run_batch(
+                args.inputs, out or sys.stdout, fmt, args.workers, shard_bytes,
+                route=args.route
+            )
+        print(
+            f"processed {stats.rows} rows ({stats.errors} invalid)",
+            f"in {stats.seconds:.3f}s",
+            f"({stats.rows_per_second:.0f} rows/s)",
+            file=sys.stderr
+        )
+        for worker in stats.workers:
+            print(
+                f"  worker {worker.pid}: {worker.shards} shards,",
+                f"{worker.rows} rows ({worker.rows_per_second:.0f} rows/s)",
+                file=sys.stderr
+            )
+    elif name == "watch":
+        import asyncio
+        from utils.watch import watch
+        try:
+            asyncio.run(watch(
+                args.file,
+                interval=args.interval,
+                from_start=args.from_start,
+                reset_after=args.reset_after,
+                robust=args.robust
+            ))
+        except KeyboardInterrupt:
+            pass
+    elif name == "single":
+        from utils.rings import single_throw
+        from utils.uncertainty import DEFAULT_ANGLE_STD
+        angle_std = args.angle_std
+        if angle_std is None:
+            angle_std = DEFAULT_ANGLE_STD
+        try:
+            segments = single_throw(args.x, args.z, args.theta, angle_std)
+        except AngleError as angle_error:
+            print(f"AngleError: {angle_error}")
+            sys.exit(1)
+        for segment in segments:
+            if segment.probability < args.min_probability:
+                continue
+            print(
+                f"ring {segment.ring + 1}:",
+                f"(x={round(segment.start_x)}, z={round(segment.start_z)})",
+                f"to (x={round(segment.end_x)}, z={round(segment.end_z)}),",
+                f"most likely near (x={round(segment.x)},",
+                f"z={round(segment.z)}), p={round(segment.probability, 3)}"
+            )
+    elif name == "seed":
+        from utils.seed import generate_strongholds, parse_seed
+        try:
+            seed = parse_seed(args.seed)
+        except ValueError as seed_error:
+            commands["seed"].error(str(seed_error))
+        for stronghold in generate_strongholds(seed):
+            if args.ring is not None and stronghold.ring != args.ring - 1:
+                continue
+            print(
+                f"ring {stronghold.ring + 1}:",
+                f"(x={stronghold.x:g}, z={stronghold.z:g})",
+                f"chunk ({stronghold.chunk_x}, {stronghold.chunk_z})"
+            )
+
+
+def _run_prediction(args) -> None:
+    """
+    Validates the throws from the command line, then prints the prediction
+    (and any graphs, error ellipse or ring candidates asked for).
 
-def main():
-    args = parser.parse_args()
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
     x1, z1, theta1 = args.x1, args.z1, args.theta1
     x2, z2, theta2 = args.x2, args.z2, args.theta2
-    graph = args.graph
+    graph, graph_out = args.graph, args.graph_out
+    if graph_out and args.graph_backend == "builtin" \
+            and not graph_out.lower().endswith(".svg"):
+        parser.error("--graph-backend builtin only writes .svg files")
+    seed = None
+    if args.seed is not None:
+        from utils.seed import parse_seed
+        try:
+            seed = parse_seed(args.seed)
+        except ValueError as seed_error:
+            parser.error(str(seed_error))
 
     # validate the inputted args
     try:
-        validate_coords(x1, z1, x2, z2)
-        validate_angles(theta1, theta2)
+        with profiling.stage("validate"):
+            validate_coords(x1, z1, x2, z2)
+            validate_angles(theta1, theta2)
     except CoordsError as coords_error:
         print(f"CoordsError: {coords_error}")
         sys.exit(1)
@@ -181,8 +586,98 @@ def main():
         print(f"AngleError: {angle_error}")
         sys.exit(1)
 
-    # perform the prediction
-    predict_stronghold(x1, z1, theta1, x2, z2, theta2, graph)
+    # perform the prediction once; the uncertainty and ring helpers reuse it
+    try:
+        prediction = solve_stronghold(x1, z1, theta1, x2, z2, theta2)
+    except AngleError as angle_error:
+        print(f"AngleError: {angle_error}")
+        sys.exit(1)
+    _show_prediction(
+        prediction, graph, graph_out, args.graph_backend, args.terminal_graph
+    )
+    x, z = prediction.rounded_x, prediction.rounded_z
+
+    if args.route:
+        from utils.route import NETHER_SCALE, plan_route, round_route
+        nether_x, nether_z, yaw, distance = round_route(
+            plan_route(x, z, x2, z2)
+        )
+        print(f"nether coords: (x={nether_x}, z={nether_z})")
+        print(
+            f"from your second throw: face yaw {yaw},",
+            f"{round(distance)} blocks",
+            f"({round(distance/NETHER_SCALE)} in the nether)"
+        )
+
+    if seed is not None:
+        from utils.rings import BIOME_SNAP
+        from utils.seed import snap_prediction
+        snapped = snap_prediction(x, z, seed)
+        stronghold = snapped.stronghold
+        print(
+            f"nearest stronghold of the seed: (x={stronghold.x:g},",
+            f"z={stronghold.z:g}) in ring {stronghold.ring + 1},",
+            f"{round(snapped.distance)} blocks away",
+            f"(biome snapping may move it up to {BIOME_SNAP} blocks)"
+        )
+
+    angle_std = args.angle_std
+    if angle_std is None and (args.uncertainty or args.rings):
+        from utils.uncertainty import DEFAULT_ANGLE_STD
+        angle_std = DEFAULT_ANGLE_STD
+
+    if args.uncertainty:
+        from utils.uncertainty import error_ellipse, estimate_uncertainty
+        with profiling.stage("uncertainty"):
+            ellipse = error_ellipse(
+                estimate_uncertainty(
+                    x1, z1, theta1, x2, z2, theta2, angle_std,
+                    prediction=prediction
+                )
+            )
+        print(
+            f"95% error ellipse:",
+            f"{round(ellipse.semi_major, 2)} x {round(ellipse.semi_minor, 2)}",
+            f"blocks (major axis at {round(ellipse.angle, 1)} degrees)"
+        )
+
+    if args.rings:
+        from utils.rings import rank_candidates
+        throws = [(x1, z1, theta1), (x2, z2, theta2)]
+        with profiling.stage("rings"):
+            candidates = rank_candidates(
+                throws, angle_std, prediction=prediction
+            )
+        print("most likely stronghold chunks:")
+        for candidate in candidates:
+            print(
+                f"  (x={candidate.x}, z={candidate.z})",
+                f"ring {candidate.ring + 1},",
+                f"p={round(candidate.probability, 3)}"
+            )
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        name = sys.argv[1]
+        _run_command(name, commands[name].parse_args(sys.argv[2:]))
+        return
+
+    start = time.perf_counter()
+    args = parser.parse_args()
+    parse_seconds = time.perf_counter() - start
+
+    if not args.profile:
+        _run_prediction(args)
+        return
+
+    profiler = profiling.enable()
+    profiler.record("parse", parse_seconds)
+    try:
+        _run_prediction(args)
+    finally:
+        profiling.disable()
+        print(profiler.export(args.profile_format), end="", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+import array
+import math
+import unittest
+import numpy as np
+from endtrace import (
+    _transform_minecraft_angle_to_cartesian_rads,
+    solve_stronghold
+)
+from utils.batch import *
+
+
+class TestBatch(unittest.TestCase):
+    """Tests for the vectorized batch triangulation API."""
+
+    def test_angle_transform_matches_scalar(self):
+        """Test the vectorized angle transform against the scalar one."""
+        thetas = [-180, -135, -90, -45, -0.0, 0, 45, 90, 109.9, 135, 180]
+        batch = transform_minecraft_angles_to_cartesian_rads(thetas)
+        for theta, rads in zip(thetas, batch):
+            with self.subTest(theta=theta):
+                self.assertEqual(
+                    rads,
+                    _transform_minecraft_angle_to_cartesian_rads(theta)
+                )
+
+    def test_batch_matches_scalar(self):
+        """
+        Test that the batch predictions match solve_stronghold, both raw
+        and after rounding.
+        """
+        rng = np.random.default_rng(0)
+        n = 500
+        x1 = rng.uniform(-1000, 1000, n)
+        z1 = rng.uniform(-1000, 1000, n)
+        x2 = rng.uniform(-1000, 1000, n)
+        z2 = rng.uniform(-1000, 1000, n)
+        theta1 = np.round(rng.uniform(-180, 180, n), 1)
+        theta2 = np.round(rng.uniform(-180, 180, n), 1)
+
+        result = predict_strongholds(x1, z1, theta1, x2, z2, theta2)
+        self.assertFalse(result.degenerate.any())
+
+        for i in range(n):
+            expected = solve_stronghold(
+                x1[i], z1[i], theta1[i],
+                x2[i], z2[i], theta2[i]
+            )
+            # np.sin and np.cos may differ from math in the last ulp
+            self.assertTrue(math.isclose(result.x[i], expected.x, rel_tol=1e-9))
+            self.assertTrue(math.isclose(result.z[i], expected.z, rel_tol=1e-9))
+            self.assertEqual(round(result.x[i], 2), expected.rounded_x)
+            self.assertEqual(round(result.z[i], 2), expected.rounded_z)
+
+    def test_readme_example(self):
+        """Test the README example through the batch API."""
+        result = predict_strongholds(
+            [0.586], [0.512], [109.9],
+            [-350.193], [0.226], [115]
+        )
+        self.assertEqual(round(result.x[0], 2), -1564.75)
+        self.assertEqual(round(result.z[0], 2), -566.13)
+
+    def test_degenerate_rows_are_masked(self):
+        """
+        Test that identical coords, identical angles and out of bounds
+        angles are masked instead of raising.
+        """
+        result = predict_strongholds(
+            [0, 0, 0, 10, 0],
+            [0, 0, 0, 10, 0],
+            [-135, 0, 45, 181, -135],
+            [100, 0, 10, 0, 100],
+            [0, 0, 10, 0, 0],
+            [135, 45, 45, 0, 135]
+        )
+        self.assertEqual(
+            result.degenerate.tolist(),
+            [False, True, True, True, False]
+        )
+        self.assertTrue(math.isnan(result.x[1]))
+        self.assertTrue(math.isnan(result.z[2]))
+        self.assertFalse(math.isnan(result.x[4]))
+
+    def test_accepts_buffer_protocol_columns(self):
+        """Test that array.array and memoryview columns are accepted."""
+        cols = [
+            array.array("d", [10]),
+            memoryview(array.array("d", [-10])),
+            array.array("f", [45]),
+            [-10], [-10], [-45]
+        ]
+        result = predict_strongholds(*cols)
+        self.assertAlmostEqual(result.x[0], 0.0)
+        self.assertAlmostEqual(result.z[0], 0.0)
+
+    def test_mismatched_lengths_raise(self):
+        """Test that columns of different lengths raise a ValueError."""
+        with self.assertRaises(ValueError):
+            predict_strongholds([0, 1], [0], [0], [1], [1], [1])
+
+    def test_round_coords_matches_round(self):
+        """
+        Test vectorized rounding gives exactly round(value, 2), including
+        ties and -0.0.
+        """
+        rng = np.random.default_rng(1)
+        values = np.concatenate([
+            rng.uniform(-1e4, 1e4, 10000),
+            np.round(rng.uniform(-1e4, 1e4, 1000)*1000)/1000 + 0.005,
+            rng.uniform(-1e13, 1e13, 1000),
+            [0.125, -0.001, -0.0, 2.675, 1e17]
+        ])
+        expected = [round(value, 2) + 0.0 for value in values.tolist()]
+        result = round_coords(values)
+        self.assertEqual(result.tolist(), expected)
+        self.assertFalse(np.signbit(result[-3]))
+
+    def test_explain_degenerate(self):
+        """Test degenerate rows are explained like the scalar validators."""
+        self.assertIsInstance(
+            explain_degenerate(0, 0, 45, 0, 0, 30), CoordsError
+        )
+        self.assertEqual(
+            str(explain_degenerate(0, 0, 45, 10, 0, 45)),
+            "angles must be different"
+        )
+        self.assertEqual(
+            str(explain_degenerate(0, 0, 45, 10, 0, -135)),
+            "throws must not be parallel"
+        )
+        self.assertEqual(
+            str(explain_degenerate(math.nan, 0, 45, 10, 0, 30)),
+            "coords must be finite"
+        )
+
+    def test_validate_throws_codes(self):
+        """Test every row gets its first problem's code and counts add up."""
+        nan, inf = math.nan, math.inf
+        report = validate_throws(
+            [0, 0, nan, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, inf],
+            [45, 45, 45, 45, 181, nan, 45, 45],
+            [10, 0, 10, 10, 10, 10, 10, 10],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [-45, 30, 30, 45, 30, 30, -135, 30]
+        )
+        self.assertEqual(report.codes.tolist(), [
+            ValidationCode.OK,
+            ValidationCode.IDENTICAL_COORDS,
+            ValidationCode.NON_FINITE_COORDS,
+            ValidationCode.IDENTICAL_ANGLES,
+            ValidationCode.ANGLE_OUT_OF_BOUNDS,
+            ValidationCode.ANGLE_OUT_OF_BOUNDS,
+            ValidationCode.PARALLEL,
+            ValidationCode.NON_FINITE_COORDS
+        ])
+        self.assertEqual(report.valid.tolist(), [True] + [False]*7)
+        self.assertEqual(report.counts(), {
+            "ok": 1, "identical_coords": 1, "non_finite_coords": 2,
+            "identical_angles": 1, "angle_out_of_bounds": 2, "parallel": 1
+        })
+
+    def test_validate_throws_matches_scalar(self):
+        """
+        Test the reported errors match the scalar validators and the
+        rows predict_strongholds masks.
+        """
+        rng = np.random.default_rng(0)
+        n = 5000
+        cols = [
+            rng.integers(-3, 3, n).astype(float),
+            rng.integers(-3, 3, n).astype(float),
+            rng.choice([-190, -180, -135, -45, 0, 45, 135, 180, np.nan], n),
+            rng.integers(-3, 3, n).astype(float),
+            rng.choice([-3, 0, 3, np.inf], n),
+            rng.choice([-180, -135, -45, 0, 45, 135, 180, 200], n)
+        ]
+        report = validate_throws(*cols)
+        errors = dict(report.errors())
+        self.assertEqual(
+            (~predict_strongholds(*cols).degenerate).tolist(),
+            report.valid.tolist()
+        )
+        for i, row in enumerate(zip(*(col.tolist() for col in cols))):
+            try:
+                validate_coords(*row[:2], *row[3:5])
+                validate_angles(row[2], row[5])
+                solve_stronghold(*row)
+            except (CoordsError, AngleError) as error:
+                self.assertIs(type(errors[i]), type(error))
+                self.assertEqual(str(errors[i]), str(error))
+            else:
+                self.assertNotIn(i, errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
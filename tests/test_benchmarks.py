@@ -0,0 +1,88 @@
+import math
+import unittest
+import numpy as np
+from benchmarks.evaluate import (
+    MODES, SWEEPS, Scenario, evaluate, make_dataset, results, score
+)
+from benchmarks.suite import _result, compare
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Tests for comparing benchmark results against a baseline."""
+
+    def test_latency_regression(self):
+        """Test that a slower latency beyond the threshold regresses."""
+        baseline = [_result("solve", 1000, "ns/call")]
+        report = compare([_result("solve", 1300, "ns/call")], baseline, 0.2)
+        self.assertTrue(report[0]["regressed"])
+
+        report = compare([_result("solve", 1100, "ns/call")], baseline, 0.2)
+        self.assertFalse(report[0]["regressed"])
+
+    def test_throughput_regression(self):
+        """Test that lower throughput counts as a regression."""
+        baseline = [_result("batch", 1000, "rows/s", True)]
+        report = compare([_result("batch", 700, "rows/s", True)], baseline, 0.2)
+        self.assertTrue(report[0]["regressed"])
+
+        report = compare([_result("batch", 2000, "rows/s", True)], baseline, 0.2)
+        self.assertFalse(report[0]["regressed"])
+
+    def test_new_measurements_are_skipped(self):
+        """Test that measurements missing from the baseline are ignored."""
+        report = compare([_result("new", 1, "ns/call")], [], 0.2)
+        self.assertEqual(report, [])
+
+
+class TestEvaluation(unittest.TestCase):
+    """Tests for the accuracy and latency evaluation harness."""
+
+    def test_exact_throws(self):
+        """Test noise-free throws are solved exactly by every mode."""
+        scenario = Scenario(1500.0, 10.0, 0.0)
+        data = make_dataset(
+            scenario, 200, np.random.default_rng(0), aim_std=0.0, throws=4
+        )
+        self.assertEqual(data.theta.shape, (200, 4))
+
+        distance = np.hypot(
+            data.x - data.true_x[:, None], data.z - data.true_z[:, None]
+        )
+        self.assertTrue(np.all(np.abs(distance - 1500) <= 150 + 1e-9))
+        # every stronghold is at the center of a chunk
+        self.assertTrue(np.all(data.true_x % 16 == 8))
+
+        for solve, _ in MODES.values():
+            entry = score(data, *solve(data))
+            self.assertEqual(entry["failed"], 0)
+            self.assertLess(entry["max"], 1e-6)
+
+    def test_report(self):
+        """Test reports cover every sweep and reproduce with the seed."""
+        first = evaluate(cases=50, modes=["batch", "robust"])
+        second = evaluate(cases=50, modes=["batch", "robust"])
+        self.assertEqual(
+            len(first["scenarios"]),
+            2*(1 + sum(len(values) for values in SWEEPS.values()))
+        )
+        for a, b in zip(first["scenarios"], second["scenarios"]):
+            a, b = dict(a), dict(b)
+            del a["rows_per_s"], b["rows_per_s"]
+            self.assertEqual(a, b)
+            self.assertLessEqual(a["p50"], a["p90"])
+            self.assertLessEqual(a["p99"], a["max"])
+
+        # the scalar and batch solvers agree on the same data
+        scalar = evaluate(cases=50, modes=["scalar"])["modes"][0]
+        batch = first["modes"][0]
+        self.assertTrue(math.isclose(scalar["p90"], batch["p90"]))
+
+        names = [entry["name"] for entry in results(first)]
+        self.assertIn("batch_throughput", names)
+        self.assertIn("robust_error_p90", names)
+        report = compare(results(first), results(first), 0.2)
+        self.assertFalse(any(entry["regressed"] for entry in report))
+
+
+if __name__ == "__main__":
+    unittest.main()
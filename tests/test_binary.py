@@ -0,0 +1,148 @@
+import io
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from utils.batch import _as_column
+from utils.binary import *
+from utils.stream import stream_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = [
+    [0.586, 0.512, 109.9, -350.193, 0.226, 115],
+    [10, -10, 45, -10, -10, -45],
+    [0, 0, 45, 10, 0, 45],
+    [0, 0, 45, 10, 0, -135]
+]
+
+
+class TestBinary(unittest.TestCase):
+    """Tests for the memory-mapped binary throw format."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "throws.etb")
+
+    def test_round_trip(self):
+        """Test written rows read back unchanged, with a 32-byte header."""
+        self.assertEqual(write_throws(self.path, ROWS, chunk_rows=3), 4)
+        self.assertEqual(os.path.getsize(self.path), 32 + 4*6*8)
+
+        columns = read_throws(self.path)
+        self.assertEqual(np.column_stack(columns).tolist(), ROWS)
+
+    def test_float32(self):
+        """Test float32 files are half the size and keep F3 precision."""
+        write_throws(self.path, ROWS, dtype="float32")
+        self.assertEqual(os.path.getsize(self.path), 32 + 4*6*4)
+
+        columns = read_throws(self.path)
+        self.assertEqual(columns.x1.dtype, np.float32)
+        self.assertAlmostEqual(float(columns.x2[0]), -350.193, places=3)
+
+    def test_columns_are_zero_copy(self):
+        """Test the columns are read-only views of one memory map."""
+        write_throws(self.path, ROWS)
+        columns = read_throws(self.path)
+
+        self.assertIsInstance(columns.x1, np.memmap)
+        self.assertFalse(columns.x1.flags.writeable)
+        # each column strides over the 48-byte records of one buffer
+        self.assertEqual(columns.x1.strides, (48,))
+        self.assertEqual(
+            columns.theta2.ctypes.data - columns.x1.ctypes.data, 5*8
+        )
+        self.assertTrue(np.shares_memory(_as_column(columns.x1), columns.x1))
+
+    def test_invalid_files_raise(self):
+        """Test bad magic, bad layout and truncation are reported."""
+        with open(self.path, "wb") as f:
+            f.write(b"x1,z1,theta1,x2,z2,theta2\n" + b"0"*100)
+        with self.assertRaises(BinaryFormatError):
+            read_throws(self.path)
+
+        write_throws(self.path, ROWS)
+        with open(self.path, "r+b") as f:
+            f.truncate(32 + 8*6*3)
+        with self.assertRaises(BinaryFormatError):
+            read_throws(self.path)
+
+        with open(self.path, "r+b") as f:
+            f.write(struct.pack("<8sH", b"ENDTRACE", 99))
+        with self.assertRaises(BinaryFormatError):
+            read_throws(self.path)
+
+    def test_empty_file(self):
+        """Test a file with no records replays to just the header."""
+        write_throws(self.path, [])
+        out = io.StringIO()
+        stats = replay_file(self.path, out)
+        self.assertEqual(out.getvalue(), "line,x,z\n")
+        self.assertEqual(stats.rows, 0)
+
+    def test_convert_skips_unparsable_rows(self):
+        """Test conversion keeps valid rows and reports unparsable ones."""
+        lines = ["x1,z1,theta1,x2,z2,theta2\n", "a,b,c,d,e,f\n"]
+        lines += [",".join(map(str, row)) + "\n" for row in ROWS]
+        err = io.StringIO()
+        stats = convert(lines, self.path, "csv", err=err)
+
+        self.assertEqual((stats.rows, stats.errors), (5, 1))
+        self.assertIn("line 2: ProtocolError", err.getvalue())
+        self.assertEqual(len(read_throws(self.path).x1), 4)
+
+    def test_replay_matches_stream(self):
+        """
+        Test replaying a binary file gives the same predictions and errors
+        as streaming the same rows as CSV.
+        """
+        rng = np.random.default_rng(0)
+        rows = np.column_stack([
+            rng.uniform(-1000, 1000, 500), rng.uniform(-1000, 1000, 500),
+            np.round(rng.uniform(-180, 180, 500), 1),
+            rng.uniform(-1000, 1000, 500), rng.uniform(-1000, 1000, 500),
+            np.round(rng.uniform(-180, 180, 500), 1)
+        ]).tolist() + ROWS
+        write_throws(self.path, rows)
+
+        out, err = io.StringIO(), io.StringIO()
+        stats = replay_file(self.path, out, chunk_rows=64, err=err)
+
+        expected_out, expected_err = io.StringIO(), io.StringIO()
+        lines = [",".join(map(repr, map(float, row))) + "\n" for row in rows]
+        stream_file(lines, expected_out, "csv", expected_err)
+
+        self.assertEqual(out.getvalue(), expected_out.getvalue())
+        self.assertEqual(err.getvalue(), expected_err.getvalue())
+        self.assertEqual((stats.rows, stats.errors), (504, 2))
+
+    def test_convert_and_stream_commands(self):
+        """Test `endtrace convert` then `endtrace stream FILE.etb`."""
+        csv_path = os.path.join(self.tmp.name, "throws.csv")
+        with open(csv_path, "w") as f:
+            f.write("10,-10,45,-10,-10,-45\n")
+
+        def run(*args):
+            return subprocess.run(
+                [sys.executable, "endtrace.py", *args],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+
+        converted = run("convert", csv_path, self.path)
+        self.assertEqual(converted.returncode, 0)
+        self.assertIn("converted 1 rows", converted.stderr)
+
+        replayed = run("stream", self.path)
+        self.assertEqual(replayed.returncode, 0)
+        self.assertEqual(replayed.stdout.splitlines(), ["line,x,z", "1,0.0,0.0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import unittest
+from endtrace import solve_stronghold
+from utils.cache import *
+from utils.server import handle_line
+from utils.validators import AngleError
+
+THROWS = (0.586, 0.512, 109.9, -350.193, 0.226, 115)
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Tests for the LRU prediction cache."""
+
+    def test_hit_returns_same_prediction(self):
+        """Test a repeated query is a hit and matches solve_stronghold."""
+        cache = PredictionCache()
+        first = cache.predict(*THROWS)
+        second = cache.predict(*THROWS)
+
+        self.assertIs(first, second)
+        self.assertEqual(first, solve_stronghold(*THROWS))
+        self.assertEqual(cache.info(), CacheInfo(1, 1, 1024, 1))
+
+    def test_inputs_are_exact(self):
+        """
+        Test the cache never changes results: inputs that only differ below
+        the F3 screen's precision get their own, exact predictions.
+        """
+        cache = PredictionCache()
+        precise = (0.586, 0.512, 109.94, -350.193, 0.226, 115.03)
+        for throws in (THROWS, precise, precise):
+            self.assertEqual(
+                cache.predict(*throws), solve_stronghold(*throws)
+            )
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(
+            (cache.predict(*precise).rounded_x,
+             cache.predict(*precise).rounded_z),
+            (-1569.19, -568.98)
+        )
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the least recently used entry is evicted first."""
+        cache = PredictionCache(maxsize=2)
+        a = (0, 0, 45, 10, 0, -45)
+        b = (0, 0, 45, 20, 0, -45)
+        c = (0, 0, 45, 30, 0, -45)
+
+        cache.predict(*a)
+        cache.predict(*b)
+        cache.predict(*a)  # a is now the most recently used
+        cache.predict(*c)  # evicts b
+        self.assertEqual(len(cache), 2)
+
+        cache.predict(*a)
+        self.assertEqual(cache.hits, 2)
+        cache.predict(*b)
+        self.assertEqual(cache.misses, 4)
+
+    def test_failures_are_not_cached(self):
+        """Test parallel throws raise every time and are not stored."""
+        cache = PredictionCache()
+        for _ in range(2):
+            with self.assertRaises(AngleError):
+                cache.predict(0, 0, 45, 10, 0, -135)
+        self.assertEqual(len(cache), 0)
+
+        with self.assertRaises(AngleError):
+            cache.predict(0, 0, float("nan"), 10, 0, -135)
+        cache.predict(float("nan"), 0, 45, 10, 0, -45)
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        """Test clearing empties the cache and resets the counters."""
+        cache = PredictionCache()
+        cache.predict(*THROWS)
+        cache.predict(*THROWS)
+        cache.clear()
+        self.assertEqual(cache.info(), CacheInfo(0, 0, 1024, 0))
+
+    def test_invalid_size_raises(self):
+        """Test a cache must hold at least one entry."""
+        with self.assertRaises(ValueError):
+            PredictionCache(0)
+
+    def test_server_uses_cache(self):
+        """Test the server answers repeated requests from the cache."""
+        cache = PredictionCache()
+        line = json.dumps(dict(zip(
+            ("x1", "z1", "theta1", "x2", "z2", "theta2"), THROWS
+        )))
+        for _ in range(3):
+            self.assertEqual(
+                handle_line(line, cache), {"x": -1564.75, "z": -566.13}
+            )
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+from endtrace import predict_stronghold
+from utils.multithrow import *
+from utils.validators import AngleError
+
+
+class TestMultiThrowSolver(unittest.TestCase):
+    """Tests for the incremental least-squares multi-throw solver."""
+
+    @patch("builtins.print")
+    def test_two_throws_match_predict_stronghold(self, mock_print):
+        """Test that two throws reproduce the closed-form prediction."""
+        throws = [(0.586, 0.512, 109.9), (-350.193, 0.226, 115)]
+        expected = predict_stronghold(*throws[0], *throws[1])
+
+        prediction = MultiThrowSolver(throws).solve()
+        self.assertAlmostEqual(prediction.x, expected[0], places=2)
+        self.assertAlmostEqual(prediction.z, expected[1], places=2)
+        self.assertAlmostEqual(prediction.residual, 0.0, places=3)
+        self.assertEqual(prediction.throws, 2)
+
+    def test_consistent_throws_converge(self):
+        """
+        Test that several throws all pointing at (0, 0) give (0, 0) with
+        a near-zero residual.
+        """
+        solver = MultiThrowSolver()
+        solver.add_throw(10, -10, 45)
+        solver.add_throw(-10, -10, -45)
+        solver.add_throw(0, -100, 0)
+        solver.add_throw(100, 0, 90)
+
+        prediction = solver.solve()
+        self.assertAlmostEqual(prediction.x, 0.0)
+        self.assertAlmostEqual(prediction.z, 0.0)
+        self.assertAlmostEqual(prediction.residual, 0.0)
+        self.assertEqual(len(solver), 4)
+
+    def test_incremental_updates_refine_estimate(self):
+        """Test that adding a throw updates the estimate and residual."""
+        solver = MultiThrowSolver([(10, -10, 45), (-10, -10, -45)])
+        first = solver.solve()
+
+        # this throw misses (0, 0) by 10 blocks
+        solver.add_throw(10, -100, 0)
+        second = solver.solve()
+
+        self.assertNotEqual((first.x, first.z), (second.x, second.z))
+        self.assertGreater(second.residual, 0.0)
+        self.assertEqual(second.throws, 3)
+
+    def test_too_few_throws_raises(self):
+        """Test that solving with fewer than two throws raises."""
+        solver = MultiThrowSolver([(0, 0, 45)])
+        with self.assertRaises(ValueError):
+            solver.solve()
+
+    def test_parallel_throws_raise(self):
+        """Test that all-parallel throws raise an AngleError."""
+        solver = MultiThrowSolver([(0, 0, 45), (10, 0, 45), (20, 0, -135)])
+        with self.assertRaises(AngleError):
+            solver.solve()
+
+    def test_out_of_bounds_angle_raises(self):
+        """Test that an out of bounds angle raises an AngleError."""
+        with self.assertRaises(AngleError):
+            MultiThrowSolver().add_throw(0, 0, 181)
+
+    def test_reset_clears_throws(self):
+        """Test that reset forgets all throws."""
+        solver = MultiThrowSolver([(10, -10, 45), (-10, -10, -45)])
+        solver.reset()
+        self.assertEqual(len(solver), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
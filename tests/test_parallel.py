@@ -0,0 +1,206 @@
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from utils.parallel import *
+from utils.stream import stream_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rows(count, seed=0):
+    """Random CSV throw rows with a few invalid ones mixed in."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if i % 97 == 5:
+            rows.append("a,b,c,d,e,f\n")
+        elif i % 89 == 3:
+            rows.append("0,0,45,10,0,-135\n")
+        else:
+            rows.append(",".join([
+                f"{rng.uniform(-1000, 1000):.3f}",
+                f"{rng.uniform(-1000, 1000):.3f}",
+                str(rng.randint(-1800, 1800)/10),
+                f"{rng.uniform(-1000, 1000):.3f}",
+                f"{rng.uniform(-1000, 1000):.3f}",
+                str(rng.randint(-1800, 1800)/10)
+            ]) + "\n")
+    return rows
+
+
+def _located(report, path):
+    """Rewrites stream_file's "line N: ..." reports as "path:N: ..."."""
+    return "".join(
+        f"{path}:{line[len('line '):]}" for line in report.splitlines(True)
+    )
+
+
+class _FailingOutput(io.StringIO):
+    """An output that fails on the first write after the header."""
+
+    def write(self, text):
+        if self.tell():
+            raise OSError("disk full")
+        return super().write(text)
+
+
+class TestParallel(unittest.TestCase):
+    """Tests for the multi-process batch runner."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, lines):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="") as f:
+            f.writelines(lines)
+        return path
+
+    def test_shards_start_at_line_boundaries(self):
+        """
+        Test shards cover the whole file without gaps and each starts at
+        the beginning of a line.
+        """
+        path = self._write("throws.csv", _rows(500))
+        shards = plan_shards([path], "csv", shard_bytes=1000)
+        self.assertGreater(len(shards), 10)
+
+        with open(path, "rb") as f:
+            data = f.read()
+        self.assertEqual(shards[0].start, 0)
+        self.assertEqual(shards[-1].end, len(data))
+        for previous, shard in zip(shards, shards[1:]):
+            self.assertEqual(previous.end, shard.start)
+            self.assertEqual(data[shard.start - 1:shard.start], b"\n")
+        self.assertEqual([s.index for s in shards], list(range(len(shards))))
+
+    def test_matches_stream(self):
+        """
+        Test the parallel output and error reports match streaming the
+        same files one after another, headers included.
+        """
+        first = self._write(
+            "first.csv", ["theta1,theta2,x1,z1,x2,z2\n", "45,-45,10,-10,-10,-10\n"]
+        )
+        second = self._write("second.csv", _rows(2000))
+
+        out, err = io.StringIO(), io.StringIO()
+        stats = run_batch(
+            [first, second], out, "csv", workers=2, shard_bytes=4096, err=err
+        )
+
+        expected_out, first_err = io.StringIO(), io.StringIO()
+        with open(first, newline="") as f:
+            stream_file(f, expected_out, "csv", first_err)
+        with open(second, newline="") as f:
+            lines = ["\n"]*2 + f.readlines()
+        second_out = io.StringIO()
+        expected = stream_file(lines, second_out, "csv", io.StringIO())
+
+        # errors are numbered within their own file
+        second_err = io.StringIO()
+        with open(second, newline="") as f:
+            stream_file(f, io.StringIO(), "csv", second_err)
+
+        self.assertEqual(
+            out.getvalue(),
+            expected_out.getvalue() + second_out.getvalue()[len("line,x,z\n"):]
+        )
+        self.assertEqual(
+            err.getvalue(),
+            _located(first_err.getvalue(), first)
+            + _located(second_err.getvalue(), second)
+        )
+        self.assertIn(f"{second}:6: ProtocolError", err.getvalue())
+        self.assertEqual(stats.rows, expected.rows + 1)
+        self.assertEqual(stats.errors, expected.errors)
+        self.assertEqual(sum(w.rows for w in stats.workers), stats.rows)
+        self.assertEqual(sum(w.shards for w in stats.workers), len(
+            plan_shards([first, second], "csv", 4096)
+        ))
+
+    def test_header_after_blank_lines(self):
+        """Test later shards use a header that follows blank lines."""
+        # reorder x1,z1,theta1,x2,z2,theta2 rows to match the header
+        rows = [
+            ",".join(row.strip().split(",")[i] for i in (2, 5, 0, 1, 3, 4))
+            + "\n"
+            for row in _rows(300)
+        ]
+        path = self._write(
+            "throws.csv", ["\n", "\n", "theta1,theta2,x1,z1,x2,z2\n"] + rows
+        )
+        self.assertEqual(
+            plan_shards([path], "csv", 1024)[1].order, [2, 3, 0, 4, 5, 1]
+        )
+
+        out, err = io.StringIO(), io.StringIO()
+        run_batch([path], out, "csv", workers=2, shard_bytes=1024, err=err)
+        expected_out, expected_err = io.StringIO(), io.StringIO()
+        with open(path, newline="") as f:
+            stream_file(f, expected_out, "csv", expected_err)
+        self.assertEqual(out.getvalue(), expected_out.getvalue())
+        self.assertEqual(
+            err.getvalue(), _located(expected_err.getvalue(), path)
+        )
+
+    def test_jsonl(self):
+        """Test JSONL input is answered with JSONL output."""
+        request = {
+            "x1": 10, "z1": -10, "theta1": 45,
+            "x2": -10, "z2": -10, "theta2": -45
+        }
+        path = self._write(
+            "throws.jsonl", [json.dumps(request) + "\n", "{bad\n"]*50
+        )
+        out, err = io.StringIO(), io.StringIO()
+        stats = run_batch([path], out, "jsonl", 2, shard_bytes=256, err=err)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[0], {"line": 1, "x": 0.0, "z": 0.0})
+        self.assertEqual([r["line"] for r in records], list(range(1, 100, 2)))
+        self.assertEqual((stats.rows, stats.errors), (100, 50))
+        self.assertTrue(
+            err.getvalue().startswith(f"{path}:2: ProtocolError")
+        )
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    def test_failed_merge_unlinks_shared_memory(self):
+        """
+        Test shards that finished but were never merged do not leave their
+        shared memory behind when the parent fails.
+        """
+        path = self._write("throws.csv", _rows(2000))
+        before = set(os.listdir("/dev/shm"))
+        with self.assertRaises(OSError):
+            run_batch(
+                [path], _FailingOutput(), "csv", workers=2, shard_bytes=2048,
+                err=io.StringIO()
+            )
+        self.assertEqual(set(os.listdir("/dev/shm")) - before, set())
+
+    def test_batch_command_reports_worker_throughput(self):
+        """Test `endtrace batch` writes predictions and per-worker rows/s."""
+        path = self._write("throws.csv", _rows(300))
+        proc = subprocess.run(
+            [sys.executable, "endtrace.py", "batch", path, "--workers", "2"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+
+        self.assertEqual(proc.returncode, 0)
+        self.assertEqual(proc.stdout.splitlines()[0], "line,x,z")
+        self.assertIn("processed 300 rows", proc.stderr)
+        self.assertIn("worker", proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
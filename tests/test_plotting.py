@@ -0,0 +1,114 @@
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from endtrace import predict_stronghold, solve_stronghold
+from utils.plotting import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestPlotting(unittest.TestCase):
+    """Tests for the lazily loaded matplotlib visualization."""
+
+    def test_import_endtrace_does_not_load_matplotlib(self):
+        """Test that importing endtrace leaves matplotlib unloaded."""
+        code = "import endtrace, sys; print('matplotlib' in sys.modules)"
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        self.assertEqual(proc.stdout.strip(), "False")
+
+    @patch("utils.plotting.plt.show")
+    @patch("builtins.print")
+    def test_graph_uses_plotting_module(self, mock_print, mock_show):
+        """Test that graph=True renders through utils.plotting."""
+        theta1 = math.radians(60)
+        theta2 = math.radians(120)
+        predict_stronghold(0, 0, theta1, 100, 0, theta2, graph=True)
+        mock_show.assert_called_once()
+
+
+
+class TestGraphRenderer(unittest.TestCase):
+    """Tests for headless rendering to image files."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.prediction = solve_stronghold(
+            0.586, 0.512, 109.9, -350.193, 0.226, 115
+        )
+
+    def test_png_and_svg(self):
+        """Test the format follows the file extension."""
+        renderer = GraphRenderer()
+        png = os.path.join(self.tmp.name, "graph.png")
+        svg = os.path.join(self.tmp.name, "graph.svg")
+        renderer.render(self.prediction, png)
+        renderer.render(self.prediction, svg)
+
+        with open(png, "rb") as f:
+            self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+        with open(svg) as f:
+            self.assertIn("<svg", f.read())
+
+    def test_figure_is_reused(self):
+        """
+        Test rendering many predictions keeps the same artists, follows
+        each prediction and never opens a pyplot figure.
+        """
+        renderer = GraphRenderer()
+        other = solve_stronghold(1000, 2000, 10, 900, 2100, 30)
+        paths = [
+            os.path.join(self.tmp.name, f"{i}.png") for i in range(3)
+        ]
+        lines = list(renderer.figure.axes[0].lines)
+        figures = plt.get_fignums()
+
+        count = renderer.render_many(
+            [self.prediction, other, self.prediction], paths
+        )
+
+        self.assertEqual(count, 3)
+        self.assertTrue(all(os.path.getsize(path) for path in paths))
+        ax = renderer.figure.axes[0]
+        self.assertEqual(list(ax.lines), lines)
+        self.assertTrue(ax.yaxis_inverted())
+        self.assertEqual(plt.get_fignums(), figures)
+
+        renderer.render(other, paths[0])
+        x_min, x_max = ax.get_xlim()
+        self.assertTrue(x_min < other.x < x_max)
+        self.assertIn(
+            f"({other.rounded_x}, {other.rounded_z})",
+            ax.get_legend().get_texts()[2].get_text()
+        )
+
+    def test_graph_out_command(self):
+        """Test --graph-out saves the graph and still prints."""
+        path = os.path.join(self.tmp.name, "graph.svg")
+        proc = subprocess.run(
+            [
+                sys.executable, "endtrace.py",
+                "0.586", "0.512", "109.9", "-350.193", "0.226", "115",
+                "--graph-out", path
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        self.assertIn("predicted stronghold coords", proc.stdout)
+        self.assertTrue(os.path.getsize(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
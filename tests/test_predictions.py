@@ -1,7 +1,17 @@
 import unittest
 import math
+import random
 from unittest.mock import patch
-from endtrace import _transform_minecraft_angle_to_cartesian_rads, predict_stronghold
+from endtrace import (
+    _ANGLE_TABLE,
+    _DIRECTION_TABLE,
+    _compute_cartesian_rads,
+    _transform_minecraft_angle_to_cartesian_rads,
+    predict_stronghold,
+    solve_stronghold,
+    solve_stronghold_fast
+)
+from utils.validators import AngleError
 
 def _normalize_angle_rad(theta: float) -> float:
     """
@@ -138,6 +148,107 @@ class TestPredictions(unittest.TestCase):
         self.assertIn("x=0.0", printed)
         self.assertIn("z=0.0", printed)
 
+    @patch("builtins.print")
+    def test_solve_stronghold_is_pure(self, mock_print):
+        """
+        Test that solve_stronghold returns the same coords as
+        predict_stronghold without printing anything.
+        """
+        prediction = solve_stronghold(0.586, 0.512, 109.9, -350.193, 0.226, 115)
+        mock_print.assert_not_called()
+
+        self.assertEqual(
+            (prediction.rounded_x, prediction.rounded_z),
+            (-1564.75, -566.13)
+        )
+        self.assertEqual(
+            predict_stronghold(0.586, 0.512, 109.9, -350.193, 0.226, 115),
+            (prediction.rounded_x, prediction.rounded_z)
+        )
+
+    def test_solve_stronghold_lines_pass_through_prediction(self):
+        """
+        Test that both returned lines (z = m*x + b) pass through the
+        unrounded prediction.
+        """
+        p = solve_stronghold(10, -10, 30, -10, -10, -60)
+        self.assertAlmostEqual(p.m1*p.x + p.b1, p.z)
+        self.assertAlmostEqual(p.m2*p.x + p.b2, p.z)
+
+    def test_solve_stronghold_cleans_negative_zero(self):
+        """Test that the rounded coords never contain -0.0."""
+        p = solve_stronghold(10, -10, 45, -10, -10, -45)
+        self.assertEqual(str(p.rounded_x), "0.0")
+        self.assertEqual(str(p.rounded_z), "0.0")
+
+    def test_angle_table_matches_direct_transform(self):
+        """
+        Test every F3 angle gives the same result from the table as when
+        computed directly, and that only F3 angles are tabled.
+        """
+        for step in range(-1800, 1801):
+            theta = step/10
+            # the first call fills the table, the second reads from it
+            self.assertEqual(
+                _transform_minecraft_angle_to_cartesian_rads(theta),
+                _compute_cartesian_rads(theta)
+            )
+            self.assertEqual(
+                _transform_minecraft_angle_to_cartesian_rads(theta),
+                _compute_cartesian_rads(theta)
+            )
+        self.assertEqual(
+            _transform_minecraft_angle_to_cartesian_rads(45.25),
+            _compute_cartesian_rads(45.25)
+        )
+        self.assertNotIn(45.25, _ANGLE_TABLE)
+        self.assertLessEqual(len(_ANGLE_TABLE), 3601)
+
+    def test_fast_path_matches_solve_stronghold(self):
+        """
+        Test solve_stronghold_fast returns exactly solve_stronghold's
+        unrounded coords, for F3 angles (from the table) and any others.
+        """
+        rng = random.Random(0)
+        for _ in range(2000):
+            digits = rng.choice((1, 2))
+            throws = (
+                rng.uniform(-5000, 5000), rng.uniform(-5000, 5000),
+                round(rng.uniform(-180, 180), digits),
+                rng.uniform(-5000, 5000), rng.uniform(-5000, 5000),
+                round(rng.uniform(-180, 180), digits)
+            )
+            try:
+                expected = solve_stronghold(*throws)
+            except AngleError:
+                with self.assertRaises(AngleError):
+                    solve_stronghold_fast(*throws)
+                continue
+            # twice, so the second call reads the table
+            for _ in range(2):
+                self.assertEqual(
+                    solve_stronghold_fast(*throws), (expected.x, expected.z)
+                )
+
+        for theta in (0, -180, 180):
+            self.assertEqual(
+                solve_stronghold_fast(10, -10, theta, -10, -10, -45),
+                solve_stronghold(10, -10, theta, -10, -10, -45)[:2]
+            )
+        solve_stronghold_fast(0.586, 0.512, 109.9, -350.193, 0.226, 45.25)
+        self.assertIn(109.9, _DIRECTION_TABLE)
+        self.assertNotIn(45.25, _DIRECTION_TABLE)
+        self.assertLessEqual(len(_DIRECTION_TABLE), 3601)
+
+    def test_fast_path_rejects_parallel_throws(self):
+        """Test parallel and NaN angles raise like solve_stronghold."""
+        with self.assertRaises(AngleError):
+            solve_stronghold_fast(0, 0, 45, 10, 0, -135)
+        with self.assertRaises(AngleError):
+            solve_stronghold_fast(0, 0, 45, 10, 0, 45)
+        with self.assertRaises(AngleError):
+            solve_stronghold_fast(0, 0, math.nan, 10, 0, 45)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from endtrace import solve_stronghold
+from utils import profiling
+from utils.cache import PredictionCache
+from utils.profiling import *
+from utils.validators import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THROW = (0.586, 0.512, 109.9, -350.193, 0.226, 115)
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for the opt-in stage timings and counters."""
+
+    def test_disabled_by_default(self):
+        """Test nothing is recorded outside of profile()."""
+        with profile() as profiler:
+            pass
+        solve_stronghold(*THROW)
+        self.assertIsNone(profiling.active)
+        self.assertEqual(profiler.stages, {})
+        self.assertEqual(profiler.counters, {})
+
+    def test_stages_and_counters(self):
+        """
+        Test solving records its stages and counts predictions, parallel
+        throws, validation failures by type and cache hits.
+        """
+        cache = PredictionCache()
+        with profile() as profiler:
+            solve_stronghold(*THROW)
+            cache.predict(*THROW)
+            cache.predict(*THROW)
+            with self.assertRaises(AngleError):
+                solve_stronghold(0, 0, 45, 10, 0, -135)
+            for args in ((0, 0, 0, 0), (1, 2, 1, 3)):
+                try:
+                    validate_coords(*args)
+                except CoordsError:
+                    pass
+            with self.assertRaises(AngleError):
+                validate_angles(10, 10)
+
+        self.assertEqual(profiler.stages["solve"].calls, 2)
+        self.assertEqual(profiler.stages["angle_conversion"].calls, 3)
+        self.assertGreater(profiler.stages["solve"].seconds, 0)
+        self.assertEqual(profiler.counters, {
+            ("predictions", ()): 2,
+            ("cache_misses", ()): 1,
+            ("cache_hits", ()): 1,
+            ("parallel_throws", ()): 1,
+            ("validation_failures", (("error", "CoordsError"),)): 1,
+            ("validation_failures", (("error", "AngleError"),)): 1
+        })
+
+    def test_nested_profiles(self):
+        """Test profile() restores the previous profiler."""
+        with profile() as outer:
+            with profile() as inner:
+                solve_stronghold(*THROW)
+            solve_stronghold(*THROW)
+            self.assertIs(profiling.active, outer)
+        self.assertEqual(inner.stages["solve"].calls, 1)
+        self.assertEqual(outer.stages["solve"].calls, 1)
+
+    def test_exports(self):
+        """Test the JSON and Prometheus exports."""
+        profiler = Profiler()
+        profiler.record("solve", 0.5)
+        profiler.record("solve", 1.5)
+        profiler.count("validation_failures", labels=(("error", 'a"b'),))
+
+        data = json.loads(profiler.export("json"))
+        self.assertEqual(data["stages"]["solve"]["calls"], 2)
+        self.assertEqual(data["stages"]["solve"]["mean_seconds"], 1.0)
+        self.assertEqual(data["counters"], [{
+            "name": "validation_failures",
+            "labels": {"error": 'a"b'},
+            "value": 1
+        }])
+
+        lines = profiler.export("prometheus").splitlines()
+        self.assertIn('endtrace_stage_seconds_total{stage="solve"} 2.0', lines)
+        self.assertIn('endtrace_stage_calls_total{stage="solve"} 2', lines)
+        self.assertIn("# TYPE endtrace_validation_failures_total counter", lines)
+        self.assertIn(
+            'endtrace_validation_failures_total{error="a\\"b"} 1', lines
+        )
+
+        with self.assertRaises(ValueError):
+            profiler.export("xml")
+
+    def test_profile_command(self):
+        """Test --profile writes every stage of a prediction to stderr."""
+        proc = subprocess.run(
+            [
+                sys.executable, "endtrace.py", *map(str, THROW),
+                "--profile", "--profile-format", "json"
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        self.assertTrue(proc.stdout.startswith("predicted stronghold coords"))
+        stages = json.loads(proc.stderr)["stages"]
+        self.assertEqual(
+            list(stages),
+            ["parse", "validate", "angle_conversion", "solve", "format"]
+        )
+
+    def test_profile_counts_one_prediction(self):
+        """
+        Test --uncertainty and --rings reuse the prediction rather than
+        solving the throws again.
+        """
+        proc = subprocess.run(
+            [
+                sys.executable, "endtrace.py", "0", "0", "-135", "100", "0",
+                "135", "-u", "-r", "--profile", "--profile-format", "json"
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        data = json.loads(proc.stderr)
+        self.assertEqual(data["stages"]["solve"]["calls"], 1)
+        self.assertEqual(data["counters"], [
+            {"name": "predictions", "labels": {}, "value": 1}
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
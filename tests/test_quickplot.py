@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from endtrace import solve_stronghold
+from utils.quickplot import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class TestQuickPlot(unittest.TestCase):
+    """Tests for the dependency-free SVG and terminal graphs."""
+
+    def setUp(self):
+        self.prediction = solve_stronghold(
+            0.586, 0.512, 109.9, -350.193, 0.226, 115
+        )
+
+    def test_svg(self):
+        """Test the SVG is well-formed and holds the throws and prediction."""
+        root = ET.fromstring(render_svg(self.prediction))
+        self.assertEqual(root.tag, SVG + "svg")
+
+        strokes = [line.get("stroke") for line in root.iter(SVG + "line")]
+        self.assertEqual(strokes.count("#316364"), 2)  # plot and legend
+        self.assertEqual(strokes.count("#659B7D"), 2)
+        texts = [text.text for text in root.iter(SVG + "text")]
+        self.assertIn("endtrace visualization", texts)
+        self.assertIn("throw1: z = 0.36x + 0.3", texts)
+        self.assertIn("stronghold prediction: (-1564.75, -566.13)", texts)
+
+    def test_terminal(self):
+        """
+        Test the terminal plot has the requested size, marks the prediction
+        in the middle and only uses ANSI escapes when asked to.
+        """
+        plot = render_terminal(self.prediction, width=40, height=10)
+        lines = plot.splitlines()
+        rows = lines[1:11]
+        self.assertEqual(len(lines), 1 + 10 + 2 + 3)
+        self.assertEqual(len({len(row) for row in rows}), 1)
+        self.assertTrue(all(row[-41] in "┤│" for row in rows))
+
+        marked = [i for i, row in enumerate(rows) if "●" in row]
+        self.assertEqual(len(marked), 1)
+        self.assertIn(marked[0], (4, 5))
+        self.assertNotIn("\033[", plot)
+        self.assertIn("\033[", render_terminal(self.prediction, color=True))
+
+    def test_save_graph_backends(self):
+        """Test .svg files skip matplotlib unless it is asked for."""
+        code = (
+            "import sys; from endtrace import solve_stronghold; "
+            "from utils.quickplot import save_graph; "
+            "save_graph(solve_stronghold(0, 0, 45, 10, 0, -45), sys.argv[1]); "
+            "print('matplotlib' in sys.modules)"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.svg")
+            proc = subprocess.run(
+                [sys.executable, "-c", code, path],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            self.assertEqual(proc.stdout.strip(), "False")
+            self.assertTrue(os.path.getsize(path))
+
+            with self.assertRaises(ValueError):
+                save_graph(
+                    self.prediction, os.path.join(tmp, "graph.png"), "builtin"
+                )
+
+    def test_terminal_graph_command(self):
+        """Test -t prints the prediction followed by the terminal plot."""
+        proc = subprocess.run(
+            [
+                sys.executable, "endtrace.py",
+                "0.586", "0.512", "109.9", "-350.193", "0.226", "115", "-t"
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        lines = proc.stdout.splitlines()
+        self.assertTrue(lines[0].startswith("predicted stronghold coords"))
+        self.assertIn("endtrace visualization", lines[1])
+        self.assertIn("●", proc.stdout)
+        self.assertNotIn("\033[", proc.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import math
+import unittest
+import numpy as np
+from utils.rings import *
+from utils.validators import AngleError
+
+
+def _yaw(px, pz, tx, tz):
+    """Minecraft angle (rounded like the F3 screen) from p towards t."""
+    return round(math.degrees(math.atan2(-(tx - px), tz - pz)), 1)
+
+
+class TestRings(unittest.TestCase):
+    """Tests for the stronghold ring prior and candidate index."""
+
+    def test_ring_layout(self):
+        """Test the ring sizes and distances of the stronghold placement."""
+        self.assertEqual(
+            [ring.count for ring in RINGS],
+            [3, 6, 10, 15, 21, 28, 36, 9]
+        )
+        self.assertEqual(RINGS[6].slots, 36)
+        self.assertEqual(RINGS[7].slots, 10)
+        self.assertEqual((RINGS[0].inner, RINGS[0].outer), (1296.0, 2800.0))
+        self.assertEqual(ring_of(2000).index, 0)
+        self.assertEqual(ring_of(5000).index, 1)
+        self.assertIsNone(ring_of(500))
+        self.assertIsNone(ring_of(3500))
+
+    def test_ring_cells_cover_annulus(self):
+        """
+        Test that a ring's index holds every chunk inside the annulus
+        exactly once, sorted by polar angle.
+        """
+        ring = RINGS[0]
+        cells = ring_cells(0)
+        x = cells.chunk_x*16 + 8.0
+        z = cells.chunk_z*16 + 8.0
+        dist = np.hypot(x, z)
+
+        self.assertTrue(((dist >= ring.inner) & (dist <= ring.outer)).all())
+        self.assertTrue((np.diff(cells.angle) >= 0).all())
+
+        keys = set(zip(cells.chunk_x.tolist(), cells.chunk_z.tolist()))
+        self.assertEqual(len(keys), len(cells.angle))
+        area = math.pi*(ring.outer**2 - ring.inner**2)/256
+        self.assertAlmostEqual(len(keys)/area, 1.0, places=2)
+
+    def test_ring_cells_are_cached(self):
+        """Test that the index is only built once per ring."""
+        self.assertIs(ring_cells(1), ring_cells(1))
+
+    def test_two_throws_rank_true_chunk_first(self):
+        """Test two throws at a known chunk rank that chunk first."""
+        tx, tz = 93*16 + 8, -57*16 + 8
+        throws = [
+            (0, 0, _yaw(0, 0, tx, tz)),
+            (200, 300, _yaw(200, 300, tx, tz))
+        ]
+        candidates = rank_candidates(throws)
+
+        best = candidates[0]
+        self.assertEqual((best.chunk_x, best.chunk_z), (93, -57))
+        self.assertEqual(best.ring, 0)
+        probs = [c.probability for c in candidates]
+        self.assertEqual(probs, sorted(probs, reverse=True))
+        self.assertLessEqual(sum(probs), 1.0 + 1e-9)
+
+    def test_candidates_stay_inside_rings(self):
+        """Test that every candidate lies inside a ring."""
+        throws = [(0.586, 0.512, 109.9), (-350.193, 0.226, 115)]
+        for candidate in rank_candidates(throws, limit=50):
+            distance = math.hypot(candidate.x, candidate.z)
+            self.assertIsNotNone(ring_of(distance))
+
+    def test_ray_wrapping_around_pi(self):
+        """
+        Test a throw pointing along -x (polar angle +-pi) still finds the
+        chunks on both sides of the wrap.
+        """
+        candidates = rank_candidates([(0, 8, 90)], limit=1000)
+        self.assertTrue(candidates)
+        self.assertTrue(all(c.x < 0 for c in candidates))
+        self.assertTrue(any(c.chunk_z < 0 for c in candidates))
+        self.assertTrue(any(c.chunk_z >= 0 for c in candidates))
+
+    def test_nearer_strongholds_table(self):
+        """
+        Test the expected number of nearer strongholds seen from the
+        origin: none before the first ring, all 3 of it after, all 128 at
+        the edge of the map.
+        """
+        table = nearer_strongholds_table()
+        self.assertEqual(table[0, 0], 0.0)
+        self.assertAlmostEqual(table[0, 1024//NEARER_STEP], 0.0)
+        self.assertAlmostEqual(table[0, 3072//NEARER_STEP], 3.0, places=6)
+        self.assertAlmostEqual(table[0, -1], 128.0, places=6)
+        self.assertTrue((np.diff(table, axis=1) >= -1e-9).all())
+
+    def test_single_throw_from_origin(self):
+        """
+        Test a single throw from the origin puts almost all probability on
+        the first ring, in the throw's direction.
+        """
+        segments = single_throw(0, 0, -121.1)
+        self.assertEqual(len(segments), len(RINGS))
+        self.assertAlmostEqual(sum(s.probability for s in segments), 1.0)
+
+        # plain Python numbers, as they end up in reprs and JSON
+        for segment in segments:
+            self.assertIs(type(segment.ring), int)
+            self.assertEqual({type(value) for value in segment[1:]}, {float})
+
+        best = segments[0]
+        self.assertEqual(best.ring, 0)
+        self.assertGreater(best.probability, 0.9)
+
+        # -121.1 degrees points towards +x and -z
+        self.assertGreater(best.x, 0)
+        self.assertLess(best.z, 0)
+        distance = math.hypot(best.x, best.z)
+        self.assertTrue(RINGS[0].inner <= distance <= RINGS[0].outer)
+
+    def test_single_throw_inside_a_ring(self):
+        """
+        Test a throw from inside the first ring splits the ray into the
+        part ahead of it and the far side of the ring.
+        """
+        segments = single_throw(2000, 0, 90)
+        self.assertEqual(
+            (segments[0].ring, segments[0].start_x, segments[0].end_x),
+            (0, 2000.0, 1296.0)
+        )
+        self.assertTrue(all(s.end_x < 2000 for s in segments))
+
+    def test_single_throw_missing_every_ring(self):
+        """Test a throw pointing away from every ring returns nothing."""
+        self.assertEqual(single_throw(30000, 0, -90), [])
+
+    def test_no_throws_raises(self):
+        """Test that ranking without throws raises a ValueError."""
+        with self.assertRaises(ValueError):
+            rank_candidates([])
+
+    def test_out_of_bounds_angle_raises(self):
+        """Test that an out of bounds angle raises an AngleError."""
+        with self.assertRaises(AngleError):
+            rank_candidates([(0, 0, 200)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import math
+import unittest
+import numpy as np
+from utils.multithrow import MultiThrowSolver
+from utils.robust import *
+from utils.validators import AngleError
+
+TARGET = (-1500.0, 800.0)
+
+
+def _session(rng, count=20, outliers=(3, 7, 11), noise=0.05):
+    """Throws aimed at TARGET with a little noise and a few bad ones."""
+    x = rng.uniform(-300, 300, count)
+    z = rng.uniform(-300, 300, count)
+    yaw = np.degrees(np.arctan2(x - TARGET[0], TARGET[1] - z))
+    yaw += rng.normal(0, noise, count)
+    for i in outliers:
+        yaw[i] += rng.choice([-1, 1])*rng.uniform(5, 20)
+    return x, z, (yaw + 180) % 360 - 180
+
+
+class TestRobustFusion(unittest.TestCase):
+    """Tests for outlier-robust fusion of many throws."""
+
+    def test_rejects_outliers(self):
+        """
+        Test every method rejects exactly the bad throws and lands near the
+        stronghold, where least squares is dragged hundreds of blocks off.
+        """
+        throws = list(zip(*_session(np.random.default_rng(1))))
+        least_squares = MultiThrowSolver(throws).solve()
+        self.assertGreater(
+            math.dist((least_squares.x, least_squares.z), TARGET), 100
+        )
+
+        for method in METHODS:
+            with self.subTest(method=method):
+                fusion = robust_fuse(throws, method=method)
+                self.assertEqual(fusion.rejected, (3, 7, 11))
+                self.assertEqual(fusion.throws, 17)
+                self.assertLess(math.dist((fusion.x, fusion.z), TARGET), 15)
+                self.assertLess(fusion.residual, 5)
+
+    def test_sessions_match_single_fusion(self):
+        """
+        Test fusing many sessions at once (in several chunks, with ragged
+        sessions) matches fusing each on its own.
+        """
+        rng = np.random.default_rng(2)
+        sessions = [_session(rng, outliers=(i % 5,)) for i in range(50)]
+        x, z, theta = (np.array([s[i] for s in sessions]) for i in range(3))
+        valid = np.ones(x.shape, dtype=bool)
+        valid[::3, -4:] = False
+
+        import utils.robust
+        chunk = utils.robust._CHUNK_ELEMENTS
+        utils.robust._CHUNK_ELEMENTS = 190*20*7
+        self.addCleanup(setattr, utils.robust, "_CHUNK_ELEMENTS", chunk)
+        result = fuse_throws(x, z, theta, valid)
+
+        for i in range(0, 50, 7):
+            throws = [
+                (x[i, j], z[i, j], theta[i, j])
+                for j in range(20) if valid[i, j]
+            ]
+            fusion = robust_fuse(throws)
+            self.assertAlmostEqual(result.x[i], fusion.x, places=6)
+            self.assertAlmostEqual(result.z[i], fusion.z, places=6)
+            self.assertEqual(
+                tuple(np.flatnonzero(~result.inliers[i][valid[i]])),
+                fusion.rejected
+            )
+        self.assertFalse(result.degenerate.any())
+
+    def test_degenerate_sessions(self):
+        """
+        Test sessions without two agreeing, non-parallel throws are
+        flagged, and robust_fuse raises for them.
+        """
+        result = fuse_throws(
+            [[0, 10, 20], [0, 10, np.nan]],
+            [[0, 0, 0], [0, 0, 0]],
+            [[45, 45, 45], [-45, 45, 0]]
+        )
+        self.assertEqual(result.degenerate.tolist(), [True, False])
+        self.assertTrue(np.isnan(result.x[0]))
+        self.assertEqual(result.inliers[1].tolist(), [True, True, False])
+
+        with self.assertRaises(AngleError):
+            robust_fuse([(0, 0, 45), (10, 0, 45)])
+        with self.assertRaises(ValueError):
+            fuse_throws([0, 1], [0, 1], [0, 1], method="median")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from endtrace import (
+    _transform_cartesian_rads_to_minecraft_angle,
+    _transform_minecraft_angle_to_cartesian_rads
+)
+from utils.batch import plan_routes, round_routes
+from utils.binary import replay_file, write_throws
+from utils.parallel import run_batch
+from utils.route import *
+from utils.stream import stream_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestRoute(unittest.TestCase):
+    """Tests for Nether coords and travel routes."""
+
+    def test_example(self):
+        """Test the route from the README example's second throw."""
+        route = plan_route(-1564.75, -566.13, -350.193, 0.226)
+        self.assertEqual(
+            round_route(route), (-195.59, -70.77, 115.0, 1340.1)
+        )
+        self.assertEqual((route.x, route.z), (-1564.75, -566.13))
+
+    def test_inverse_angle_transform(self):
+        """Test converting back to Minecraft angles undoes the forward one."""
+        for theta in np.arange(-180, 180, 0.1):
+            phi = _transform_minecraft_angle_to_cartesian_rads(theta)
+            self.assertAlmostEqual(
+                _transform_cartesian_rads_to_minecraft_angle(phi), theta,
+                places=9
+            )
+
+    def test_cardinal_directions(self):
+        """Test the yaw matches Minecraft's (south 0, west 90)."""
+        self.assertAlmostEqual(plan_route(0, 100, 0, 0).yaw, 0)
+        self.assertAlmostEqual(plan_route(-100, 0, 0, 0).yaw, 90)
+        self.assertAlmostEqual(plan_route(100, 0, 0, 0).yaw, -90)
+        self.assertAlmostEqual(abs(plan_route(0, -100, 0, 0).yaw), 180)
+
+    def test_vectorized_matches_scalar(self):
+        """Test plan_routes rounds to the same values as plan_route."""
+        rng = np.random.default_rng(0)
+        x, z, from_x, from_z = rng.uniform(-5000, 5000, (4, 2000))
+        columns = round_routes(plan_routes(x, z, from_x, from_z))
+        for i in range(2000):
+            self.assertEqual(
+                tuple(float(column[i]) for column in columns),
+                round_route(plan_route(x[i], z[i], from_x[i], from_z[i]))
+            )
+
+
+class TestRouteOutput(unittest.TestCase):
+    """Tests for the --route columns of stream, replay and batch."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(1)
+        self.rows = np.column_stack([
+            rng.uniform(-1000, 1000, 300), rng.uniform(-1000, 1000, 300),
+            np.round(rng.uniform(-180, 180, 300), 1),
+            rng.uniform(-1000, 1000, 300), rng.uniform(-1000, 1000, 300),
+            np.round(rng.uniform(-180, 180, 300), 1)
+        ]).tolist()
+        self.lines = [
+            ",".join(map(repr, row)) + "\n" for row in self.rows
+        ]
+
+    def test_stream_columns(self):
+        """Test the CSV and JSONL outputs gain the route fields."""
+        out = io.StringIO()
+        stream_file(
+            ["0.586,0.512,109.9,-350.193,0.226,115\n"], out, "csv",
+            route=True
+        )
+        self.assertEqual(out.getvalue().splitlines(), [
+            "line,x,z,nether_x,nether_z,yaw,distance",
+            "1,-1564.75,-566.13,-195.59,-70.77,115.0,1340.1"
+        ])
+
+        out = io.StringIO()
+        stream_file(
+            ['{"x1": 0.586, "z1": 0.512, "theta1": 109.9, "x2": -350.193, '
+             '"z2": 0.226, "theta2": 115}\n'],
+            out, "jsonl", route=True
+        )
+        self.assertEqual(json.loads(out.getvalue()), {
+            "line": 1, "x": -1564.75, "z": -566.13, "nether_x": -195.59,
+            "nether_z": -70.77, "yaw": 115.0, "distance": 1340.1
+        })
+
+    def test_replay_and_batch_match_stream(self):
+        """Test every runner writes the same route columns."""
+        expected, err = io.StringIO(), io.StringIO()
+        stream_file(self.lines, expected, "csv", err, route=True)
+
+        etb = os.path.join(self.tmp.name, "throws.etb")
+        write_throws(etb, self.rows)
+        out = io.StringIO()
+        replay_file(etb, out, chunk_rows=64, err=io.StringIO(), route=True)
+        self.assertEqual(out.getvalue(), expected.getvalue())
+
+        path = os.path.join(self.tmp.name, "throws.csv")
+        with open(path, "w", newline="") as f:
+            f.writelines(self.lines)
+        out = io.StringIO()
+        run_batch(
+            [path], out, "csv", workers=2, shard_bytes=4096,
+            err=io.StringIO(), route=True
+        )
+        self.assertEqual(out.getvalue(), expected.getvalue())
+
+    def test_route_flag(self):
+        """Test `endtrace ... --route` prints the Nether coords and yaw."""
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "endtrace.py"),
+             "0.586", "0.512", "109.9", "-350.193", "0.226", "115", "--route"],
+            capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.splitlines()[1:], [
+            "nether coords: (x=-195.59, z=-70.77)",
+            "from your second throw: face yaw 115.0, 1340 blocks "
+            "(168 in the nether)"
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
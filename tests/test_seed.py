@@ -0,0 +1,131 @@
+import math
+import os
+import subprocess
+import sys
+import unittest
+import numpy as np
+from utils.rings import BIOME_SNAP, RINGS, STRONGHOLD_COUNT
+from utils.seed import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestJavaRandom(unittest.TestCase):
+    """Tests for the java.util.Random generator."""
+
+    def test_known_values(self):
+        """Test draws match java.util.Random for the same seeds."""
+        self.assertEqual(JavaRandom(0).next(32), -1155484576)
+        self.assertEqual(JavaRandom(42).next(32), -1170105035)
+        self.assertEqual(JavaRandom(0).next_double(), 0.730967787376657)
+        self.assertEqual(JavaRandom(42).next_double(), 0.7275636800328681)
+        self.assertEqual(JavaRandom(0).next_long(), -4962768465676381896)
+
+    def test_parse_seed(self):
+        """Test numeric seeds are kept and text is hashed like Java."""
+        self.assertEqual(parse_seed("0"), 0)
+        self.assertEqual(parse_seed("-42"), -42)
+        self.assertEqual(parse_seed(str(-(1 << 63))), -(1 << 63))
+        self.assertEqual(parse_seed("hello"), 99162322)
+        # too big for a long, so the game hashes it like any other text
+        self.assertEqual(parse_seed(str(1 << 63)), -1773151197)
+        # the game trims the text first
+        self.assertEqual(parse_seed(" 12 "), 12)
+        self.assertEqual(parse_seed("\thello\n"), 99162322)
+        for blank in ("", " \t "):
+            with self.assertRaises(ValueError):
+                parse_seed(blank)
+
+
+class TestGenerateStrongholds(unittest.TestCase):
+    """Tests for seed-based stronghold placement."""
+
+    def test_known_seed(self):
+        """Test the first ring of seed 0."""
+        strongholds = generate_strongholds(0)
+        self.assertEqual(
+            [(s.x, s.z) for s in strongholds[:3]],
+            [(-200, -1688), (1944, 840), (-1464, 1112)]
+        )
+
+    def test_rings(self):
+        """Test every stronghold lies within its ring's bounds."""
+        for seed in (0, 1, -7, parse_seed("hello")):
+            strongholds = generate_strongholds(seed)
+            self.assertEqual(len(strongholds), STRONGHOLD_COUNT)
+            self.assertEqual(
+                tuple(s.ring for s in strongholds), STRONGHOLD_RINGS
+            )
+            for s in strongholds:
+                ring = RINGS[s.ring]
+                distance = math.hypot(s.x, s.z)
+                self.assertGreaterEqual(distance, ring.inner - 32)
+                self.assertLessEqual(distance, ring.outer + 32)
+
+    def test_cached(self):
+        """Test tables are generated once per seed."""
+        generate_strongholds(12345)
+        hits = generate_strongholds.cache_info().hits
+        self.assertIs(generate_strongholds(12345), generate_strongholds(12345))
+        self.assertEqual(generate_strongholds.cache_info().hits, hits + 2)
+
+    def test_vectorized_matches_scalar(self):
+        """Test seed_strongholds agrees with generate_strongholds."""
+        seeds = [0, -1, 1 << 62, -(1 << 63)] + list(range(-50, 50, 7))
+        table = seed_strongholds(seeds)
+        self.assertEqual(table.chunk_x.shape, (len(seeds), STRONGHOLD_COUNT))
+        for row, seed in enumerate(seeds):
+            strongholds = generate_strongholds(seed)
+            self.assertEqual(
+                table.chunk_x[row].tolist(), [s.chunk_x for s in strongholds]
+            )
+            self.assertEqual(
+                table.chunk_z[row].tolist(), [s.chunk_z for s in strongholds]
+            )
+        self.assertEqual(seed_strongholds(np.array([], dtype=np.int64))
+                         .chunk_x.shape, (0, STRONGHOLD_COUNT))
+
+
+class TestSnapPrediction(unittest.TestCase):
+    """Tests for snapping predictions onto a seed's strongholds."""
+
+    def test_snaps_to_nearest(self):
+        """Test a prediction moves onto the closest stronghold."""
+        snapped = snap_prediction(1900, 800, 0)
+        self.assertEqual(snapped.stronghold.index, 1)
+        self.assertAlmostEqual(snapped.distance, math.hypot(44, 40))
+
+    def test_max_distance(self):
+        """Test predictions too far from every stronghold are not snapped."""
+        self.assertIsNone(snap_prediction(1900, 800, 0, max_distance=50))
+        self.assertIsNotNone(
+            snap_prediction(1900, 800, 0, max_distance=BIOME_SNAP)
+        )
+
+    def test_seed_flag(self):
+        """Test `endtrace ... --seed` and `endtrace seed` print positions."""
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "endtrace.py"),
+             "0.586", "0.512", "109.9", "-350.193", "0.226", "115",
+             "--seed", "0"],
+            capture_output=True, text=True, check=True
+        )
+        self.assertEqual(
+            result.stdout.splitlines()[-1],
+            "nearest stronghold of the seed: (x=-1464, z=1112) in ring 1, "
+            "1681 blocks away (biome snapping may move it up to 112 blocks)"
+        )
+
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "endtrace.py"),
+             "seed", "0", "--ring", "1"],
+            capture_output=True, text=True, check=True
+        )
+        self.assertEqual(
+            result.stdout.splitlines()[0],
+            "ring 1: (x=-200, z=-1688) chunk (-13, -106)"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
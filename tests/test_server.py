@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import unittest
+from utils.server import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VALID = {
+    "x1": 0.586, "z1": 0.512, "theta1": 109.9,
+    "x2": -350.193, "z2": 0.226, "theta2": 115
+}
+
+
+class TestHandleLine(unittest.TestCase):
+    """Tests for answering single JSON-line requests."""
+
+    def test_valid_request(self):
+        """Test a valid request returns the rounded prediction."""
+        response = handle_line(json.dumps({"id": 7, **VALID}))
+        self.assertEqual(response, {"id": 7, "x": -1564.75, "z": -566.13})
+
+    def test_identical_coords_error(self):
+        """Test identical coords return a structured CoordsError."""
+        request = {**VALID, "x2": 0.586, "z2": 0.512}
+        response = handle_line(json.dumps(request))
+        self.assertEqual(response["error"]["type"], "CoordsError")
+
+    def test_identical_angles_error(self):
+        """Test identical angles return a structured AngleError."""
+        request = {**VALID, "theta2": 109.9}
+        response = handle_line(json.dumps(request))
+        self.assertEqual(response["error"]["type"], "AngleError")
+
+    def test_protocol_errors(self):
+        """
+        Test that malformed requests return a ProtocolError instead of
+        raising.
+        """
+        bad_lines = [
+            "not json",
+            "[1, 2, 3]",
+            json.dumps({"x1": 0}),
+            json.dumps({**VALID, "z1": "zero"}),
+            json.dumps({**VALID, "z1": True}),
+            json.dumps(VALID).replace("0.512", "1" + "0"*400),
+            json.dumps(VALID).replace("0.512", "1" + "0"*5000)
+        ]
+        for line in bad_lines:
+            with self.subTest(line=line):
+                response = handle_line(line)
+                self.assertEqual(response["error"]["type"], "ProtocolError")
+
+    def test_overflowing_prediction_error(self):
+        """Test a prediction that overflows is an error, not inf/NaN JSON."""
+        request = {**VALID, "x1": 1e308, "x2": -1e308, "theta1": 10,
+                   "theta2": -20}
+        response = handle_line(json.dumps(request))
+        self.assertEqual(response["error"]["type"], "AngleError")
+        json.dumps(response, allow_nan=False)
+
+    def test_docstring_protocol(self):
+        """Test the protocol examples in the module docstring are real."""
+        from utils import server
+        protocol = server.__doc__.split("Protocol")[1].split("\n\n")[0]
+        examples = {}
+        for name in ("request", "response", "error"):
+            text = protocol.split(f"{name}:", 1)[1].lstrip()
+            examples[name] = json.JSONDecoder().raw_decode(text)[0]
+
+        request = examples["request"]
+        self.assertEqual(handle_line(json.dumps(request)),
+                         examples["response"])
+        parallel = {**request, "theta2": request["theta1"]}
+        self.assertEqual(handle_line(json.dumps(parallel)), examples["error"])
+
+
+class TestServer(unittest.TestCase):
+    """Tests for the asyncio socket and stdin servers."""
+
+    def test_concurrent_tcp_clients(self):
+        """Test several TCP clients sharing one server."""
+        async def client(port, request_id):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            request = json.dumps({"id": request_id, **VALID}) + "\n"
+            writer.write(request.encode())
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            writer.close()
+            await writer.wait_closed()
+            return response
+
+        async def run():
+            server = await start_server(port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await asyncio.gather(
+                    *(client(port, i) for i in range(5))
+                )
+
+        responses = asyncio.run(run())
+        self.assertEqual([r["id"] for r in responses], list(range(5)))
+        self.assertTrue(all(r["x"] == -1564.75 for r in responses))
+
+    def test_serve_command_over_stdin(self):
+        """Test `endtrace serve` answers every stdin line and exits at EOF."""
+        lines = [json.dumps(VALID), "", "oops"]
+        proc = subprocess.run(
+            [sys.executable, "endtrace.py", "serve"],
+            cwd=ROOT,
+            input="\n".join(lines) + "\n",
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        self.assertEqual(proc.returncode, 0)
+
+        responses = [json.loads(l) for l in proc.stdout.splitlines()]
+        self.assertEqual(responses[0], {"x": -1564.75, "z": -566.13})
+        self.assertEqual(responses[1]["error"]["type"], "ProtocolError")
+        self.assertEqual(len(responses), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import math
+import pickle
+import random
+import unittest
+from utils.session import *
+
+
+class TestStrongholdSession(unittest.TestCase):
+    """Tests for multi-stronghold sessions and their spatial index."""
+
+    def test_nearby_predictions_are_merged(self):
+        """Test predictions of the same stronghold refine one entry."""
+        session = StrongholdSession()
+        first = session.add(1500, 300)
+        second = session.add(1520, 320)
+        self.assertTrue(first.new)
+        self.assertFalse(second.new)
+        self.assertAlmostEqual(second.distance, math.hypot(20, 20))
+
+        stronghold = second.stronghold
+        self.assertEqual((stronghold.x, stronghold.z), (1510, 310))
+        self.assertEqual(stronghold.observations, 2)
+        self.assertEqual(len(session), 1)
+
+        self.assertTrue(session.add(-800, 1300).new)
+        self.assertEqual(len(session), 2)
+
+    def test_confirmed_positions_win(self):
+        """Test a confirmed position replaces and outlasts predictions."""
+        session = StrongholdSession()
+        session.add(1500, 300)
+        confirmed = session.add(1540, 300, confirmed=True).stronghold
+        self.assertEqual((confirmed.x, confirmed.z), (1540, 300))
+        self.assertTrue(confirmed.confirmed)
+
+        later = session.add(1560, 300).stronghold
+        self.assertEqual((later.x, later.z), (1540, 300))
+        self.assertEqual(later.observations, 3)
+
+    def test_ring_slots(self):
+        """Test strongholds are numbered by their slot in the ring."""
+        session = StrongholdSession()
+        first = session.add(2000, 0).stronghold
+        self.assertEqual((first.ring, first.slot), (0, 0))
+
+        # ring 0 has 3 slots, 120 degrees apart
+        angle = math.radians(125)
+        second = session.add(2100*math.cos(angle), 2100*math.sin(angle))
+        self.assertEqual(
+            (second.stronghold.ring, second.stronghold.slot), (0, 1)
+        )
+        self.assertEqual(session.slot_of(0, -2000), (0, 2))
+        self.assertEqual(session.slot_of(0, 5000), (1, None))
+        self.assertEqual(session.slot_of(0, 3500), (None, None))
+
+        slots = session.slot_positions(0)
+        self.assertEqual(len(slots), 3)
+        self.assertAlmostEqual(slots[0][0], 2048)
+        self.assertAlmostEqual(math.degrees(math.atan2(slots[2][1],
+                                                       slots[2][0])), -120)
+        self.assertEqual(session.slot_positions(1), [])
+
+    def test_nearest_matches_brute_force(self):
+        """Test grid hash queries near and far from the strongholds."""
+        rng = random.Random(0)
+        session = StrongholdSession()
+        self.assertIsNone(session.nearest(0, 0))
+        for _ in range(500):
+            session.add(rng.uniform(-25000, 25000), rng.uniform(-25000, 25000))
+
+        positions = [(s.x, s.z) for s in session]
+        for _ in range(500):
+            x, z = rng.uniform(-1e5, 1e5), rng.uniform(-1e5, 1e5)
+            if rng.random() < 0.5:
+                x, z = x/4, z/4
+            nearest = session.nearest(x, z)
+            expected = min(math.hypot(px - x, pz - z) for px, pz in positions)
+            self.assertAlmostEqual(nearest.distance, expected)
+            self.assertAlmostEqual(
+                math.hypot(nearest.stronghold.x - x, nearest.stronghold.z - z),
+                expected
+            )
+
+    def test_non_finite_coords_raise(self):
+        """Test NaN and infinite positions are rejected."""
+        with self.assertRaises(ValueError):
+            StrongholdSession().add(math.nan, 0)
+
+    def test_serialization(self):
+        """Test sessions round-trip through bytes, pickle and dicts."""
+        session = StrongholdSession(merge_distance=128)
+        session.add(1500, 300, confirmed=True)
+        session.add(1510, 300)
+        session.add(-800, 1300)
+
+        data = session.to_bytes()
+        self.assertEqual(len(data), 17 + 21*2)
+        for restored in (
+            StrongholdSession.from_bytes(data),
+            pickle.loads(pickle.dumps(session)),
+            StrongholdSession.from_dict(
+                json.loads(json.dumps(session.to_dict()))
+            )
+        ):
+            self.assertEqual(list(restored), list(session))
+            self.assertEqual(restored.merge_distance, 128)
+            self.assertEqual(restored.nearest(-700, 1200).stronghold.index, 1)
+
+        with self.assertRaises(ValueError):
+            StrongholdSession.from_bytes(data[:-1])
+        with self.assertRaises(ValueError):
+            StrongholdSession.from_bytes(b"nope" + data[4:])
+
+
+if __name__ == "__main__":
+    unittest.main()
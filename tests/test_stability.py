@@ -0,0 +1,205 @@
+import math
+import random
+import sys
+import unittest
+from fractions import Fraction
+import numpy as np
+from endtrace import (
+    MAX_CONDITION,
+    _transform_minecraft_angle_to_cartesian_rads,
+    pair_condition,
+    solve_stronghold
+)
+from utils.batch import predict_strongholds
+from utils.validators import AngleError
+
+EPS = sys.float_info.epsilon
+CASES = 2000
+
+
+def _exact(x1, z1, theta1, x2, z2, theta2):
+    """
+    Intersects the two throws' rays in exact rational arithmetic, starting
+    from the same float directions the solver uses.
+
+    Returns:
+        tuple[Fraction, Fraction, Fraction]: The exact (x, z) intersection
+            and the exact distance along the first ray.
+    """
+    phi1 = _transform_minecraft_angle_to_cartesian_rads(theta1)
+    phi2 = _transform_minecraft_angle_to_cartesian_rads(theta2)
+    cos1, sin1 = Fraction(math.cos(phi1)), Fraction(math.sin(phi1))
+    cos2, sin2 = Fraction(math.cos(phi2)), Fraction(math.sin(phi2))
+    x1, z1, x2, z2 = map(Fraction, (x1, z1, x2, z2))
+
+    t = ((x2 - x1)*sin2 - (z2 - z1)*cos2)/(cos1*sin2 - sin1*cos2)
+    return x1 + t*cos1, z1 + t*sin1, t
+
+
+def _angle(rng):
+    """A random angle as shown on the F3 screen (0.1 degree steps)."""
+    return rng.randint(-1800, 1800)/10
+
+
+def _generic(rng):
+    """Throws anywhere in a typical playing area."""
+    return (
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000), _angle(rng),
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000), _angle(rng)
+    )
+
+
+def _north_south(rng):
+    """Throws heading (almost) due north or south, where tan blows up."""
+    headings = [0, 0.1, -0.1, 180, -180, 179.9, -179.9]
+    return (
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000),
+        rng.choice(headings),
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000), _angle(rng)
+    )
+
+
+def _near_parallel(rng):
+    """Throws whose angles differ by one F3 step, in either direction."""
+    theta1 = _angle(rng)
+    theta2 = theta1 + rng.choice([-0.1, 0.1]) + rng.choice([0, 180])
+    theta2 = round((theta2 + 180) % 360 - 180, 1)
+    return (
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000), theta1,
+        rng.uniform(-5000, 5000), rng.uniform(-5000, 5000), theta2
+    )
+
+
+def _far(rng):
+    """Throws out near the world border."""
+    return (
+        rng.uniform(-3e7, 3e7), rng.uniform(-3e7, 3e7), _angle(rng),
+        rng.uniform(-3e7, 3e7), rng.uniform(-3e7, 3e7), _angle(rng)
+    )
+
+
+GENERATORS = [_generic, _north_south, _near_parallel, _far]
+
+
+def _cases(generator, seed=0):
+    """Yields CASES valid throw pairs from a seeded generator."""
+    rng = random.Random(seed)
+    count = 0
+    while count < CASES:
+        throws = generator(rng)
+        if throws[2] == throws[5] or pair_condition(throws[2], throws[5]) \
+                > MAX_CONDITION:
+            continue
+        count += 1
+        yield throws
+
+
+class TestStability(unittest.TestCase):
+    """
+    Property tests for the direction-vector solver. Inputs come from seeded
+    generators (hypothesis is not a dependency) so failures reproduce.
+    """
+
+    def test_matches_exact_reference(self):
+        """
+        Test the solver's error is within a few ulps times the pair's
+        condition number of the exact intersection.
+        """
+        for generator in GENERATORS:
+            with self.subTest(generator=generator.__name__):
+                for throws in _cases(generator):
+                    x1, z1, _, x2, z2, _ = throws
+                    prediction = solve_stronghold(*throws)
+                    exact_x, exact_z, t = _exact(*throws)
+
+                    scale = max(abs(x1), abs(z1)) + prediction.condition*(
+                        math.hypot(x2 - x1, z2 - z1) + abs(float(t))
+                    )
+                    bound = 8*EPS*scale
+                    self.assertLessEqual(
+                        abs(float(Fraction(prediction.x) - exact_x)), bound,
+                        throws
+                    )
+                    self.assertLessEqual(
+                        abs(float(Fraction(prediction.z) - exact_z)), bound,
+                        throws
+                    )
+
+    def test_batch_matches_exact_reference(self):
+        """Test the batch path meets the same error bound."""
+        cases = list(_cases(_north_south, seed=1))
+        result = predict_strongholds(*np.array(cases).T)
+        self.assertFalse(result.degenerate.any())
+
+        for i, throws in enumerate(cases):
+            exact_x, exact_z, t = _exact(*throws)
+            x1, z1, _, x2, z2, _ = throws
+            scale = max(abs(x1), abs(z1)) + result.condition[i]*(
+                math.hypot(x2 - x1, z2 - z1) + abs(float(t))
+            )
+            # np.sin and np.cos may differ from math in the last ulp
+            bound = 16*EPS*scale
+            self.assertLessEqual(abs(result.x[i] - float(exact_x)), bound)
+            self.assertLessEqual(abs(result.z[i] - float(exact_z)), bound)
+
+    def test_due_north_and_east(self):
+        """
+        Test throws heading exactly north and exactly east meet where
+        expected with no error.
+        """
+        # 180 points north (-z), -90 points east (+x)
+        prediction = solve_stronghold(100, 0, 180, 0, -500, -90)
+        self.assertEqual((prediction.rounded_x, prediction.rounded_z),
+                         (100.0, -500.0))
+        self.assertAlmostEqual(prediction.condition, 1.0)
+
+    def test_condition_diagnostic(self):
+        """
+        Test the condition number matches the 2-norm condition number of
+        the matrix of directions, and that pair_condition agrees with the
+        solver.
+        """
+        rng = random.Random(2)
+        for _ in range(200):
+            throws = _generic(rng)
+            if throws[2] == throws[5]:
+                continue
+            phi1 = _transform_minecraft_angle_to_cartesian_rads(throws[2])
+            phi2 = _transform_minecraft_angle_to_cartesian_rads(throws[5])
+            directions = np.array([
+                [math.cos(phi1), math.sin(phi1)],
+                [math.cos(phi2), math.sin(phi2)]
+            ])
+            expected = np.linalg.cond(directions)
+
+            prediction = solve_stronghold(*throws)
+            self.assertTrue(
+                math.isclose(prediction.condition, expected, rel_tol=1e-6)
+            )
+            self.assertEqual(
+                pair_condition(throws[2], throws[5]), prediction.condition
+            )
+
+    def test_condition_grows_as_throws_converge(self):
+        """Test the condition number grows as the angle between shrinks."""
+        conditions = [pair_condition(0, delta) for delta in (90, 10, 1, 0.1)]
+        self.assertAlmostEqual(conditions[0], 1.0)
+        self.assertEqual(conditions, sorted(conditions))
+        self.assertGreater(conditions[-1], 1000)
+
+    def test_parallel_throws_raise(self):
+        """
+        Test opposite headings (parallel but not identical angles) raise an
+        AngleError and are marked degenerate in a batch.
+        """
+        self.assertGreater(pair_condition(45, -135), MAX_CONDITION)
+        with self.assertRaises(AngleError):
+            solve_stronghold(0, 0, 45, 10, 0, -135)
+
+        result = predict_strongholds([0], [0], [45], [10], [0], [-135])
+        self.assertTrue(result.degenerate[0])
+        self.assertTrue(math.isnan(result.x[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
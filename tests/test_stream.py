@@ -0,0 +1,139 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from utils.stream import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStream(unittest.TestCase):
+    """Tests for streaming CSV/JSONL throw logs."""
+
+    def test_csv_without_header(self):
+        """Test headerless CSV rows are predicted in order."""
+        lines = [
+            "0.586,0.512,109.9,-350.193,0.226,115\n",
+            "10,-10,45,-10,-10,-45\n"
+        ]
+        out = io.StringIO()
+        stats = stream_file(lines, out, "csv")
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ["line,x,z", "1,-1564.75,-566.13", "2,0.0,0.0"]
+        )
+        self.assertEqual((stats.rows, stats.errors), (2, 0))
+
+    def test_csv_header_reorders_columns(self):
+        """Test a header row can name the columns in any order."""
+        lines = [
+            "theta1,theta2,x1,z1,x2,z2\n",
+            "45,-45,10,-10,-10,-10\n"
+        ]
+        out = io.StringIO()
+        stream_file(lines, out, "csv")
+        self.assertEqual(out.getvalue().splitlines()[1], "2,0.0,0.0")
+
+    def test_csv_header_after_blank_lines(self):
+        """Test the header is found on the first non-blank row."""
+        lines = [
+            "\n",
+            " , \n",
+            "theta1,theta2,x1,z1,x2,z2\n",
+            "45,-45,10,-10,-10,-10\n"
+        ]
+        out, err = io.StringIO(), io.StringIO()
+        stats = stream_file(lines, out, "csv", err)
+        self.assertEqual(
+            out.getvalue().splitlines(), ["line,x,z", "4,0.0,0.0"]
+        )
+        self.assertEqual((stats.rows, stats.errors), (1, 0))
+        self.assertEqual(err.getvalue(), "")
+
+    def test_invalid_rows_reported_with_line_numbers(self):
+        """Test invalid rows are reported and do not abort the run."""
+        lines = [
+            "0,0,0,0,0,0\n",
+            "a,b,c,d,e,f\n",
+            "1,2,3\n",
+            "0,0,10,5,5,10\n",
+            "0,0,200,5,5,10\n",
+            "10,-10,45,-10,-10,-45\n"
+        ]
+        out, err = io.StringIO(), io.StringIO()
+        stats = stream_file(lines, out, "csv", err)
+
+        self.assertEqual((stats.rows, stats.errors), (6, 5))
+        self.assertEqual(out.getvalue().splitlines()[1], "6,0.0,0.0")
+        reported = err.getvalue().splitlines()
+        self.assertTrue(reported[0].startswith("line 1: CoordsError"))
+        self.assertTrue(reported[1].startswith("line 2: ProtocolError"))
+        self.assertTrue(reported[2].startswith("line 3: ProtocolError"))
+        self.assertTrue(reported[3].startswith("line 4: AngleError"))
+        self.assertTrue(reported[4].startswith("line 5: AngleError"))
+
+    def test_jsonl(self):
+        """Test JSONL input is answered with JSONL output."""
+        lines = [
+            json.dumps({
+                "x1": 10, "z1": -10, "theta1": 45,
+                "x2": -10, "z2": -10, "theta2": -45
+            }) + "\n",
+            "\n",
+            "{bad\n",
+            '{"x1": 1' + "0"*400 + ', "z1": 0, "theta1": 45, "x2": 0, '
+            '"z2": 5, "theta2": -45}\n'
+        ]
+        out, err = io.StringIO(), io.StringIO()
+        stats = stream_file(lines, out, "jsonl", err)
+        self.assertEqual(
+            json.loads(out.getvalue()),
+            {"line": 1, "x": 0.0, "z": 0.0}
+        )
+        self.assertIn("line 3: ProtocolError", err.getvalue())
+        self.assertIn("line 4: ProtocolError", err.getvalue())
+        self.assertEqual((stats.rows, stats.errors), (3, 2))
+
+    def test_rows_are_consumed_lazily(self):
+        """Test the pipeline pulls one row at a time from its input."""
+        def lines():
+            for _ in range(3):
+                yield "10,-10,45,-10,-10,-45\n"
+            raise AssertionError("read past the requested rows")
+
+        results = predict_rows(read_csv(lines()))
+        self.assertEqual(next(results), (1, (0.0, 0.0)))
+        self.assertEqual(next(results), (2, (0.0, 0.0)))
+
+    def test_detect_format(self):
+        """Test the input format is guessed from the extension."""
+        self.assertEqual(detect_format("throws.jsonl"), "jsonl")
+        self.assertEqual(detect_format("throws.csv"), "csv")
+        self.assertEqual(detect_format("-"), "csv")
+
+    def test_stream_command_reports_throughput(self):
+        """Test `endtrace stream` writes predictions and rows/s."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "throws.csv")
+            with open(path, "w") as f:
+                f.write("x1,z1,theta1,x2,z2,theta2\n")
+                f.write("10,-10,45,-10,-10,-45\n")
+
+            proc = subprocess.run(
+                [sys.executable, "endtrace.py", "stream", path],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+
+        self.assertEqual(proc.returncode, 0)
+        self.assertEqual(proc.stdout.splitlines(), ["line,x,z", "2,0.0,0.0"])
+        self.assertIn("rows/s", proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import math
+import unittest
+from utils.uncertainty import *
+from utils.validators import AngleError
+
+THROWS = (0.586, 0.512, 109.9, -350.193, 0.226, 115)
+
+
+class TestUncertainty(unittest.TestCase):
+    """Tests for analytic and Monte Carlo uncertainty estimates."""
+
+    def test_analytic_matches_monte_carlo(self):
+        """
+        Test that first-order propagation agrees with simulating noisy
+        throws for a well-conditioned pair.
+        """
+        analytic = estimate_uncertainty(*THROWS, angle_std=0.05)
+        simulated = monte_carlo_uncertainty(
+            *THROWS, angle_std=0.05, samples=20000, seed=0
+        )
+        self.assertAlmostEqual(simulated.x, analytic.x, delta=1.0)
+        self.assertAlmostEqual(simulated.z, analytic.z, delta=1.0)
+        for field in ("var_x", "var_z", "cov_xz"):
+            with self.subTest(field=field):
+                self.assertAlmostEqual(
+                    getattr(simulated, field) / getattr(analytic, field),
+                    1.0,
+                    delta=0.1
+                )
+
+    def test_exact_throws_have_no_uncertainty(self):
+        """Test that zero angle and position errors give a zero ellipse."""
+        estimate = estimate_uncertainty(*THROWS, angle_std=0.0)
+        ellipse = error_ellipse(estimate)
+        self.assertEqual((ellipse.semi_major, ellipse.semi_minor), (0.0, 0.0))
+
+    def test_position_error_alone(self):
+        """
+        Test that perpendicular throws with only position error give a
+        circular error region of the given standard deviation.
+        """
+        estimate = estimate_uncertainty(
+            10, -10, 45, -10, -10, -45, angle_std=0.0, position_std=2.0
+        )
+        self.assertAlmostEqual(estimate.var_x, 4.0)
+        self.assertAlmostEqual(estimate.var_z, 4.0)
+        self.assertAlmostEqual(estimate.cov_xz, 0.0)
+
+    def test_uncertainty_grows_with_distance(self):
+        """Test that farther predictions have larger error ellipses."""
+        near = error_ellipse(estimate_uncertainty(10, -10, 45, -10, -10, -45))
+        far = error_ellipse(
+            estimate_uncertainty(1000, -1000, 45, -1000, -1000, -45)
+        )
+        self.assertGreater(far.semi_major, 50*near.semi_major)
+
+    def test_ellipse_axes_and_confidence(self):
+        """Test ellipse axes for a diagonal covariance."""
+        estimate = UncertaintyEstimate(0.0, 0.0, 9.0, 4.0, 0.0)
+        ellipse = error_ellipse(estimate, confidence=0.95)
+        k = math.sqrt(-2*math.log(0.05))
+        self.assertAlmostEqual(ellipse.semi_major, 3*k)
+        self.assertAlmostEqual(ellipse.semi_minor, 2*k)
+        self.assertAlmostEqual(ellipse.angle, 0.0)
+
+    def test_probability_grid(self):
+        """Test the probability grid sums to 1 and peaks at the prediction."""
+        estimate = estimate_uncertainty(*THROWS, angle_std=0.1)
+        xs, zs, probs = probability_grid(estimate, cell_size=16)
+        self.assertEqual(probs.shape, (len(zs), len(xs)))
+        self.assertAlmostEqual(probs.sum(), 1.0)
+
+        row, col = divmod(probs.argmax(), len(xs))
+        self.assertLessEqual(abs(xs[col] - estimate.x), 16)
+        self.assertLessEqual(abs(zs[row] - estimate.z), 16)
+
+    def test_probability_grid_is_capped(self):
+        """
+        Test nearly parallel throws get a coarser grid instead of a huge
+        one, and that a cap which cannot be met raises a ValueError.
+        """
+        estimate = estimate_uncertainty(0, 0, 45, 100, 0, 45.01)
+        xs, zs, probs = probability_grid(estimate)
+        self.assertLessEqual(probs.size, MAX_GRID_CELLS)
+        self.assertAlmostEqual(probs.sum(), 1.0)
+
+        # the cells are widened by a whole number of chunks
+        width = xs[1] - xs[0]
+        self.assertGreater(width, 16)
+        self.assertEqual(width % 16, 0)
+        self.assertEqual(zs[1] - zs[0], width)
+
+        xs, zs, probs = probability_grid(estimate, max_cells=100)
+        self.assertLessEqual(probs.size, 100)
+
+        with self.assertRaises(ValueError):
+            probability_grid(estimate, max_cells=3)
+        with self.assertRaises(ValueError):
+            probability_grid(UncertaintyEstimate(0, 0, math.inf, 1, 0))
+
+    def test_parallel_throws_raise(self):
+        """Test parallel throws raise an AngleError."""
+        with self.assertRaises(AngleError):
+            estimate_uncertainty(0, 0, 45, 10, 0, -135)
+
+
+if __name__ == "__main__":
+    unittest.main()
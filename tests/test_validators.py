@@ -16,6 +16,17 @@ class TestValidators(unittest.TestCase):
         with self.assertRaises(CoordsError):
             validate_coords(100, 200, 100, 200)
 
+    def test_invalid_coords_non_finite(self):
+        """Test that NaN or infinite coordinates raise a CoordsError."""
+        for coords in [
+            (float("nan"), 0, 10, 10),
+            (0, float("inf"), 10, 10),
+            (0, 0, float("-inf"), 10)
+        ]:
+            with self.subTest(coords=coords):
+                with self.assertRaisesRegex(CoordsError, "finite"):
+                    validate_coords(*coords)
+
     def test_valid_angles(self):
         """Test that valid angles do not raise an AngleError."""
         try:
@@ -64,6 +75,34 @@ class TestValidators(unittest.TestCase):
                 with self.assertRaises(AngleError):
                     validate_angles(angle1, angle2)
 
+    def test_check_codes(self):
+        """Test the non-raising checks return the matching codes."""
+        self.assertEqual(check_coords(0, 0, 10, 0), ValidationCode.OK)
+        self.assertEqual(
+            check_coords(5, 5, 5, 5), ValidationCode.IDENTICAL_COORDS
+        )
+        self.assertEqual(check_angles(10, 20), ValidationCode.OK)
+        self.assertEqual(
+            check_angles(10, 10), ValidationCode.IDENTICAL_ANGLES
+        )
+        self.assertEqual(
+            check_angles(float("nan"), 10),
+            ValidationCode.ANGLE_OUT_OF_BOUNDS
+        )
+
+    def test_validation_error(self):
+        """Test each code maps to the exception the validators raise."""
+        self.assertIsNone(validation_error(ValidationCode.OK))
+        error = validation_error(ValidationCode.PARALLEL)
+        self.assertIsInstance(error, AngleError)
+        self.assertEqual(str(error), "throws must not be parallel")
+        with self.assertRaises(AngleError) as raised:
+            validate_angles(10, 10)
+        self.assertEqual(
+            str(raised.exception),
+            str(validation_error(ValidationCode.IDENTICAL_ANGLES))
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from endtrace import solve_stronghold
+from utils.watch import *
+
+F3C = "/execute in minecraft:overworld run tp @s {} 75.00 {} {} -31.65"
+
+
+async def _take(lines, count, timeout=5):
+    """Collects the next `count` lines from an async iterator."""
+    async def take():
+        return [await anext(lines) for _ in range(count)]
+    return await asyncio.wait_for(take(), timeout)
+
+
+class TestWatch(unittest.TestCase):
+    """Tests for following F3+C throws and predicting incrementally."""
+
+    def test_parse_throw(self):
+        """
+        Test F3+C commands are found inside log lines and the yaw is
+        wrapped into [-180, 180).
+        """
+        line = (
+            "[12:00:02] [Render thread/INFO]: [CHAT] "
+            + F3C.format("116.70", "-73.42", "-421.80")
+        )
+        self.assertEqual(
+            parse_throw(line),
+            Throw(116.7, -73.42, -61.80000000000001, "minecraft:overworld")
+        )
+        self.assertAlmostEqual(parse_throw(F3C.format(0, 0, 475)).theta, 115)
+        self.assertIsNone(parse_throw("[CHAT] hello"))
+
+    def test_tracker_predicts_incrementally(self):
+        """
+        Test the prediction appears with the second throw, matches the
+        two-throw solver and ignores repeated throws.
+        """
+        tracker = ThrowTracker()
+        first = Throw(0.586, 0.512, 109.9, "minecraft:overworld")
+        second = Throw(-350.193, 0.226, 115, "minecraft:overworld")
+
+        self.assertTrue(tracker.add(first))
+        self.assertIsNone(tracker.predict())
+        self.assertFalse(tracker.add(first))
+        self.assertTrue(tracker.add(second))
+
+        prediction = tracker.predict()
+        expected = solve_stronghold(*first[:3], *second[:3])
+        self.assertAlmostEqual(prediction.x, expected.x, places=6)
+        self.assertAlmostEqual(prediction.z, expected.z, places=6)
+        self.assertEqual(prediction.throws, 2)
+
+    def test_follow_appends_and_rewrites(self):
+        """
+        Test following a file yields appended lines (holding back partial
+        ones) and rereads a file that is rewritten in place.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latest.log")
+            with open(path, "w") as f:
+                f.write("old line\n")
+
+            async def run():
+                lines = follow(path, interval=0.01)
+                # start following before anything is appended
+                pending = asyncio.ensure_future(_take(lines, 1))
+                await asyncio.sleep(0.05)
+                with open(path, "a") as f:
+                    f.write("first\nsec")
+                first = await pending
+                with open(path, "a") as f:
+                    f.write("ond\n")
+                second = await _take(lines, 1)
+
+                # a clipboard export replaces the whole content
+                await asyncio.sleep(0.02)
+                with open(path, "w") as f:
+                    f.write("clipboard without newline")
+                third = await _take(lines, 1)
+                return first + second + third
+
+            self.assertEqual(
+                asyncio.run(run()),
+                ["first", "second", "clipboard without newline"]
+            )
+
+    def test_watch_stdin(self):
+        """Test watch mode prints an update after every new throw."""
+        stdin = io.StringIO("\n".join([
+            "unrelated",
+            F3C.format("0.586", "0.512", "109.9"),
+            F3C.format("0.586", "0.512", "109.9"),
+            "/execute in minecraft:the_nether run tp @s 1 75 1 10 0",
+            F3C.format("-350.193", "0.226", "115")
+        ]) + "\n")
+        out = io.StringIO()
+        tracker = asyncio.run(watch("-", out, stdin=stdin))
+
+        self.assertEqual(len(tracker), 2)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "throw 1: (x=0.586, z=0.512, angle=109.9)")
+        self.assertEqual(lines[2], "ignoring throw in minecraft:the_nether")
+        self.assertTrue(lines[-1].startswith(
+            "predicted stronghold coords: (x=-1564.75, y=?, z=-566.13) "
+            "from 2 throws"
+        ))
+
+    def test_reset_after_idle(self):
+        """Test a long gap between throws starts a new stronghold."""
+        stdin = io.StringIO(
+            F3C.format(0, 0, 45) + "\n" + F3C.format(10, 0, -45) + "\n"
+        )
+        out = io.StringIO()
+        tracker = asyncio.run(watch("-", out, reset_after=-1, stdin=stdin))
+        self.assertEqual(len(tracker), 1)
+        self.assertIn("starting a new stronghold", out.getvalue())
+
+    def test_robust_rejects_bad_throw(self):
+        """Test robust mode reports and ignores a misaligned throw."""
+        stdin = io.StringIO("\n".join([
+            F3C.format(10, -10, 45),
+            F3C.format(-10, -10, -45),
+            F3C.format(0, -100, 20),
+            F3C.format(100, 0, 90)
+        ]) + "\n")
+        out = io.StringIO()
+        asyncio.run(watch("-", out, stdin=stdin, robust=True))
+
+        last = out.getvalue().splitlines()[-1]
+        self.assertTrue(last.startswith(
+            "predicted stronghold coords: (x=0.0, y=?, z=0.0) from 3 throws"
+        ))
+        self.assertTrue(last.endswith("rejected throw(s) 3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
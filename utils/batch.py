@@ -0,0 +1,373 @@
+"""
+Vectorized batch triangulation for endtrace, a Minecraft stronghold
+prediction tool.
+
+Solves many pairs of Eye of Ender throws in a single NumPy pass instead of
+calling predict_stronghold once per pair. Columns may be NumPy arrays or any
+other buffer-protocol/sequence type (array.array, memoryview, lists, ...).
+Degenerate rows are reported through a mask instead of raising, and
+validate_throws tells why each row is invalid with an error code.
+"""
+
+from typing import Iterator, NamedTuple
+from endtrace import MAX_CONDITION
+from utils.route import NETHER_SCALE, ROUTE_DIGITS
+from utils.validators import *
+import numpy as np
+
+
+class BatchPrediction(NamedTuple):
+	"""
+	The result of a batch stronghold prediction.
+
+	Attributes:
+		x (np.ndarray): Predicted x-coords (NaN where degenerate).
+		z (np.ndarray): Predicted z-coords (NaN where degenerate).
+		degenerate (np.ndarray): Boolean mask of rows that could not be
+			triangulated (identical coords, identical/parallel angles,
+			out of bounds angles or non-finite values).
+		condition (np.ndarray): Condition number of each pair (see
+			endtrace.Prediction.condition, inf where parallel).
+	"""
+	x: np.ndarray
+	z: np.ndarray
+	degenerate: np.ndarray
+	condition: np.ndarray
+
+
+def _as_column(values) -> np.ndarray:
+	"""
+	Converts a column of values into a flat float64 array without copying
+	when the input already has the right layout.
+
+	Args:
+		values: A NumPy array, buffer-protocol object or sequence.
+
+	Returns:
+		np.ndarray: A 1-D float64 view or copy of the values.
+	"""
+	return np.asarray(values, dtype=np.float64).reshape(-1)
+
+
+def transform_minecraft_angles_to_cartesian_rads(theta) -> np.ndarray:
+	"""
+	Vectorized version of _transform_minecraft_angle_to_cartesian_rads.
+
+	Args:
+		theta: Angles from Minecraft (in degrees).
+
+	Returns:
+		np.ndarray: The Cartesian angles (in radians).
+	"""
+	theta = _as_column(theta)
+
+	# the scalar path nudges 0 by epsilon, which only selects the positive
+	# branch (the nudge itself is lost when adding 270)
+	return np.where(
+		theta >= 0,
+		-np.radians(-theta + 270),
+		-np.radians(-theta - 90)
+	)
+
+
+def transform_cartesian_rads_to_minecraft_angles(phi) -> np.ndarray:
+	"""
+	Vectorized version of _transform_cartesian_rads_to_minecraft_angle.
+
+	Args:
+		phi: Cartesian angles (in radians).
+
+	Returns:
+		np.ndarray: The Minecraft angles (in degrees, in [-180, 180)).
+	"""
+	return (np.degrees(_as_column(phi)) + 90) % 360 - 180
+
+
+class ValidationReport(NamedTuple):
+	"""
+	The result of validating many pairs of throws at once.
+
+	Attributes:
+		codes (np.ndarray): The ValidationCode of each row (uint8, 0 where
+			the row is valid).
+		condition (np.ndarray): Condition number of each pair (see
+			endtrace.Prediction.condition, inf where parallel).
+	"""
+	codes: np.ndarray
+	condition: np.ndarray
+
+	@property
+	def valid(self) -> np.ndarray:
+		"""Boolean mask of the rows without any problem."""
+		return self.codes == ValidationCode.OK
+
+	def counts(self) -> dict[str, int]:
+		"""
+		Returns:
+			dict[str, int]: The number of rows with each code, keyed by the
+				lowercase code name (e.g., "identical_angles"), "ok"
+				included.
+		"""
+		totals = np.bincount(self.codes, minlength=len(ValidationCode))
+		return {code.name.lower(): int(totals[code]) for code in ValidationCode}
+
+	def errors(self) -> Iterator[tuple[int, Exception]]:
+		"""
+		Yields:
+			tuple[int, Exception]: The index of each invalid row and the
+				error the scalar validators (or solve_stronghold) would
+				raise for it.
+		"""
+		for i in np.flatnonzero(self.codes).tolist():
+			yield i, validation_error(int(self.codes[i]))
+
+
+def _validation_codes(x1, z1, theta1, x2, z2, theta2, condition) -> np.ndarray:
+	"""
+	Finds the ValidationCode of every row, giving each row its first
+	problem in the same order as the scalar validators.
+
+	Returns:
+		np.ndarray: The codes (uint8).
+	"""
+	checks = (
+		((x1 == x2) & (z1 == z2), ValidationCode.IDENTICAL_COORDS),
+		(
+			~(np.isfinite(x1) & np.isfinite(z1)
+				& np.isfinite(x2) & np.isfinite(z2)),
+			ValidationCode.NON_FINITE_COORDS
+		),
+		(theta1 == theta2, ValidationCode.IDENTICAL_ANGLES),
+		(
+			~((theta1 >= -180) & (theta1 <= 180)
+				& (theta2 >= -180) & (theta2 <= 180)),
+			ValidationCode.ANGLE_OUT_OF_BOUNDS
+		),
+		(~(condition <= MAX_CONDITION), ValidationCode.PARALLEL)
+	)
+
+	# later checks are applied first so earlier problems overwrite them
+	codes = np.zeros(len(x1), dtype=np.uint8)
+	for failed, code in reversed(checks):
+		codes[failed] = code
+	return codes
+
+
+def _directions(theta1, theta2):
+	"""The unit direction (cos, sin) of both throws of every row."""
+	phi1 = transform_minecraft_angles_to_cartesian_rads(theta1)
+	phi2 = transform_minecraft_angles_to_cartesian_rads(theta2)
+	return np.cos(phi1), np.sin(phi1), np.cos(phi2), np.sin(phi2)
+
+
+def _conditions(cos1, sin1, cos2, sin2):
+	"""Vectorized endtrace._condition, plus the cross products."""
+	cross = cos1*sin2 - sin1*cos2
+	with np.errstate(divide="ignore", invalid="ignore"):
+		condition = (1 + np.abs(cos1*cos2 + sin1*sin2))/np.abs(cross)
+	return condition, cross
+
+
+def _columns(x1, z1, theta1, x2, z2, theta2) -> list[np.ndarray]:
+	"""Converts the six input columns, checking their lengths match."""
+	columns = [
+		_as_column(values) for values in (x1, z1, theta1, x2, z2, theta2)
+	]
+	n = len(columns[0])
+	if any(len(column) != n for column in columns):
+		raise ValueError("all columns must have the same length")
+	return columns
+
+
+def validate_throws(x1, z1, theta1, x2, z2, theta2) -> ValidationReport:
+	"""
+	Vectorized version of validate_coords and validate_angles (plus
+	solve_stronghold's parallel check). Instead of raising on the first
+	problem, every row gets an error code.
+
+	Args:
+		x1: X-coords of the first throws.
+		z1: Z-coords of the first throws.
+		theta1: Minecraft angles of the first throws (in degrees).
+		x2: X-coords of the second throws.
+		z2: Z-coords of the second throws.
+		theta2: Minecraft angles of the second throws (in degrees).
+
+	Returns:
+		ValidationReport: Each row's code and condition number.
+
+	Raises:
+		ValueError: If the columns do not all have the same length.
+	"""
+	x1, z1, theta1, x2, z2, theta2 = _columns(x1, z1, theta1, x2, z2, theta2)
+	condition, _ = _conditions(*_directions(theta1, theta2))
+	return ValidationReport(
+		_validation_codes(x1, z1, theta1, x2, z2, theta2, condition),
+		condition
+	)
+
+
+def predict_strongholds(x1, z1, theta1, x2, z2, theta2) -> BatchPrediction:
+	"""
+	Predicts the stronghold coordinates for many pairs of Eye of Ender
+	throws at once. Uses the same formulas as solve_stronghold, so
+	rounding each value to 2 decimals reproduces the scalar output.
+
+	Args:
+		x1: X-coords of the first throws.
+		z1: Z-coords of the first throws.
+		theta1: Minecraft angles of the first throws (in degrees).
+		x2: X-coords of the second throws.
+		z2: Z-coords of the second throws.
+		theta2: Minecraft angles of the second throws (in degrees).
+
+	Returns:
+		BatchPrediction: The unrounded (x, z) predictions, a mask of
+			degenerate rows and each pair's condition number.
+
+	Raises:
+		ValueError: If the columns do not all have the same length.
+	"""
+	x1, z1, theta1, x2, z2, theta2 = _columns(x1, z1, theta1, x2, z2, theta2)
+	cos1, sin1, cos2, sin2 = _directions(theta1, theta2)
+	condition, cross = _conditions(cos1, sin1, cos2, sin2)
+
+	# same direction-vector intersection as solve_stronghold
+	with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+		t = ((x2 - x1)*sin2 - (z2 - z1)*cos2)/cross
+		pred_x = x1 + t*cos1
+		pred_z = z1 + t*sin1
+
+	# same rules as validate_throws, plus predictions that overflow
+	degenerate = _validation_codes(
+		x1, z1, theta1, x2, z2, theta2, condition
+	) != 0
+	degenerate |= ~(np.isfinite(pred_x) & np.isfinite(pred_z))
+	pred_x[degenerate] = np.nan
+	pred_z[degenerate] = np.nan
+
+	return BatchPrediction(pred_x, pred_z, degenerate, condition)
+
+
+class BatchRoute(NamedTuple):
+	"""
+	The ways from many throws to their predicted strongholds (see
+	utils.route.Route).
+
+	Attributes:
+		x (np.ndarray): X-coords of the strongholds in the Overworld.
+		z (np.ndarray): Z-coords of the strongholds in the Overworld.
+		nether_x (np.ndarray): X-coords of the strongholds in the Nether.
+		nether_z (np.ndarray): Z-coords of the strongholds in the Nether.
+		yaw (np.ndarray): The Minecraft angles (in degrees) to face.
+		distance (np.ndarray): Overworld blocks to each stronghold.
+	"""
+	x: np.ndarray
+	z: np.ndarray
+	nether_x: np.ndarray
+	nether_z: np.ndarray
+	yaw: np.ndarray
+	distance: np.ndarray
+
+
+def plan_routes(x, z, from_x, from_z) -> BatchRoute:
+	"""
+	Vectorized version of utils.route.plan_route, e.g. for the predictions
+	of predict_strongholds and the second throws (NaN predictions give NaN
+	routes).
+
+	Args:
+		x: X-coords of the predictions.
+		z: Z-coords of the predictions.
+		from_x: X-coords of the players (e.g., their last throws).
+		from_z: Z-coords of the players.
+
+	Returns:
+		BatchRoute: The Overworld and Nether coords, yaws and distances.
+	"""
+	x, z = _as_column(x), _as_column(z)
+	dx, dz = x - _as_column(from_x), z - _as_column(from_z)
+	return BatchRoute(
+		x,
+		z,
+		x/NETHER_SCALE,
+		z/NETHER_SCALE,
+		transform_cartesian_rads_to_minecraft_angles(np.arctan2(dz, dx)),
+		np.hypot(dx, dz)
+	)
+
+
+def round_routes(route: BatchRoute) -> list[np.ndarray]:
+	"""
+	Vectorized version of utils.route.round_route.
+
+	Args:
+		route (BatchRoute): The routes.
+
+	Returns:
+		list[np.ndarray]: The rounded nether_x, nether_z, yaw and distance
+			columns.
+	"""
+	values = (route.nether_x, route.nether_z, route.yaw, route.distance)
+	return [
+		round_coords(column, digits)
+		for column, digits in zip(values, ROUTE_DIGITS)
+	]
+
+
+def round_coords(values, digits: int = 2) -> np.ndarray:
+	"""
+	Vectorized round(value, digits) that gives exactly the same floats as
+	the scalar path (including normalizing -0.0 to 0.0), for formatting
+	many predictions at once.
+
+	Scaling, rounding to an integer and scaling back only differs from
+	Python's correctly rounded round() when the scaled value lies within
+	its own rounding error of a tie (or is too large to have a fraction),
+	so just those values fall back to round().
+
+	Args:
+		values: The values to round.
+		digits (int): The number of decimals to keep.
+
+	Returns:
+		np.ndarray: The rounded values.
+	"""
+	values = _as_column(values)
+	scale = 10.0**digits
+	with np.errstate(invalid="ignore"):
+		scaled = values*scale
+		rounded = np.rint(scaled)/scale
+		# the fraction is exact, only the scaling can be off (by half an ulp)
+		error = np.abs(scaled)*2.0**-50
+		near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= error
+		near_tie |= np.abs(scaled) >= 2.0**52
+
+	for i in np.flatnonzero(near_tie).tolist():
+		rounded[i] = round(float(values[i]), digits)
+
+	# adding 0.0 turns -0.0 into 0.0
+	return rounded + 0.0
+
+
+def explain_degenerate(
+	x1: float, z1: float, theta1: float,
+	x2: float, z2: float, theta2: float
+) -> Exception:
+	"""
+	Explains why a row was marked degenerate, with the same error the
+	scalar validators (or solve_stronghold) would raise for it.
+
+	Args:
+		x1 (float): X-coord of the first throw.
+		z1 (float): Z-coord of the first throw.
+		theta1 (float): Angle of the first throw (in Minecraft degrees).
+		x2 (float): X-coord of the second throw.
+		z2 (float): Z-coord of the second throw.
+		theta2 (float): Angle of the second throw (in Minecraft degrees).
+
+	Returns:
+		Exception: The CoordsError or AngleError for the row.
+	"""
+	code = check_coords(x1, z1, x2, z2) or check_angles(theta1, theta2)
+	return validation_error(code or ValidationCode.PARALLEL)
@@ -0,0 +1,306 @@
+"""
+Binary throw files for endtrace, a Minecraft stronghold prediction tool.
+
+Parsing text floats dominates replays of recorded sessions, so throws can be
+converted once into a compact fixed-width binary format and then replayed
+straight from a memory map. Reading never copies or parses anything: the
+columns handed to the batch API are views into the mapped file, so even
+multi-gigabyte files open instantly and are processed in chunks with
+constant memory.
+
+Format (little-endian):
+	header (32 bytes):
+		magic      8 bytes  b"ENDTRACE"
+		version    uint16   1
+		dtype      1 byte   b"d" (float64) or b"f" (float32)
+		(padding)  1 byte
+		fields     uint32   6
+		rows       uint64   the number of records
+		(reserved) 8 bytes
+	records: rows x (x1, z1, theta1, x2, z2, theta2), each a float64 or
+		float32 in that order.
+"""
+
+from typing import Iterable, Iterator, NamedTuple, TextIO
+from utils.batch import (
+	BatchPrediction, explain_degenerate, plan_routes, predict_strongholds,
+	round_coords, round_routes
+)
+from utils.route import ROUTE_FIELDS
+from utils.server import FIELDS
+from utils.stream import StreamStats, read_csv, read_jsonl
+import numpy as np
+import struct
+import sys
+import time
+
+MAGIC = b"ENDTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sHcxIQ8x")
+DTYPES = {"float64": b"d", "float32": b"f"}
+
+# rows handed to the batch API at once when replaying
+CHUNK_ROWS = 1 << 20
+
+
+class BinaryFormatError(ValueError):
+	"""
+	Raised when a file is not a valid binary throw file (bad magic, unknown
+	version or dtype, or truncated records).
+	"""
+	pass
+
+
+class ThrowColumns(NamedTuple):
+	"""
+	The six columns of a binary throw file, as read-only views into the
+	memory-mapped records (nothing is copied).
+
+	Attributes:
+		x1 (np.ndarray): X-coords of the first throws.
+		z1 (np.ndarray): Z-coords of the first throws.
+		theta1 (np.ndarray): Angles of the first throws.
+		x2 (np.ndarray): X-coords of the second throws.
+		z2 (np.ndarray): Z-coords of the second throws.
+		theta2 (np.ndarray): Angles of the second throws.
+	"""
+	x1: np.ndarray
+	z1: np.ndarray
+	theta1: np.ndarray
+	x2: np.ndarray
+	z2: np.ndarray
+	theta2: np.ndarray
+
+
+def _record_dtype(dtype: str) -> np.dtype:
+	"""The structured dtype of one record."""
+	base = np.dtype(dtype).newbyteorder("<")
+	return np.dtype([(field, base) for field in FIELDS])
+
+
+def _write_header(f, rows: int, dtype: str) -> None:
+	f.write(HEADER.pack(MAGIC, VERSION, DTYPES[dtype], len(FIELDS), rows))
+
+
+def write_throws(
+	path: str,
+	rows: Iterable[list[float]],
+	dtype: str = "float64",
+	chunk_rows: int = 65536
+) -> int:
+	"""
+	Writes throws to a binary throw file, buffering chunk_rows records at a
+	time so any number of rows can be written with constant memory.
+
+	Args:
+		path (str): The file to write.
+		rows (Iterable[list[float]]): The six values of each throw pair.
+		dtype (str): "float64", or "float32" for half the size (angles and
+			coords then keep about 7 significant digits).
+		chunk_rows (int): The number of records buffered between writes.
+
+	Returns:
+		int: The number of records written.
+
+	Raises:
+		ValueError: If dtype is not supported.
+	"""
+	if dtype not in DTYPES:
+		raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+
+	record = _record_dtype(dtype)
+	count = 0
+	with open(path, "wb") as f:
+		# the row count is patched in once every record is written
+		_write_header(f, 0, dtype)
+		buffer = []
+		for row in rows:
+			buffer.append(tuple(row))
+			if len(buffer) == chunk_rows:
+				f.write(np.array(buffer, dtype=record).tobytes())
+				count += len(buffer)
+				buffer.clear()
+		if buffer:
+			f.write(np.array(buffer, dtype=record).tobytes())
+			count += len(buffer)
+
+		f.seek(0)
+		_write_header(f, count, dtype)
+
+	return count
+
+
+def convert(
+	lines: Iterable[str],
+	path: str,
+	fmt: str = "csv",
+	dtype: str = "float64",
+	err: TextIO | None = None
+) -> StreamStats:
+	"""
+	Converts a CSV or JSONL throw log into a binary throw file. Rows that
+	cannot be parsed are reported to err and skipped; rows that parse but
+	cannot be triangulated are kept (replays report them).
+
+	Args:
+		lines (Iterable[str]): The input lines.
+		path (str): The binary file to write.
+		fmt (str): The input format, "csv" or "jsonl".
+		dtype (str): The record dtype, "float64" or "float32".
+		err (TextIO | None): Where unparsable rows are reported (defaults
+			to sys.stderr).
+
+	Returns:
+		StreamStats: The rows read, the rows skipped and the elapsed time.
+	"""
+	err = err or sys.stderr
+	rows = read_jsonl(lines) if fmt == "jsonl" else read_csv(lines)
+	skipped = 0
+
+	def values():
+		nonlocal skipped
+		for line_no, result in rows:
+			if isinstance(result, Exception):
+				skipped += 1
+				name = type(result).__name__
+				print(f"line {line_no}: {name}: {result}", file=err)
+			else:
+				yield result
+
+	start = time.perf_counter()
+	written = write_throws(path, values(), dtype)
+	return StreamStats(
+		written + skipped, skipped, time.perf_counter() - start
+	)
+
+
+def read_throws(path: str) -> ThrowColumns:
+	"""
+	Memory-maps a binary throw file.
+
+	Args:
+		path (str): The file to read.
+
+	Returns:
+		ThrowColumns: Zero-copy views of the six columns.
+
+	Raises:
+		BinaryFormatError: If the file is not a valid binary throw file.
+	"""
+	with open(path, "rb") as f:
+		header = f.read(HEADER.size)
+	if len(header) < HEADER.size:
+		raise BinaryFormatError("file is too short for a header")
+
+	magic, version, code, fields, rows = HEADER.unpack(header)
+	if magic != MAGIC:
+		raise BinaryFormatError("not an endtrace throw file")
+	if version != VERSION:
+		raise BinaryFormatError(f"unsupported version {version}")
+	dtypes = {code: name for name, code in DTYPES.items()}
+	if code not in dtypes or fields != len(FIELDS):
+		raise BinaryFormatError("unsupported record layout")
+
+	record = _record_dtype(dtypes[code])
+	if rows == 0:
+		records = np.zeros(0, dtype=record)
+	else:
+		try:
+			records = np.memmap(
+				path, dtype=record, mode="r", offset=HEADER.size,
+				shape=(rows,)
+			)
+		except ValueError:
+			raise BinaryFormatError("file is truncated")
+
+	return ThrowColumns(*(records[field] for field in FIELDS))
+
+
+def iter_predictions(
+	columns: ThrowColumns,
+	chunk_rows: int = CHUNK_ROWS
+) -> Iterator[tuple[int, BatchPrediction]]:
+	"""
+	Triangulates memory-mapped columns chunk by chunk, so temporaries stay
+	bounded however large the file is.
+
+	Args:
+		columns (ThrowColumns): The columns from read_throws.
+		chunk_rows (int): The number of rows per chunk.
+
+	Yields:
+		tuple[int, BatchPrediction]: The index of each chunk's first row
+			and its predictions.
+	"""
+	for start in range(0, len(columns.x1), chunk_rows):
+		chunk = [column[start:start + chunk_rows] for column in columns]
+		yield start, predict_strongholds(*chunk)
+
+
+def replay_file(
+	path: str,
+	out: TextIO,
+	chunk_rows: int = CHUNK_ROWS,
+	err: TextIO | None = None,
+	route: bool = False
+) -> StreamStats:
+	"""
+	Replays a binary throw file, writing `line,x,z` CSV rows like the
+	stream command (the line is the 1-based record number). Rows that
+	cannot be triangulated are reported to err.
+
+	Args:
+		path (str): The binary throw file.
+		out (TextIO): Where predictions are written.
+		chunk_rows (int): The number of rows per chunk.
+		err (TextIO | None): Where invalid rows are reported (defaults to
+			sys.stderr).
+		route (bool): Whether to add the Nether coords, yaw and distance
+			from the second throw (see utils.route).
+
+	Returns:
+		StreamStats: The row and error counts and the elapsed time.
+	"""
+	err = err or sys.stderr
+	start_time = time.perf_counter()
+	columns = read_throws(path)
+
+	out.write(",".join(("line", "x", "z") + (ROUTE_FIELDS if route else ())))
+	out.write("\n")
+
+	errors = 0
+	for start, prediction in iter_predictions(columns, chunk_rows):
+		for i in np.flatnonzero(prediction.degenerate).tolist():
+			row = [float(column[start + i]) for column in columns]
+			error = explain_degenerate(*row)
+			name = type(error).__name__
+			print(f"line {start + i + 1}: {name}: {error}", file=err)
+			errors += 1
+
+		valid = np.flatnonzero(~prediction.degenerate)
+		values = [
+			round_coords(prediction.x[valid]),
+			round_coords(prediction.z[valid])
+		]
+		if route:
+			values += round_routes(plan_routes(
+				prediction.x[valid],
+				prediction.z[valid],
+				columns.x2[start:start + chunk_rows][valid],
+				columns.z2[start:start + chunk_rows][valid]
+			))
+		rows = zip(
+			(valid + start + 1).tolist(),
+			*(column.tolist() for column in values)
+		)
+		if route:
+			out.write("".join(
+				f"{line},{x!r},{z!r},{nx!r},{nz!r},{yaw!r},{distance!r}\n"
+				for line, x, z, nx, nz, yaw, distance in rows
+			))
+		else:
+			out.write("".join(f"{line},{x!r},{z!r}\n" for line, x, z in rows))
+
+	return StreamStats(
+		len(columns.x1), errors, time.perf_counter() - start_time
+	)
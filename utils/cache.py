@@ -0,0 +1,125 @@
+"""
+Prediction cache for endtrace, a Minecraft stronghold prediction tool.
+
+Overlays and servers often receive the same pair of throws many times a
+second while the player stands still. PredictionCache sits in front of
+solve_stronghold and answers repeated queries from a bounded LRU table
+instead of redoing the trig. Keys are the exact inputs, so a cached
+prediction is always the one solve_stronghold would have returned.
+"""
+
+from collections import OrderedDict
+from typing import NamedTuple
+from endtrace import Prediction, solve_stronghold
+from utils import profiling
+import math
+
+
+class CacheInfo(NamedTuple):
+	"""
+	Statistics of a PredictionCache (like functools' cache_info).
+
+	Attributes:
+		hits (int): Predictions answered from the cache.
+		misses (int): Predictions that had to be solved.
+		maxsize (int): The most entries kept before evicting.
+		currsize (int): The entries currently cached.
+	"""
+	hits: int
+	misses: int
+	maxsize: int
+	currsize: int
+
+
+class PredictionCache:
+	"""
+	A bounded least-recently-used cache of stronghold predictions.
+
+	Keys are the exact input floats rather than values rounded to the F3
+	screen's precision: rounding would solve slightly different throws
+	(about 5 blocks off for 0.05 degrees at 1500 blocks) and throw away the
+	0.01 degree angles that mods and watch mode supply. Overlays resend the
+	very same floats, so exact keys still hit.
+	"""
+
+	__slots__ = ("_entries", "_maxsize", "hits", "misses")
+
+	def __init__(self, maxsize: int = 1024):
+		"""
+		Args:
+			maxsize (int): The most predictions to keep (at least 1).
+
+		Raises:
+			ValueError: If maxsize is less than 1.
+		"""
+		if maxsize < 1:
+			raise ValueError("maxsize must be at least 1")
+
+		self._entries = OrderedDict()
+		self._maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def predict(
+		self,
+		x1: float, z1: float, theta1: float,
+		x2: float, z2: float, theta2: float
+	) -> Prediction:
+		"""
+		Predicts the stronghold coordinates, reusing a cached prediction for
+		the same throws when there is one. Like solve_stronghold, the inputs
+		are not validated.
+
+		Args:
+			x1 (float): X-coord of the first throw.
+			z1 (float): Z-coord of the first throw.
+			theta1 (float): Angle of the first throw (in Minecraft degrees).
+			x2 (float): X-coord of the second throw.
+			z2 (float): Z-coord of the second throw.
+			theta2 (float): Angle of the second throw (in Minecraft degrees).
+
+		Returns:
+			Prediction: The same prediction as solve_stronghold.
+
+		Raises:
+			AngleError: If the throws are (numerically) parallel. Failures
+				are not cached.
+		"""
+		key = (x1, z1, theta1, x2, z2, theta2)
+		entries = self._entries
+		prediction = entries.get(key)
+		if prediction is not None:
+			entries.move_to_end(key)
+			self.hits += 1
+			if profiling.active is not None:
+				profiling.active.count("cache_hits")
+			return prediction
+
+		self.misses += 1
+		if profiling.active is not None:
+			profiling.active.count("cache_misses")
+		prediction = solve_stronghold(x1, z1, theta1, x2, z2, theta2)
+
+		# NaN keys never compare equal, so they would only fill the cache
+		if not (math.isfinite(prediction.x) and math.isfinite(prediction.z)):
+			return prediction
+		entries[key] = prediction
+		if len(entries) > self._maxsize:
+			entries.popitem(last=False)
+		return prediction
+
+	def info(self) -> CacheInfo:
+		"""
+		Returns:
+			CacheInfo: The hit/miss counters and current size.
+		"""
+		return CacheInfo(self.hits, self.misses, self._maxsize, len(self))
+
+	def clear(self) -> None:
+		"""Forgets every cached prediction and resets the counters."""
+		self._entries.clear()
+		self.hits = 0
+		self.misses = 0
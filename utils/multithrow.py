@@ -0,0 +1,120 @@
+"""
+Least-squares multi-throw solver for endtrace, a Minecraft stronghold
+prediction tool.
+
+Fits the point closest (in the least-squares sense) to every Eye of Ender
+ray seen so far. Throws can be added one at a time: the solver keeps running
+normal-equation sums, so each new throw costs O(1) no matter how many throws
+came before it.
+"""
+
+from typing import NamedTuple
+from endtrace import _transform_minecraft_angle_to_cartesian_rads
+from utils.validators import AngleError, _angle_out_of_bounds
+import math
+
+
+class MultiThrowPrediction(NamedTuple):
+	"""
+	The result of a least-squares stronghold prediction.
+
+	Attributes:
+		x (float): X-coord of the prediction.
+		z (float): Z-coord of the prediction.
+		residual (float): Root-mean-square perpendicular distance (in
+			blocks) from the prediction to each throw's line. Lower means
+			the throws agree more closely.
+		throws (int): The number of throws used.
+	"""
+	x: float
+	z: float
+	residual: float
+	throws: int
+
+
+class MultiThrowSolver:
+	"""
+	Incrementally fits a stronghold prediction to any number of throws.
+
+	Every throw contributes its line's normal vector n = (-sin, cos) to the
+	normal equations (sum n*n^T) p = sum n*n^T p_i, so only five running
+	sums plus a constant term for the residual are stored.
+	"""
+
+	__slots__ = ("_sxx", "_sxz", "_szz", "_bx", "_bz", "_cc", "_count")
+
+	def __init__(self, throws=()):
+		"""
+		Args:
+			throws: Optional iterable of (x, z, theta) throws to start with.
+		"""
+		self.reset()
+		for x, z, theta in throws:
+			self.add_throw(x, z, theta)
+
+	def __len__(self) -> int:
+		return self._count
+
+	def reset(self) -> None:
+		"""Forgets every throw added so far."""
+		self._sxx = self._sxz = self._szz = 0.0
+		self._bx = self._bz = self._cc = 0.0
+		self._count = 0
+
+	def add_throw(self, x: float, z: float, theta: float) -> None:
+		"""
+		Adds a throw to the running sums in O(1).
+
+		Args:
+			x (float): X-coord of the throw.
+			z (float): Z-coord of the throw.
+			theta (float): Angle of the throw (in Minecraft degrees).
+
+		Raises:
+			AngleError: If the angle is out of bounds.
+		"""
+		if _angle_out_of_bounds(theta):
+			raise AngleError("angle(s) out of bounds")
+
+		rads = _transform_minecraft_angle_to_cartesian_rads(theta)
+		nx, nz = -math.sin(rads), math.cos(rads)
+
+		# distance of the line from the origin along its normal
+		d = nx*x + nz*z
+
+		self._sxx += nx*nx
+		self._sxz += nx*nz
+		self._szz += nz*nz
+		self._bx += nx*d
+		self._bz += nz*d
+		self._cc += d*d
+		self._count += 1
+
+	def solve(self) -> MultiThrowPrediction:
+		"""
+		Solves the 2x2 normal equations for the current throws.
+
+		Returns:
+			MultiThrowPrediction: The prediction and its residual.
+
+		Raises:
+			ValueError: If fewer than two throws have been added.
+			AngleError: If all throws are parallel.
+		"""
+		if self._count < 2:
+			raise ValueError("at least two throws are required")
+
+		det = self._sxx*self._szz - self._sxz*self._sxz
+
+		# the trace equals the throw count, so this is scale-independent
+		if det <= 1e-12*self._count*self._count:
+			raise AngleError("angles must not all be parallel")
+
+		pred_x = (self._szz*self._bx - self._sxz*self._bz)/det
+		pred_z = (self._sxx*self._bz - self._sxz*self._bx)/det
+
+		# sum of squared distances: p^T A p - 2 b^T p + c = c - b^T p
+		sse = self._cc - (self._bx*pred_x + self._bz*pred_z)
+		residual = math.sqrt(max(sse, 0.0)/self._count)
+
+		return MultiThrowPrediction(pred_x, pred_z, residual, self._count)
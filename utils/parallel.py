@@ -0,0 +1,429 @@
+"""
+Parallel batch runner for endtrace, a Minecraft stronghold prediction tool.
+
+Scores large CSV/JSONL throw logs on every core. Input files are cut into
+shards at line boundaries and each shard is parsed, validated and
+triangulated (with the vectorized batch API) by a worker process. Workers
+hand their result columns back through shared memory rather than pickling
+rows, and the parent merges the shards in input order, so the output is the
+same as streaming the inputs one after another (see utils.stream).
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple, TextIO
+from utils.batch import (
+	explain_degenerate, plan_routes, predict_strongholds, round_coords,
+	round_routes
+)
+from utils.route import ROUTE_FIELDS
+from utils.stream import _csv_header_order, read_csv, read_jsonl
+import csv
+import io
+import numpy as np
+import os
+import sys
+import time
+
+# shards are cut about this large (in bytes) unless a file is smaller
+SHARD_BYTES = 16*1024*1024
+
+
+class Shard(NamedTuple):
+	"""
+	A line-aligned byte range of one input file.
+
+	Attributes:
+		index (int): The shard's position in the merged output.
+		path (str): The input file.
+		start (int): The offset of the shard's first byte.
+		end (int): The offset just past the shard's last byte.
+		fmt (str): The input format, "csv" or "jsonl".
+		order (list[int] | None): The CSV column order from the file's
+			header (None if it has none).
+		first (bool): Whether this is the first shard of its file.
+		route (bool): Whether to add the Nether coords, yaw and distance
+			from the second throw (see utils.route).
+	"""
+	index: int
+	path: str
+	start: int
+	end: int
+	fmt: str
+	order: list[int] | None
+	first: bool
+	route: bool = False
+
+
+class ShardResult(NamedTuple):
+	"""
+	What a worker reports back for one shard. The predictions themselves are
+	left in a shared memory block holding the line numbers (int64) followed
+	by the rounded x- and z-coords and any route columns (float64).
+
+	Attributes:
+		index (int): The shard's position in the merged output.
+		shm_name (str | None): The shared memory block (None if the shard
+			has no valid rows).
+		predictions (int): The number of valid rows in the block.
+		rows (int): The number of rows read (valid or not).
+		lines (int): The number of lines in the shard.
+		errors (list[tuple[int, str, str]]): The line number, exception
+			type and message of each invalid row.
+		seconds (float): The time the worker spent on the shard.
+		pid (int): The worker's process id.
+	"""
+	index: int
+	shm_name: str | None
+	predictions: int
+	rows: int
+	lines: int
+	errors: list[tuple[int, str, str]]
+	seconds: float
+	pid: int
+
+
+class WorkerStats(NamedTuple):
+	"""
+	Throughput of one worker process.
+
+	Attributes:
+		pid (int): The worker's process id.
+		shards (int): The number of shards it processed.
+		rows (int): The number of rows it read.
+		seconds (float): The time it spent on its shards.
+	"""
+	pid: int
+	shards: int
+	rows: int
+	seconds: float
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.rows/self.seconds if self.seconds > 0 else float("inf")
+
+
+class BatchStats(NamedTuple):
+	"""
+	Summary of a parallel batch run.
+
+	Attributes:
+		rows (int): The number of rows read.
+		errors (int): The number of invalid rows.
+		seconds (float): The wall-clock time of the run.
+		workers (list[WorkerStats]): Per-worker throughput.
+	"""
+	rows: int
+	errors: int
+	seconds: float
+	workers: list[WorkerStats]
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.rows/self.seconds if self.seconds > 0 else float("inf")
+
+
+def plan_shards(
+	paths: list[str],
+	fmt: str = "csv",
+	shard_bytes: int = SHARD_BYTES,
+	route: bool = False
+) -> list[Shard]:
+	"""
+	Cuts the input files into shards of about shard_bytes, each starting at
+	the beginning of a line.
+
+	Args:
+		paths (list[str]): The input files, in output order.
+		fmt (str): The input format, "csv" or "jsonl".
+		shard_bytes (int): The target size of each shard.
+		route (bool): Whether the shards also compute routes.
+
+	Returns:
+		list[Shard]: The shards of every file, in output order.
+	"""
+	shards = []
+	for path in paths:
+		size = os.path.getsize(path)
+		with open(path, "rb") as f:
+			order = None
+			if fmt == "csv":
+				# the header is the first non-blank row, like in read_csv
+				for line in f:
+					text = line.decode(errors="replace")
+					fields = next(csv.reader([text]), [])
+					if "".join(fields).strip():
+						order = _csv_header_order(fields)
+						break
+
+			bounds = [0]
+			for i in range(1, max(1, -(-size//shard_bytes))):
+				f.seek(max(i*shard_bytes - 1, bounds[-1]))
+				f.readline()
+				if f.tell() >= size:
+					break
+				if f.tell() > bounds[-1]:
+					bounds.append(f.tell())
+			bounds.append(size)
+
+		for start, end in zip(bounds, bounds[1:]):
+			shards.append(
+				Shard(
+					len(shards), path, start, end, fmt, order, start == 0,
+					route
+				)
+			)
+
+	return shards
+
+
+def _publish(lines: np.ndarray, columns: list[np.ndarray]) -> str:
+	"""
+	Copies the result columns into a new shared memory block that the
+	parent process is responsible for unlinking.
+
+	Returns:
+		str: The name of the block.
+	"""
+	n = len(lines)
+	size = 8*n*(1 + len(columns))
+	shm = shared_memory.SharedMemory(create=True, size=size)
+	np.ndarray(n, np.int64, shm.buf)[:] = lines
+	for i, column in enumerate(columns, start=1):
+		np.ndarray(n, np.float64, shm.buf, offset=8*n*i)[:] = column
+
+	# the parent unlinks the block once it has merged it, so this process
+	# must not clean it up (or warn about it) when it exits
+	resource_tracker.unregister(shm._name, "shared_memory")
+	name = shm.name
+	shm.close()
+	return name
+
+
+def run_shard(shard: Shard) -> ShardResult:
+	"""
+	Parses, validates and triangulates one shard. Runs in a worker process.
+
+	Args:
+		shard (Shard): The shard to process.
+
+	Returns:
+		ShardResult: The shard's errors and statistics, plus the name of
+			the shared memory block holding its predictions.
+	"""
+	start = time.perf_counter()
+	with open(shard.path, "rb") as f:
+		f.seek(shard.start)
+		data = f.read(shard.end - shard.start)
+
+	# split lines the same way as a file opened with newline=""
+	text = list(io.StringIO(data.decode(errors="replace"), newline=""))
+
+	if shard.fmt == "jsonl":
+		rows = read_jsonl(text)
+	elif shard.first:
+		rows = read_csv(text)
+	else:
+		rows = read_csv(text, shard.order, header=False)
+
+	count = 0
+	lines, values, errors = [], [], []
+	for line_no, result in rows:
+		count += 1
+		if isinstance(result, Exception):
+			errors.append((line_no, type(result).__name__, str(result)))
+		else:
+			lines.append(line_no)
+			values.append(result)
+
+	lines = np.array(lines, dtype=np.int64)
+	columns = np.array(values, dtype=np.float64).reshape(-1, 6).T
+	prediction = predict_strongholds(*columns)
+
+	# report degenerate rows with the same errors as the scalar validators
+	for i in np.flatnonzero(prediction.degenerate).tolist():
+		error = explain_degenerate(*values[i])
+		errors.append((int(lines[i]), type(error).__name__, str(error)))
+	errors.sort()
+
+	valid = ~prediction.degenerate
+	lines = lines[valid]
+	results = [
+		round_coords(prediction.x[valid]), round_coords(prediction.z[valid])
+	]
+	if shard.route:
+		results += round_routes(plan_routes(
+			prediction.x[valid], prediction.z[valid],
+			columns[3][valid], columns[4][valid]
+		))
+
+	shm_name = _publish(lines, results) if len(lines) else None
+	return ShardResult(
+		shard.index, shm_name, len(lines), count, len(text), errors,
+		time.perf_counter() - start, os.getpid()
+	)
+
+
+def _collect(result: ShardResult, count: int) -> list[list]:
+	"""
+	Copies a shard's predictions out of shared memory and unlinks it.
+
+	Args:
+		result (ShardResult): The shard's result.
+		count (int): The number of float columns in the block.
+
+	Returns:
+		list[list]: The line numbers followed by each column's values.
+	"""
+	if result.shm_name is None:
+		return [[] for _ in range(count + 1)]
+
+	n = result.predictions
+	shm = shared_memory.SharedMemory(name=result.shm_name)
+	try:
+		columns = [np.ndarray(n, np.int64, shm.buf).tolist()]
+		for i in range(1, count + 1):
+			columns.append(
+				np.ndarray(n, np.float64, shm.buf, offset=8*n*i).tolist()
+			)
+	finally:
+		shm.close()
+		shm.unlink()
+	return columns
+
+
+def _discard(pending: deque) -> None:
+	"""
+	Cancels the shards that have not started and unlinks the shared memory
+	of those that finished but were never merged (workers hand their blocks
+	over to the parent, so nothing else would ever remove them).
+
+	Args:
+		pending (deque): The futures of the shards still in flight.
+	"""
+	for future in pending:
+		future.cancel()
+	for future in pending:
+		if future.cancelled():
+			continue
+		try:
+			name = future.result().shm_name
+		except Exception:
+			continue
+		if name is None:
+			continue
+		try:
+			shm = shared_memory.SharedMemory(name=name)
+		except FileNotFoundError:
+			continue
+		shm.close()
+		shm.unlink()
+
+
+def run_batch(
+	paths: list[str],
+	out: TextIO,
+	fmt: str = "csv",
+	workers: int | None = None,
+	shard_bytes: int = SHARD_BYTES,
+	err: TextIO | None = None,
+	route: bool = False
+) -> BatchStats:
+	"""
+	Triangulates every row of the input files on several cores. Output
+	matches utils.stream.stream_file run on the inputs one after another
+	(line numbers count on through every file). Invalid rows are reported
+	as "path:line: ..." with the line number within that file.
+
+	Args:
+		paths (list[str]): The input files.
+		out (TextIO): Where predictions are written.
+		fmt (str): The input (and output) format, "csv" or "jsonl".
+		workers (int | None): The number of worker processes (defaults to
+			the number of cpus).
+		shard_bytes (int): The target size of each shard.
+		err (TextIO | None): Where invalid rows are reported (defaults to
+			sys.stderr).
+		route (bool): Whether to add the Nether coords, yaw and distance
+			from the second throw (see utils.route).
+
+	Returns:
+		BatchStats: The row and error counts, the elapsed time and each
+			worker's throughput.
+	"""
+	err = err or sys.stderr
+	workers = workers or os.cpu_count() or 1
+	start = time.perf_counter()
+	shards = plan_shards(paths, fmt, shard_bytes, route)
+
+	names = ("x", "z") + (ROUTE_FIELDS if route else ())
+	if fmt == "csv":
+		out.write(",".join(("line",) + names) + "\n")
+		template = "{}" + ",{!r}"*len(names) + "\n"
+	else:
+		template = (
+			'{{"line": {}'
+			+ "".join(f', "{name}": {{!r}}' for name in names)
+			+ "}}\n"
+		)
+
+	rows = errors = offset = file_offset = 0
+	per_worker = {}
+	with ProcessPoolExecutor(workers) as pool:
+		# keep a bounded window of shards in flight so finished but not yet
+		# merged results never pile up in shared memory
+		queue = iter(shards)
+		pending = deque(
+			pool.submit(run_shard, shard)
+			for _, shard in zip(range(2*workers), queue)
+		)
+
+		try:
+			while pending:
+				# a shard stays pending until it is merged, so _discard
+				# still finds it if merging fails
+				result = pending[0].result()
+				shard = next(queue, None)
+				if shard is not None:
+					pending.append(pool.submit(run_shard, shard))
+
+				lines, *values = _collect(result, len(names))
+				pending.popleft()
+				out.write("".join(
+					template.format(offset + line, *row)
+					for line, *row in zip(lines, *values)
+				))
+
+				shard = shards[result.index]
+				if shard.first:
+					file_offset = 0
+				for line, name, message in result.errors:
+					line += file_offset
+					print(
+						f"{shard.path}:{line}: {name}: {message}", file=err
+					)
+
+				offset += result.lines
+				file_offset += result.lines
+				rows += result.rows
+				errors += len(result.errors)
+				shards_done, worker_rows, seconds = per_worker.get(
+					result.pid, (0, 0, 0.0)
+				)
+				per_worker[result.pid] = (
+					shards_done + 1,
+					worker_rows + result.rows,
+					seconds + result.seconds
+				)
+		finally:
+			# on an error or Ctrl-C, the blocks of finished shards would
+			# otherwise stay in /dev/shm for good
+			_discard(pending)
+
+	return BatchStats(
+		rows,
+		errors,
+		time.perf_counter() - start,
+		[WorkerStats(pid, *totals) for pid, totals in per_worker.items()]
+	)
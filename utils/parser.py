@@ -11,6 +11,23 @@ Arguments:
 	x1, z1, theta1: Coordinates and angle of the first throw.
     x2, z2, theta2: Coordinates and angle of the second throw.
     -g, --graph: Optional flag to enable graphical output.
+    --graph-out: Optional image file (PNG/SVG) to save the graph to instead.
+    --graph-backend: Which renderer --graph-out uses (builtin or matplotlib).
+    -t, --terminal-graph: Optional flag to print the graph as text.
+    -u, --uncertainty: Optional flag to print the prediction's error ellipse.
+    -r, --rings: Optional flag to rank candidate chunks using the ring prior.
+    --route: Optional flag to print Nether coords, the yaw and the distance.
+    --seed: Optional world seed to snap the prediction to a real stronghold.
+    --profile: Optional flag to print per-stage timings and counters.
+
+Commands:
+    serve: Keeps one process running and answers JSON-line requests.
+    stream: Triangulates every row of a CSV/JSONL throw log.
+    batch: Triangulates large throw logs on several cores.
+    convert: Converts a throw log into a memory-mappable binary file.
+    watch: Follows F3+C commands in a log or clipboard file as they arrive.
+    single: Guesses the stronghold location from one throw and the rings.
+    seed: Lists the strongholds generated from a world seed.
 """
 
 import argparse
@@ -65,3 +82,337 @@ parser.add_argument(
 	help="show a graph of the endtrace stronghold prediction",
 	action="store_true"
 )
+
+parser.add_argument(
+	"--graph-out",
+	metavar="FILE",
+	help="save the graph to an image file (e.g., graph.png or graph.svg) "
+		"without opening a window"
+)
+
+parser.add_argument(
+	"--graph-backend",
+	choices=["auto", "builtin", "matplotlib"],
+	default="auto",
+	help="the renderer used by --graph-out (default: auto, the fast "
+		"builtin renderer for .svg files and matplotlib otherwise)"
+)
+
+parser.add_argument(
+	"-t",
+	"--terminal-graph",
+	help="print the graph in the terminal (no matplotlib needed)",
+	action="store_true"
+)
+
+# add the (optional) uncertainty arguments
+parser.add_argument(
+	"-u",
+	"--uncertainty",
+	help="also print the 95%% error ellipse of the prediction",
+	action="store_true"
+)
+
+parser.add_argument(
+	"--angle-std",
+	type=float,
+	metavar="DEGREES",
+	help="the standard deviation of each angle used by --uncertainty "
+		"(default: 0.029, the f3 screen's 0.1 degree rounding)"
+)
+
+# add the (optional) ring prior argument
+parser.add_argument(
+	"-r",
+	"--rings",
+	help="also rank the most likely stronghold chunks using the known "
+		"stronghold rings",
+	action="store_true"
+)
+
+# add the (optional) route argument
+parser.add_argument(
+	"--route",
+	help="also print the nether coords of the prediction and the yaw and "
+		"distance to it from your second throw",
+	action="store_true"
+)
+
+# add the (optional) seed argument
+parser.add_argument(
+	"--seed",
+	help="the world seed (a number or text); also snap the prediction to "
+		"the nearest stronghold it generates (java edition 1.19+)"
+)
+
+# add the (optional) profiling arguments
+parser.add_argument(
+	"--profile",
+	help="print the time spent in each stage and event counters to stderr",
+	action="store_true"
+)
+
+parser.add_argument(
+	"--profile-format",
+	choices=["text", "json", "prometheus"],
+	default="text",
+	help="the format of --profile's output (default: text)"
+)
+
+# commands are parsed separately (keyed by the first argument) so the six
+# positional floats above keep working without a command name
+serve_parser = argparse.ArgumentParser(
+	prog="endtrace serve",
+	description="answers json-line prediction requests from a persistent "
+		"process (reads stdin unless a socket is given)"
+)
+
+serve_parser.add_argument(
+	"--host",
+	default="127.0.0.1",
+	help="the host to listen on when --port is given (default: 127.0.0.1)"
+)
+
+serve_parser.add_argument(
+	"--port",
+	type=int,
+	help="listen on this tcp port instead of reading stdin"
+)
+
+serve_parser.add_argument(
+	"--unix",
+	metavar="PATH",
+	help="listen on this unix socket instead of reading stdin"
+)
+
+serve_parser.add_argument(
+	"--cache-size",
+	type=int,
+	default=0,
+	metavar="N",
+	help="cache up to N predictions for repeated requests (default: 0, off)"
+)
+
+stream_parser = argparse.ArgumentParser(
+	prog="endtrace stream",
+	description="triangulates every row of a csv or jsonl throw log"
+)
+
+stream_parser.add_argument(
+	"input",
+	nargs="?",
+	default="-",
+	help="the csv/jsonl file to read (default: - for stdin)"
+)
+
+stream_parser.add_argument(
+	"-f",
+	"--format",
+	choices=["csv", "jsonl", "binary"],
+	help="the input format (default: guessed from the file extension, "
+		".etb for binary)"
+)
+
+stream_parser.add_argument(
+	"-o",
+	"--output",
+	default="-",
+	help="where to write predictions (default: - for stdout)"
+)
+
+stream_parser.add_argument(
+	"--route",
+	action="store_true",
+	help="add nether_x, nether_z, yaw and distance (from the second "
+		"throw) columns"
+)
+
+convert_parser = argparse.ArgumentParser(
+	prog="endtrace convert",
+	description="converts a csv or jsonl throw log into a binary throw "
+		"file for fast replays"
+)
+
+convert_parser.add_argument(
+	"input",
+	help="the csv/jsonl file to read (- for stdin)"
+)
+
+convert_parser.add_argument(
+	"output",
+	help="the binary throw file to write (e.g., throws.etb)"
+)
+
+convert_parser.add_argument(
+	"-f",
+	"--format",
+	choices=["csv", "jsonl"],
+	help="the input format (default: guessed from the file extension)"
+)
+
+convert_parser.add_argument(
+	"--float32",
+	action="store_true",
+	help="store float32 instead of float64 values (half the size)"
+)
+
+batch_parser = argparse.ArgumentParser(
+	prog="endtrace batch",
+	description="triangulates large csv or jsonl throw logs on several "
+		"cores"
+)
+
+batch_parser.add_argument(
+	"inputs",
+	nargs="+",
+	metavar="input",
+	help="the csv/jsonl files to read (output line numbers count on through "
+		"them, errors give each file's own line numbers)"
+)
+
+batch_parser.add_argument(
+	"-f",
+	"--format",
+	choices=["csv", "jsonl"],
+	help="the input format (default: guessed from the first file's "
+		"extension)"
+)
+
+batch_parser.add_argument(
+	"-o",
+	"--output",
+	default="-",
+	help="where to write predictions (default: - for stdout)"
+)
+
+batch_parser.add_argument(
+	"-w",
+	"--workers",
+	type=int,
+	metavar="N",
+	help="the number of worker processes (default: one per cpu)"
+)
+
+batch_parser.add_argument(
+	"--shard-size",
+	type=float,
+	default=16,
+	metavar="MB",
+	help="the size of the pieces files are split into (default: 16)"
+)
+
+batch_parser.add_argument(
+	"--route",
+	action="store_true",
+	help="add nether_x, nether_z, yaw and distance (from the second "
+		"throw) columns"
+)
+
+watch_parser = argparse.ArgumentParser(
+	prog="endtrace watch",
+	description="follows a game log or clipboard export for f3+c "
+		"/execute ... tp commands and updates the prediction after every "
+		"throw"
+)
+
+watch_parser.add_argument(
+	"file",
+	help="the file to follow (- for stdin)"
+)
+
+watch_parser.add_argument(
+	"--from-start",
+	action="store_true",
+	help="also use the throws already in the file"
+)
+
+watch_parser.add_argument(
+	"--interval",
+	type=float,
+	default=0.05,
+	metavar="SECONDS",
+	help="how often to check the file for new data (default: 0.05)"
+)
+
+watch_parser.add_argument(
+	"--reset-after",
+	type=float,
+	metavar="SECONDS",
+	help="start a new stronghold after this long without a throw"
+)
+
+watch_parser.add_argument(
+	"--robust",
+	action="store_true",
+	help="reject throws that disagree with the others by more than a "
+		"degree (e.g., from a misaligned crosshair)"
+)
+
+single_parser = argparse.ArgumentParser(
+	prog="endtrace single",
+	description="guesses the stronghold location from a single throw "
+		"using the known stronghold rings"
+)
+
+single_parser.add_argument(
+	"x",
+	type=float,
+	help="the x-coord of your throw"
+)
+
+single_parser.add_argument(
+	"z",
+	type=float,
+	help="the z-coord of your throw"
+)
+
+single_parser.add_argument(
+	"theta",
+	type=float,
+	help="the angle of your throw (in degrees)"
+)
+
+single_parser.add_argument(
+	"--angle-std",
+	type=float,
+	metavar="DEGREES",
+	help="the standard deviation of the angle (default: 0.029, the f3 "
+		"screen's 0.1 degree rounding)"
+)
+
+single_parser.add_argument(
+	"--min-probability",
+	type=float,
+	default=0.001,
+	help="hide ring segments less likely than this (default: 0.001)"
+)
+
+seed_parser = argparse.ArgumentParser(
+	prog="endtrace seed",
+	description="lists the strongholds generated from a world seed (java "
+		"edition 1.19+, before biome snapping moves each by up to 112 "
+		"blocks)"
+)
+
+seed_parser.add_argument(
+	"seed",
+	help="the world seed (a number or text)"
+)
+
+seed_parser.add_argument(
+	"--ring",
+	type=int,
+	choices=range(1, 9),
+	metavar="N",
+	help="only list the strongholds of ring N (1 to 8)"
+)
+
+commands = {
+	"serve": serve_parser,
+	"stream": stream_parser,
+	"batch": batch_parser,
+	"convert": convert_parser,
+	"watch": watch_parser,
+	"single": single_parser,
+	"seed": seed_parser,
+}
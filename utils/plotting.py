@@ -0,0 +1,154 @@
+"""
+Matplotlib visualization for endtrace, a Minecraft stronghold prediction
+tool.
+
+This module is only imported when a graph is requested, so plain
+predictions (and `import endtrace`) never pay for loading matplotlib.
+
+plot_prediction shows an interactive window. GraphRenderer instead draws
+to PNG/SVG files with the Agg backend and no display: it builds one figure
+up front and only updates the line data for each prediction, so rendering
+many predictions (e.g., on a headless server) skips rebuilding the figure.
+For quick previews without matplotlib at all, see utils.quickplot.
+"""
+
+from typing import Iterable
+from utils.quickplot import _COLORS, _labels, _throw_lines
+import matplotlib.pyplot as plt
+
+
+def _setup_axes(ax) -> None:
+	"""Titles and orients the axes like the in-game map."""
+	ax.invert_yaxis()
+	ax.set_title("endtrace visualization")
+	ax.set_xlabel("x-axis")
+	ax.set_ylabel("z-axis (inverted)")
+
+
+def plot_prediction(prediction) -> None:
+	"""
+	Shows a graph of both throws and the stronghold prediction.
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+	"""
+	fig, ax = plt.subplots(figsize=(8, 5))
+
+	# set up the plot
+	_setup_axes(ax)
+	plt.tight_layout(pad=3.0)
+
+	# plot the throws and prediction
+	throw1, throw2, sh = _labels(prediction)
+	bounds, z1, z2 = _throw_lines(prediction)
+	ax.plot(bounds, z1, "-", lw=2.0, label=throw1, color=_COLORS[0])
+	ax.plot(bounds, z2, "-", lw=2.0, label=throw2, color=_COLORS[1])
+	ax.plot(
+		prediction.x, prediction.z, "o", label=sh, color=_COLORS[2]
+	)
+
+	plt.legend(loc="upper left")
+	plt.grid()
+	plt.show()
+
+
+class GraphRenderer:
+	"""
+	Renders predictions to image files without a display. The figure, axes,
+	lines and legend are created once; each render only swaps in the new
+	data and labels before saving.
+	"""
+
+	__slots__ = ("figure", "_ax", "_lines", "_texts")
+
+	def __init__(self, figsize: tuple[float, float] = (8, 5), dpi: int = 100):
+		"""
+		Args:
+			figsize (tuple[float, float]): The image size (in inches).
+			dpi (int): The resolution of PNG output.
+		"""
+		# use the Agg canvas directly rather than pyplot, so no gui backend
+		# (or display) is ever needed and the figure is never tracked
+		from matplotlib.backends.backend_agg import FigureCanvasAgg
+		from matplotlib.figure import Figure
+
+		self.figure = Figure(figsize=figsize, dpi=dpi)
+		FigureCanvasAgg(self.figure)
+		ax = self._ax = self.figure.add_subplot()
+
+		_setup_axes(ax)
+		self.figure.tight_layout(pad=3.0)
+
+		(throw1,) = ax.plot([], [], "-", lw=2.0, label=" ", color=_COLORS[0])
+		(throw2,) = ax.plot([], [], "-", lw=2.0, label=" ", color=_COLORS[1])
+		(point,) = ax.plot([], [], "o", label=" ", color=_COLORS[2])
+		self._lines = (throw1, throw2, point)
+		self._texts = ax.legend(loc="upper left").get_texts()
+		ax.grid()
+
+	def render(self, prediction, path: str, fmt: str | None = None) -> None:
+		"""
+		Draws a prediction and saves it.
+
+		Args:
+			prediction (endtrace.Prediction): The prediction to visualize.
+			path (str): The image file to write.
+			fmt (str | None): The image format, e.g. "png" or "svg"
+				(defaults to the file extension).
+		"""
+		throw1, throw2, point = self._lines
+		bounds, z1, z2 = _throw_lines(prediction)
+		throw1.set_data(bounds, z1)
+		throw2.set_data(bounds, z2)
+		point.set_data([prediction.x], [prediction.z])
+		for text, label in zip(self._texts, _labels(prediction)):
+			text.set_text(label)
+
+		# rescale to the new data (an inverted axis stays inverted)
+		self._ax.relim()
+		self._ax.autoscale_view()
+		self.figure.savefig(path, format=fmt)
+
+	def render_many(
+		self,
+		predictions: Iterable,
+		paths: Iterable[str],
+		fmt: str | None = None
+	) -> int:
+		"""
+		Renders each prediction to the matching path, reusing the figure.
+
+		Args:
+			predictions (Iterable[endtrace.Prediction]): The predictions.
+			paths (Iterable[str]): One image file per prediction.
+			fmt (str | None): The image format (defaults to each file's
+				extension).
+
+		Returns:
+			int: The number of images written.
+		"""
+		count = 0
+		for prediction, path in zip(predictions, paths):
+			self.render(prediction, path, fmt)
+			count += 1
+		return count
+
+
+_renderer = None
+
+
+def render_prediction(prediction, path: str, fmt: str | None = None) -> None:
+	"""
+	Saves a graph of a prediction to an image file with a shared
+	GraphRenderer (see GraphRenderer.render).
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+		path (str): The image file to write (e.g., "graph.png" or
+			"graph.svg").
+		fmt (str | None): The image format (defaults to the extension).
+	"""
+	global _renderer
+	if _renderer is None:
+		_renderer = GraphRenderer()
+	_renderer.render(prediction, path, fmt)
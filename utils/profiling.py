@@ -0,0 +1,303 @@
+"""
+Opt-in instrumentation for endtrace, a Minecraft stronghold prediction tool.
+
+The prediction pipeline (argument parsing, validation, angle conversion,
+solving, formatting and plotting) records how long each stage takes and
+counts events such as predictions, validation failures by type and cache
+hits, but only while a Profiler is active. When none is, every hook is a
+single check of a module global, so instrumented code runs at full speed.
+
+Usage:
+	from utils import profiling
+
+	with profiling.profile() as profiler:
+		solve_stronghold(...)
+	print(profiler.to_prometheus())
+"""
+
+from typing import Iterator
+import contextlib
+import time
+
+# the profiler hooks record into (None when profiling is off)
+active = None
+
+_DISABLED = contextlib.nullcontext()
+
+
+class StageStats:
+	"""
+	Timings of one pipeline stage.
+
+	Attributes:
+		calls (int): How many times the stage ran.
+		seconds (float): The total time spent in it.
+		min_seconds (float): The fastest run.
+		max_seconds (float): The slowest run.
+	"""
+
+	__slots__ = ("calls", "seconds", "min_seconds", "max_seconds")
+
+	def __init__(self):
+		self.calls = 0
+		self.seconds = 0.0
+		self.min_seconds = float("inf")
+		self.max_seconds = 0.0
+
+	@property
+	def mean_seconds(self) -> float:
+		return self.seconds/self.calls if self.calls else 0.0
+
+
+class Profiler:
+	"""
+	Collects per-stage timings and event counters.
+	"""
+
+	__slots__ = ("stages", "counters")
+
+	def __init__(self):
+		self.stages: dict[str, StageStats] = {}
+		self.counters: dict[tuple[str, tuple], int] = {}
+
+	def record(self, stage: str, seconds: float) -> None:
+		"""
+		Adds one timed run of a stage.
+
+		Args:
+			stage (str): The stage name (e.g., "solve").
+			seconds (float): How long it took.
+		"""
+		stats = self.stages.get(stage)
+		if stats is None:
+			stats = self.stages[stage] = StageStats()
+		stats.calls += 1
+		stats.seconds += seconds
+		if seconds < stats.min_seconds:
+			stats.min_seconds = seconds
+		if seconds > stats.max_seconds:
+			stats.max_seconds = seconds
+
+	def count(self, name: str, value: int = 1, labels: tuple = ()) -> None:
+		"""
+		Increments a counter.
+
+		Args:
+			name (str): The counter name (e.g., "predictions").
+			value (int): The amount to add.
+			labels (tuple): (key, value) pairs telling apart series of the
+				same counter, e.g. (("error", "AngleError"),).
+		"""
+		key = (name, labels)
+		self.counters[key] = self.counters.get(key, 0) + value
+
+	@contextlib.contextmanager
+	def stage(self, name: str) -> Iterator[None]:
+		"""Times the body of a with statement as a run of a stage."""
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(name, time.perf_counter() - start)
+
+	def to_dict(self) -> dict:
+		"""
+		Returns:
+			dict: The timings (in seconds) of every stage and the value and
+				labels of every counter, ready for json.dumps.
+		"""
+		return {
+			"stages": {
+				name: {
+					"calls": stats.calls,
+					"seconds": stats.seconds,
+					"mean_seconds": stats.mean_seconds,
+					"min_seconds": stats.min_seconds,
+					"max_seconds": stats.max_seconds
+				}
+				for name, stats in self.stages.items()
+			},
+			"counters": [
+				{"name": name, "labels": dict(labels), "value": value}
+				for (name, labels), value in self.counters.items()
+			]
+		}
+
+	def to_json(self) -> str:
+		"""
+		Returns:
+			str: to_dict as a JSON document.
+		"""
+		import json
+		return json.dumps(self.to_dict(), indent=2) + "\n"
+
+	def to_prometheus(self, prefix: str = "endtrace") -> str:
+		"""
+		Formats the data in the Prometheus text exposition format, e.g. for
+		a node exporter's textfile collector.
+
+		Args:
+			prefix (str): The prefix of every metric name.
+
+		Returns:
+			str: The metrics, one sample per line.
+		"""
+		lines = []
+
+		def metric(name, kind, help_text, samples):
+			lines.append(f"# HELP {prefix}_{name} {help_text}")
+			lines.append(f"# TYPE {prefix}_{name} {kind}")
+			for labels, value in samples:
+				lines.append(f"{prefix}_{name}{_labels(labels)} {value!r}")
+
+		stages = sorted(self.stages.items())
+		metric(
+			"stage_seconds_total", "counter",
+			"Time spent in each pipeline stage.",
+			[((("stage", name),), stats.seconds) for name, stats in stages]
+		)
+		metric(
+			"stage_calls_total", "counter",
+			"Runs of each pipeline stage.",
+			[((("stage", name),), stats.calls) for name, stats in stages]
+		)
+		metric(
+			"stage_max_seconds", "gauge",
+			"The slowest run of each pipeline stage.",
+			[((("stage", name),), stats.max_seconds) for name, stats in stages]
+		)
+
+		names = sorted({name for name, _ in self.counters})
+		for name in names:
+			metric(
+				f"{name}_total", "counter", f"Count of {name.replace('_', ' ')}.",
+				[
+					(labels, value)
+					for (counter, labels), value in sorted(self.counters.items())
+					if counter == name
+				]
+			)
+
+		return "\n".join(lines) + "\n"
+
+	def to_text(self) -> str:
+		"""
+		Returns:
+			str: A human-readable table of the stages and counters.
+		"""
+		lines = [f"{'stage':<18}{'calls':>8}{'total ms':>12}{'mean us':>12}"]
+		for name, stats in self.stages.items():
+			lines.append(
+				f"{name:<18}{stats.calls:>8}{stats.seconds*1e3:>12.3f}"
+				f"{stats.mean_seconds*1e6:>12.2f}"
+			)
+		for (name, labels), value in self.counters.items():
+			lines.append(f"{name}{_labels(labels)}: {value}")
+		return "\n".join(lines) + "\n"
+
+	def export(self, fmt: str = "text") -> str:
+		"""
+		Args:
+			fmt (str): "text", "json" or "prometheus".
+
+		Returns:
+			str: The data in that format.
+
+		Raises:
+			ValueError: If the format is unknown.
+		"""
+		if fmt == "text":
+			return self.to_text()
+		if fmt == "json":
+			return self.to_json()
+		if fmt == "prometheus":
+			return self.to_prometheus()
+		raise ValueError(f"unknown profile format {fmt!r}")
+
+
+def _labels(labels: tuple) -> str:
+	"""Formats labels like {key="value"} (or nothing if there are none)."""
+	if not labels:
+		return ""
+	escaped = (
+		(key, str(value).replace("\\", "\\\\").replace('"', '\\"')
+			.replace("\n", "\\n"))
+		for key, value in labels
+	)
+	return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def enable(profiler: Profiler | None = None) -> Profiler:
+	"""
+	Starts recording into a profiler.
+
+	Args:
+		profiler (Profiler | None): The profiler (defaults to a new one).
+
+	Returns:
+		Profiler: The active profiler.
+	"""
+	global active
+	active = profiler or Profiler()
+	return active
+
+
+def disable() -> Profiler | None:
+	"""
+	Stops recording.
+
+	Returns:
+		Profiler | None: The profiler that was active.
+	"""
+	global active
+	profiler, active = active, None
+	return profiler
+
+
+@contextlib.contextmanager
+def profile(profiler: Profiler | None = None) -> Iterator[Profiler]:
+	"""
+	Records into a profiler for the body of a with statement, then restores
+	whichever profiler was active before.
+
+	Args:
+		profiler (Profiler | None): The profiler (defaults to a new one).
+
+	Yields:
+		Profiler: The active profiler.
+	"""
+	global active
+	previous = active
+	try:
+		yield enable(profiler)
+	finally:
+		active = previous
+
+
+def stage(name: str):
+	"""
+	Times the body of a with statement as a run of a stage, if a profiler is
+	active.
+
+	Args:
+		name (str): The stage name.
+
+	Returns:
+		A context manager.
+	"""
+	if active is None:
+		return _DISABLED
+	return active.stage(name)
+
+
+def count(name: str, value: int = 1, **labels) -> None:
+	"""
+	Increments a counter, if a profiler is active.
+
+	Args:
+		name (str): The counter name.
+		value (int): The amount to add.
+		**labels: Labels telling apart series of the same counter.
+	"""
+	if active is not None:
+		active.count(name, value, tuple(sorted(labels.items())))
@@ -0,0 +1,358 @@
+"""
+Dependency-free graphs for endtrace, a Minecraft stronghold prediction tool.
+
+Loading matplotlib takes far longer than a prediction, so this module draws
+the same visualization as utils.plotting (both throws, their labels, the
+predicted point and a grid) with nothing but the standard library: as SVG
+text, or as a Unicode braille plot for the terminal (optionally coloured
+with ANSI escapes). Either takes well under a millisecond, so a picture is
+available instantly over SSH. utils.plotting remains the high-fidelity
+(PNG and interactive) backend.
+"""
+
+from typing import TextIO
+from xml.sax.saxutils import escape
+import math
+import os
+
+# the block distance plotted around the prediction
+_SPAN = 250
+_COLORS = ("#316364", "#659B7D", "#102C31")
+
+# the fraction of the data range added around it (like matplotlib)
+_MARGIN = 0.05
+
+# the svg canvas and its plot area (in pixels)
+_WIDTH, _HEIGHT = 800, 500
+_LEFT, _RIGHT, _TOP, _BOTTOM = 80, 770, 50, 440
+
+_ANSI = ("\033[36m", "\033[32m", "\033[1;31m")
+_RESET = "\033[0m"
+
+# the bit of each dot of a braille cell, indexed by [row][column]
+_BRAILLE = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))
+
+
+def _format_line(name: str, slope: float, intercept: float) -> str:
+	"""
+	Formats a throw's line in slope-intercept form for the legend.
+
+	Args:
+		name (str): The label of the throw.
+		slope (float): The rounded slope of the throw.
+		intercept (float): The rounded z-intercept of the throw.
+
+	Returns:
+		str: The formatted line, e.g. "throw1: z = 0.5x - 2.0".
+	"""
+	sign = "+"
+	if intercept < 0:
+		sign = "-"
+		intercept = abs(intercept)
+
+	return f"{name}: z = {slope}x {sign} {intercept}"
+
+
+def _labels(prediction) -> tuple[str, str, str]:
+	"""The legend labels of both throws and the prediction."""
+	# round the slopes and intercepts for visual appeal
+	return (
+		_format_line(
+			"throw1", round(prediction.m1, 2), round(prediction.b1, 2)
+		),
+		_format_line(
+			"throw2", round(prediction.m2, 2), round(prediction.b2, 2)
+		),
+		"stronghold prediction: "
+		f"({prediction.rounded_x}, {prediction.rounded_z})"
+	)
+
+
+def _throw_lines(prediction) -> tuple[list, list, list]:
+	"""The x-values and both throws' z-values around the prediction."""
+	m1, b1 = prediction.m1, prediction.b1
+	m2, b2 = prediction.m2, prediction.b2
+	bounds = [prediction.x - _SPAN, prediction.x, prediction.x + _SPAN]
+	return (
+		bounds,
+		[m1*x + b1 for x in bounds],
+		[m2*x + b2 for x in bounds]
+	)
+
+
+def _limits(values: list[float]) -> tuple[float, float]:
+	"""The plotted range of some values, with a margin on both sides."""
+	values = [value for value in values if math.isfinite(value)]
+	low, high = min(values), max(values)
+	pad = (high - low)*_MARGIN or 1.0
+	return low - pad, high + pad
+
+
+def _ticks(
+	low: float, high: float, target: int = 6
+) -> tuple[list[float], float]:
+	"""About target evenly spaced round values between low and high."""
+	raw = (high - low)/target
+	magnitude = 10**math.floor(math.log10(raw))
+	step = next(m*magnitude for m in (1, 2, 2.5, 5, 10) if m*magnitude >= raw)
+	first = math.ceil(low/step)
+	last = math.floor(high/step)
+	return [i*step for i in range(first, last + 1)], step
+
+
+def _tick_label(value: float, step: float) -> str:
+	"""Formats a tick with just enough decimals for its step."""
+	digits = 0
+	while abs(round(step, digits) - step) > step*1e-9:
+		digits += 1
+	return f"{round(value, digits) + 0.0:.{digits}f}"
+
+
+def _segments(prediction) -> list[tuple[float, float, float, float]]:
+	"""Each throw's line as (x1, z1, x2, z2), skipping undrawable ones."""
+	bounds, z1, z2 = _throw_lines(prediction)
+	segments = []
+	for zs in (z1, z2):
+		segment = (bounds[0], zs[0], bounds[-1], zs[-1])
+		segments.append(
+			segment if all(map(math.isfinite, segment)) else None
+		)
+	return segments
+
+
+def render_svg(prediction) -> str:
+	"""
+	Draws a prediction as a standalone SVG document.
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+
+	Returns:
+		str: The SVG document.
+	"""
+	bounds, z1, z2 = _throw_lines(prediction)
+	x_low, x_high = _limits(bounds)
+	z_low, z_high = _limits(z1 + z2 + [prediction.z])
+
+	# z grows downwards like svg's y-axis, so the z-axis is inverted for free
+	def px(x):
+		return _LEFT + (x - x_low)/(x_high - x_low)*(_RIGHT - _LEFT)
+
+	def py(z):
+		return _TOP + (z - z_low)/(z_high - z_low)*(_BOTTOM - _TOP)
+
+	parts = [
+		f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" '
+		f'height="{_HEIGHT}" viewBox="0 0 {_WIDTH} {_HEIGHT}" '
+		'font-family="sans-serif" font-size="12">',
+		f'<rect width="{_WIDTH}" height="{_HEIGHT}" fill="white"/>',
+		'<clipPath id="plot"><rect '
+		f'x="{_LEFT}" y="{_TOP}" width="{_RIGHT - _LEFT}" '
+		f'height="{_BOTTOM - _TOP}"/></clipPath>'
+	]
+
+	# grid and tick labels
+	ticks, step = _ticks(x_low, x_high)
+	for tick in ticks:
+		x = px(tick)
+		parts.append(
+			f'<line x1="{x:.2f}" y1="{_TOP}" x2="{x:.2f}" y2="{_BOTTOM}" '
+			'stroke="#b0b0b0" stroke-width="0.8"/>'
+			f'<text x="{x:.2f}" y="{_BOTTOM + 18}" text-anchor="middle">'
+			f"{_tick_label(tick, step)}</text>"
+		)
+	ticks, step = _ticks(z_low, z_high)
+	for tick in ticks:
+		y = py(tick)
+		parts.append(
+			f'<line x1="{_LEFT}" y1="{y:.2f}" x2="{_RIGHT}" y2="{y:.2f}" '
+			'stroke="#b0b0b0" stroke-width="0.8"/>'
+			f'<text x="{_LEFT - 6}" y="{y + 4:.2f}" text-anchor="end">'
+			f"{_tick_label(tick, step)}</text>"
+		)
+
+	# throws and prediction
+	parts.append('<g clip-path="url(#plot)">')
+	for segment, color in zip(_segments(prediction), _COLORS):
+		if segment is not None:
+			x1, z1_, x2, z2_ = segment
+			parts.append(
+				f'<line x1="{px(x1):.2f}" y1="{py(z1_):.2f}" '
+				f'x2="{px(x2):.2f}" y2="{py(z2_):.2f}" '
+				f'stroke="{color}" stroke-width="2"/>'
+			)
+	parts.append(
+		f'<circle cx="{px(prediction.x):.2f}" cy="{py(prediction.z):.2f}" '
+		f'r="4" fill="{_COLORS[2]}"/></g>'
+	)
+
+	# frame, title and axis labels
+	parts.append(
+		f'<rect x="{_LEFT}" y="{_TOP}" width="{_RIGHT - _LEFT}" '
+		f'height="{_BOTTOM - _TOP}" fill="none" stroke="black"/>'
+		f'<text x="{(_LEFT + _RIGHT)/2}" y="{_TOP - 12}" '
+		'text-anchor="middle" font-size="14">endtrace visualization</text>'
+		f'<text x="{(_LEFT + _RIGHT)/2}" y="{_HEIGHT - 20}" '
+		'text-anchor="middle">x-axis</text>'
+		f'<text transform="translate(20 {(_TOP + _BOTTOM)/2}) rotate(-90)" '
+		'text-anchor="middle">z-axis (inverted)</text>'
+	)
+
+	# legend (upper left)
+	labels = _labels(prediction)
+	width = 16 + 7*max(map(len, labels))
+	parts.append(
+		f'<rect x="{_LEFT + 8}" y="{_TOP + 8}" width="{width}" height="64" '
+		'fill="white" fill-opacity="0.8" stroke="#cccccc" rx="3"/>'
+	)
+	for i, (label, color) in enumerate(zip(labels, _COLORS)):
+		y = _TOP + 26 + 19*i
+		if i < 2:
+			marker = (
+				f'<line x1="{_LEFT + 16}" y1="{y - 4}" x2="{_LEFT + 36}" '
+				f'y2="{y - 4}" stroke="{color}" stroke-width="2"/>'
+			)
+		else:
+			marker = (
+				f'<circle cx="{_LEFT + 26}" cy="{y - 4}" r="4" '
+				f'fill="{color}"/>'
+			)
+		parts.append(
+			f'{marker}<text x="{_LEFT + 44}" y="{y}">{escape(label)}</text>'
+		)
+
+	parts.append("</svg>\n")
+	return "\n".join(parts)
+
+
+def write_svg(prediction, path: str) -> None:
+	"""
+	Saves a prediction as an SVG file (see render_svg).
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+		path (str): The file to write.
+	"""
+	with open(path, "w") as f:
+		f.write(render_svg(prediction))
+
+
+def render_terminal(
+	prediction,
+	width: int = 72,
+	height: int = 20,
+	color: bool = False
+) -> str:
+	"""
+	Draws a prediction as text with Unicode braille characters (each
+	character holds 2x4 dots), for terminals without any graphics.
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+		width (int): The plot width (in characters).
+		height (int): The plot height (in lines).
+		color (bool): Whether to colour the throws and the prediction with
+			ANSI escape codes.
+
+	Returns:
+		str: The plot, title and legend (ending with a newline).
+	"""
+	bounds, z1, z2 = _throw_lines(prediction)
+	x_low, x_high = _limits(bounds)
+	z_low, z_high = _limits(z1 + z2 + [prediction.z])
+	columns, rows = 2*width, 4*height
+
+	def dot(x, z):
+		column = round((x - x_low)/(x_high - x_low)*(columns - 1))
+		row = round((z - z_low)/(z_high - z_low)*(rows - 1))
+		return column, row
+
+	cells = [[0]*width for _ in range(height)]
+	inks = [[None]*width for _ in range(height)]
+	for ink, segment in enumerate(_segments(prediction)):
+		if segment is None:
+			continue
+		(c1, r1), (c2, r2) = dot(*segment[:2]), dot(*segment[2:])
+		steps = max(abs(c2 - c1), abs(r2 - r1), 1)
+		for i in range(steps + 1):
+			c = round(c1 + (c2 - c1)*i/steps)
+			r = round(r1 + (r2 - r1)*i/steps)
+			if 0 <= c < columns and 0 <= r < rows:
+				cells[r//4][c//2] |= _BRAILLE[r % 4][c % 2]
+				inks[r//4][c//2] = ink
+
+	column, row = dot(prediction.x, prediction.z)
+	marker = (row//4, column//2)
+
+	def paint(text, ink):
+		return f"{_ANSI[ink]}{text}{_RESET}" if color else text
+
+	# label the top, middle and bottom rows with their z-coords
+	z_labels = {
+		0: z_low, height//2: (z_low + z_high)/2, height - 1: z_high
+	}
+	z_labels = {r: f"{round(z, 1) + 0.0}" for r, z in z_labels.items()}
+	pad = max(map(len, z_labels.values()))
+
+	lines = ["endtrace visualization".center(pad + 2 + width).rstrip()]
+	for r in range(height):
+		chars = []
+		for c in range(width):
+			if (r, c) == marker:
+				chars.append(paint("●", 2))
+			elif cells[r][c]:
+				chars.append(paint(chr(0x2800 + cells[r][c]), inks[r][c]))
+			else:
+				chars.append(" ")
+		axis = "┤" if r in z_labels else "│"
+		lines.append(f"{z_labels.get(r, ''):>{pad}} {axis}{''.join(chars)}")
+
+	x_left = f"{round(x_low, 1) + 0.0}"
+	x_right = f"{round(x_high, 1) + 0.0}"
+	lines.append(" "*(pad + 1) + "└" + "─"*width)
+	lines.append(
+		" "*(pad + 2) + x_left + x_right.rjust(width - len(x_left))
+	)
+
+	for ink, label in enumerate(_labels(prediction)):
+		key = "●" if ink == 2 else "──"
+		lines.append(f"{paint(key.ljust(2), ink)} {label}")
+
+	return "\n".join(lines) + "\n"
+
+
+def supports_color(stream: TextIO) -> bool:
+	"""
+	Args:
+		stream (TextIO): Where the terminal plot will be written.
+
+	Returns:
+		bool: Whether the stream is a terminal and NO_COLOR is not set.
+	"""
+	return stream.isatty() and "NO_COLOR" not in os.environ
+
+
+def save_graph(prediction, path: str, backend: str = "auto") -> None:
+	"""
+	Saves a graph of a prediction, with the built-in SVG renderer or with
+	matplotlib (see utils.plotting.render_prediction).
+
+	Args:
+		prediction (endtrace.Prediction): The prediction to visualize.
+		path (str): The image file to write.
+		backend (str): "builtin" (SVG only), "matplotlib", or "auto" to use
+			the built-in renderer for .svg files and matplotlib otherwise.
+
+	Raises:
+		ValueError: If the built-in renderer is asked for anything but SVG.
+	"""
+	is_svg = os.path.splitext(path)[1].lower() == ".svg"
+	if backend == "builtin" and not is_svg:
+		raise ValueError("the builtin graph backend only writes .svg files")
+
+	if backend == "builtin" or (backend == "auto" and is_svg):
+		write_svg(prediction, path)
+	else:
+		# imported lazily so svg and terminal graphs never load matplotlib
+		from utils.plotting import render_prediction
+		render_prediction(prediction, path)
@@ -0,0 +1,626 @@
+"""
+Stronghold ring prior for endtrace, a Minecraft stronghold prediction tool.
+
+Java Edition places its 128 strongholds in 8 concentric rings around the
+origin (3 in the first ring, then 6, 10, 15, 21, 28, 36 and 9), so most of
+the map can never contain a stronghold. This module precomputes an index of
+every chunk that lies inside a ring and ranks those chunks by posterior
+probability given one or more Eye of Ender throws.
+
+The index stores each ring's chunks sorted by polar angle. A throw's ray
+only crosses a ring along one or two short arcs, so a query slices those
+arcs out with a binary search instead of scanning the whole ring.
+
+An Eye of Ender points at the nearest stronghold, so every candidate is also
+weighted by the chance that no other stronghold is closer to the thrower.
+That expected count only depends on the thrower's distance from the origin
+and the candidate's distance from the thrower, so it is precomputed once as
+a 2-D table.
+"""
+
+from typing import NamedTuple
+from endtrace import Prediction, _transform_minecraft_angle_to_cartesian_rads
+from utils.uncertainty import DEFAULT_ANGLE_STD, estimate_uncertainty
+from utils.validators import AngleError, _angle_out_of_bounds
+import functools
+import math
+import numpy as np
+
+# parameters of the "concentric_rings" stronghold placement (in chunks)
+STRONGHOLD_COUNT = 128
+RING_DISTANCE = 32
+RING_SPREAD = 3
+
+# strongholds are moved up to 112 blocks towards a suitable biome
+BIOME_SNAP = 112
+CHUNK = 16
+
+# stronghold positions are reported at the center of their chunk
+CELL_OFFSET = CHUNK/2
+
+# grid of the precomputed nearer-strongholds table (in blocks)
+NEARER_STEP = 256
+NEARER_MAX_ORIGIN = 32768
+NEARER_MAX_DISTANCE = 65536
+
+# gauss-legendre nodes for integrating along a single throw's ray
+QUADRATURE_NODES, QUADRATURE_WEIGHTS = np.polynomial.legendre.leggauss(16)
+
+
+class Ring(NamedTuple):
+	"""
+	One ring of strongholds.
+
+	Attributes:
+		index (int): The ring number (0 is the innermost ring).
+		count (int): The number of strongholds in the ring.
+		inner (float): The smallest possible distance from the origin
+			(in blocks, including biome snapping).
+		outer (float): The largest possible distance from the origin
+			(in blocks, including biome snapping).
+		slots (int): The number of evenly spaced angles the ring's
+			strongholds are placed at (one more than count in the last
+			ring, which the game runs out of strongholds to fill).
+	"""
+	index: int
+	count: int
+	inner: float
+	outer: float
+	slots: int
+
+
+class Candidate(NamedTuple):
+	"""
+	A candidate stronghold chunk.
+
+	Attributes:
+		x (float): X-coord of the chunk's center.
+		z (float): Z-coord of the chunk's center.
+		chunk_x (int): X-coord of the chunk.
+		chunk_z (int): Z-coord of the chunk.
+		ring (int): The ring the chunk belongs to.
+		probability (float): Posterior probability among the candidates.
+	"""
+	x: float
+	z: float
+	chunk_x: int
+	chunk_z: int
+	ring: int
+	probability: float
+
+
+def _build_rings() -> tuple[Ring, ...]:
+	"""
+	Replays the ring bookkeeping of the stronghold placement (without any
+	randomness) to get each ring's size and distance range.
+
+	Returns:
+		tuple[Ring, ...]: The rings from the innermost outwards.
+	"""
+	rings = []
+	spread = RING_SPREAD
+	placed = ring = 0
+	while placed < STRONGHOLD_COUNT:
+		count = min(spread, STRONGHOLD_COUNT - placed)
+
+		# distance = (4 + 6*ring)*distance +- 1.25*distance chunks
+		center = (4 + 6*ring)*RING_DISTANCE*CHUNK
+		half_width = 1.25*RING_DISTANCE*CHUNK
+		rings.append(Ring(
+			ring,
+			count,
+			center - half_width - BIOME_SNAP,
+			center + half_width + BIOME_SNAP,
+			spread
+		))
+
+		placed += count
+		ring += 1
+		spread += 2*spread//(ring + 1)
+
+		# the game caps the spread by the strongholds left counting the
+		# last one placed, so the final ring has an empty slot
+		spread = min(spread, STRONGHOLD_COUNT - placed + 1)
+
+	return tuple(rings)
+
+
+RINGS = _build_rings()
+
+
+def ring_of(distance: float) -> Ring | None:
+	"""
+	Finds the ring containing a distance from the origin.
+
+	Args:
+		distance (float): The distance from the origin (in blocks).
+
+	Returns:
+		Ring | None: The ring, or None if no stronghold can be that far.
+	"""
+	for ring in RINGS:
+		if ring.inner <= distance <= ring.outer:
+			return ring
+	return None
+
+
+class Segment(NamedTuple):
+	"""
+	A stretch of a single throw's ray that lies inside a stronghold ring.
+
+	Attributes:
+		ring (int): The ring the segment crosses.
+		start_x (float): X-coord where the segment starts.
+		start_z (float): Z-coord where the segment starts.
+		end_x (float): X-coord where the segment ends.
+		end_z (float): Z-coord where the segment ends.
+		x (float): X-coord of the most likely point on the segment.
+		z (float): Z-coord of the most likely point on the segment.
+		probability (float): Probability that the stronghold the throw
+			points at lies on this segment.
+	"""
+	ring: int
+	start_x: float
+	start_z: float
+	end_x: float
+	end_z: float
+	x: float
+	z: float
+	probability: float
+
+
+class RingCells(NamedTuple):
+	"""
+	The precomputed chunks of one ring, sorted by polar angle.
+
+	Attributes:
+		angle (np.ndarray): Polar angle of each chunk's center (radians).
+		chunk_x (np.ndarray): X-coord of each chunk (int32).
+		chunk_z (np.ndarray): Z-coord of each chunk (int32).
+		log_prior (float): Log prior density of a stronghold per block^2 at
+			distance 1 (the density at distance r is this minus log(r)).
+	"""
+	angle: np.ndarray
+	chunk_x: np.ndarray
+	chunk_z: np.ndarray
+	log_prior: float
+
+
+@functools.cache
+def ring_cells(index: int) -> RingCells:
+	"""
+	Builds (once, then caches) the chunk index of one ring.
+
+	Args:
+		index (int): The ring number.
+
+	Returns:
+		RingCells: The ring's chunks sorted by polar angle.
+	"""
+	ring = RINGS[index]
+
+	# walk every row of chunks and keep the x-range(s) inside the annulus,
+	# measured from chunk centers
+	lo = math.floor((-ring.outer - CELL_OFFSET)/CHUNK)
+	hi = math.ceil((ring.outer - CELL_OFFSET)/CHUNK)
+	rows = np.arange(lo, hi + 1)
+	zc = rows*CHUNK + CELL_OFFSET
+
+	outer = np.sqrt(np.maximum(ring.outer**2 - zc**2, 0.0))
+	inner = np.sqrt(np.maximum(ring.inner**2 - zc**2, 0.0))
+
+	# chunk centers are never at x = 0, so the two halves never overlap
+	xs, zs = [], []
+	for start, stop in ((-outer, -inner), (inner, outer)):
+		first = np.ceil((start - CELL_OFFSET)/CHUNK).astype(np.int64)
+		last = np.floor((stop - CELL_OFFSET)/CHUNK).astype(np.int64)
+		counts = np.maximum(last - first + 1, 0)
+
+		# x = first, first + 1, ..., last for every row at once
+		offsets = np.arange(counts.sum()) - np.repeat(
+			np.cumsum(counts) - counts, counts
+		)
+		xs.append(np.repeat(first, counts) + offsets)
+		zs.append(np.repeat(rows, counts))
+
+	chunk_x = np.concatenate(xs).astype(np.int32)
+	chunk_z = np.concatenate(zs).astype(np.int32)
+	angle = np.arctan2(
+		chunk_z*CHUNK + CELL_OFFSET,
+		chunk_x*CHUNK + CELL_OFFSET
+	)
+
+	order = np.argsort(angle)
+
+	# uniform in angle and (roughly) in distance across the annulus: the
+	# density at distance r is count/(2*pi*r*width)
+	log_prior = math.log(ring.count/(2*math.pi*(ring.outer - ring.inner)))
+
+	return RingCells(angle[order], chunk_x[order], chunk_z[order], log_prior)
+
+
+@functools.cache
+def nearer_strongholds_table() -> np.ndarray:
+	"""
+	Builds (once, then caches) the expected number of strongholds within
+	distance d of a point at distance s from the origin, under the ring
+	prior, on a NEARER_STEP grid of (s, d).
+
+	A circle of radius r around the origin has an arc of half-angle
+	arccos((r^2 + s^2 - d^2)/(2*r*s)) inside that disc and the prior puts
+	count/(2*pi*r*width) strongholds per block^2 on it, so each ring adds
+	count/(pi*width) times the integral of that half-angle over r.
+
+	Returns:
+		np.ndarray: Table indexed by [s/NEARER_STEP, d/NEARER_STEP].
+	"""
+	s = np.arange(0, NEARER_MAX_ORIGIN + NEARER_STEP, NEARER_STEP, float)
+	d = np.arange(0, NEARER_MAX_DISTANCE + NEARER_STEP, NEARER_STEP, float)
+	s = s[:, np.newaxis, np.newaxis]
+	d = d[np.newaxis, :, np.newaxis]
+
+	table = np.zeros((s.shape[0], d.shape[1]))
+	dr = 32.0
+	for ring in RINGS:
+		r = np.arange(ring.inner + dr/2, ring.outer, dr)[np.newaxis, np.newaxis]
+		with np.errstate(divide="ignore", invalid="ignore"):
+			cos = (r*r + s*s - d*d)/(2*r*s)
+
+		# at the origin the disc holds the whole circle or none of it
+		cos = np.where(s == 0, np.where(r <= d, -1.0, 1.0), cos)
+		half_angle = np.arccos(np.clip(cos, -1.0, 1.0))
+		table += ring.count/(math.pi*(ring.outer - ring.inner)) \
+			* half_angle.sum(axis=2)*dr
+
+	return table
+
+
+def _nearer_strongholds(origin: float, distance):
+	"""
+	Looks up the expected number of strongholds closer than `distance` to
+	a point `origin` blocks from the world origin.
+
+	Args:
+		origin (float): The thrower's distance from the origin.
+		distance: Candidate distance(s) from the thrower.
+
+	Returns:
+		The interpolated expected count(s).
+	"""
+	table = nearer_strongholds_table()
+	pos = min(origin, NEARER_MAX_ORIGIN)/NEARER_STEP
+	i = min(int(pos), table.shape[0] - 2)
+	frac = pos - i
+	row = (1 - frac)*table[i] + frac*table[i + 1]
+	return np.interp(np.asarray(distance)/NEARER_STEP, _NEARER_D, row)
+
+
+_NEARER_D = np.arange(NEARER_MAX_DISTANCE//NEARER_STEP + 1, dtype=float)
+
+
+def _ray_intervals(
+	px: float, pz: float,
+	dx: float, dz: float,
+	ring: Ring
+) -> list[tuple[float, float]]:
+	"""
+	Finds where a ray p + t*d (t >= 0, |d| = 1) lies inside a ring.
+
+	Returns:
+		list[tuple[float, float]]: Zero, one or two [t0, t1] intervals.
+	"""
+	b = px*dx + pz*dz
+	c = px*px + pz*pz
+
+	def crossings(radius):
+		disc = b*b - (c - radius*radius)
+		if disc <= 0:
+			return None
+		root = math.sqrt(disc)
+		return (-b - root, -b + root)
+
+	outer = crossings(ring.outer)
+	if outer is None:
+		return []
+
+	inner = crossings(ring.inner)
+	if inner is None:
+		spans = [outer]
+	else:
+		spans = [(outer[0], inner[0]), (inner[1], outer[1])]
+
+	return [
+		(max(t0, 0.0), t1) for t0, t1 in spans
+		if t1 > 0 and t1 > t0
+	]
+
+
+def _angle_slices(
+	cells: RingCells,
+	lo: float,
+	hi: float
+) -> list[slice]:
+	"""
+	Finds the index slices of cells with polar angles in [lo, hi],
+	splitting the range where it wraps around +-pi.
+	"""
+	width = hi - lo
+	if width >= 2*math.pi:
+		return [slice(0, len(cells.angle))]
+
+	lo = (lo + math.pi) % (2*math.pi) - math.pi
+	hi = lo + width
+	ranges = [(lo, hi)]
+	if hi > math.pi:
+		ranges = [(lo, math.pi), (-math.pi, hi - 2*math.pi)]
+
+	return [
+		slice(
+			int(np.searchsorted(cells.angle, a, "left")),
+			int(np.searchsorted(cells.angle, b, "right"))
+		)
+		for a, b in ranges
+	]
+
+
+def _throw_rays(throws) -> list[tuple[float, float, float, float]]:
+	"""
+	Converts (x, z, theta) throws into (x, z, dx, dz) unit rays.
+
+	Raises:
+		AngleError: If an angle is out of bounds.
+	"""
+	rays = []
+	for x, z, theta in throws:
+		if _angle_out_of_bounds(theta):
+			raise AngleError("angle(s) out of bounds")
+		phi = _transform_minecraft_angle_to_cartesian_rads(theta)
+		rays.append((x, z, math.cos(phi), math.sin(phi)))
+	return rays
+
+
+def _search_window(
+	throws: list,
+	ray: tuple[float, float, float, float],
+	angle_std: float,
+	sigmas: float,
+	prediction: Prediction | None = None
+) -> tuple[float, float]:
+	"""
+	Limits the search along the first ray to the uncertainty region of the
+	first two throws' intersection, when there is a usable one (reusing
+	their prediction if it is given).
+
+	Returns:
+		tuple[float, float]: The [t0, t1] range of the first ray to search.
+	"""
+	if len(throws) < 2:
+		return (0.0, math.inf)
+
+	try:
+		estimate = estimate_uncertainty(
+			*throws[0], *throws[1], angle_std, prediction=prediction
+		)
+	except AngleError:
+		return (0.0, math.inf)
+
+	px, pz, dx, dz = ray
+	t = (estimate.x - px)*dx + (estimate.z - pz)*dz
+	spread = math.sqrt(max(
+		dx*dx*estimate.var_x + 2*dx*dz*estimate.cov_xz
+		+ dz*dz*estimate.var_z,
+		0.0
+	))
+	reach = sigmas*spread + 2*CHUNK
+	if not math.isfinite(reach):
+		return (0.0, math.inf)
+	return (t - reach, t + reach)
+
+
+def rank_candidates(
+	throws,
+	angle_std: float = DEFAULT_ANGLE_STD,
+	limit: int = 5,
+	sigmas: float = 4.0,
+	prediction: Prediction | None = None
+) -> list[Candidate]:
+	"""
+	Ranks the chunks that could hold the stronghold the throws point at.
+
+	Candidates are the ring chunks within `sigmas` standard deviations of
+	the first throw's ray (and, with two or more throws, of the first two
+	throws' intersection). Each is scored by the ring prior times, for every
+	throw, a Gaussian likelihood of its perpendicular distance from the ray
+	(with standard deviation t*angle_std at distance t, plus the spread of
+	a position inside a chunk). Chunks behind a throw are excluded.
+
+	Args:
+		throws: Iterable of (x, z, theta) throws (angles in Minecraft
+			degrees). One throw is enough.
+		angle_std (float): Standard deviation of each angle (in degrees).
+		limit (int): The number of candidates to return.
+		sigmas (float): How far from the first ray candidates may lie.
+		prediction (Prediction | None): The first two throws'
+			solve_stronghold result, if it was already computed.
+
+	Returns:
+		list[Candidate]: The most likely chunks, best first, with
+			probabilities normalized over every candidate considered.
+
+	Raises:
+		ValueError: If no throws are given.
+		AngleError: If an angle is out of bounds.
+	"""
+	throws = list(throws)
+	rays = _throw_rays(throws)
+	if not rays:
+		raise ValueError("at least one throw is required")
+
+	sigma = max(math.radians(angle_std), 1e-9)
+	cell_var = CHUNK*CHUNK/12  # variance of a point across a chunk
+	px, pz, dx, dz = rays[0]
+	window = _search_window(throws, rays[0], angle_std, sigmas, prediction)
+
+	found = []
+	for ring in RINGS:
+		for t0, t1 in _ray_intervals(px, pz, dx, dz, ring):
+			t0, t1 = max(t0, window[0]), min(t1, window[1])
+			if t1 <= t0:
+				continue
+			cells = ring_cells(ring.index)
+
+			# polar angles swept by the ray, widened by the search cone
+			a0 = math.atan2(pz + t0*dz, px + t0*dx)
+			a1 = math.atan2(pz + t1*dz, px + t1*dx)
+			sweep = (a1 - a0 + math.pi) % (2*math.pi) - math.pi
+			lo, hi = (a0, a0 + sweep) if sweep >= 0 else (a0 + sweep, a0)
+			margin = sigmas*(sigma*t1 + CHUNK)/ring.inner
+			lo, hi = lo - margin, hi + margin
+
+			for part in _angle_slices(cells, lo, hi):
+				if part.stop > part.start:
+					found.append((ring, cells, part))
+
+	if not found:
+		return []
+
+	# gather every slice's chunks and drop those outside the first ray's
+	# search cone (or behind it) before doing the costlier scoring, as the
+	# angle slices span the ring's whole width
+	sizes = [part.stop - part.start for _, _, part in found]
+	chunk_x = np.concatenate([cells.chunk_x[part] for _, cells, part in found])
+	chunk_z = np.concatenate([cells.chunk_z[part] for _, cells, part in found])
+	x = chunk_x*CHUNK + CELL_OFFSET
+	z = chunk_z*CHUNK + CELL_OFFSET
+	vx, vz = x - px, z - pz
+	t = vx*dx + vz*dz
+	perp = vx*dz - vz*dx
+	var = (t*sigma)**2 + cell_var
+	keep = np.flatnonzero((t > 0) & (perp*perp <= sigmas*sigmas*var))
+	if not len(keep):
+		return []
+
+	ring_ids = np.repeat([ring.index for ring, _, _ in found], sizes)[keep]
+	log_prior = np.repeat([cells.log_prior for _, cells, _ in found], sizes)
+	chunk_x, chunk_z, x, z = chunk_x[keep], chunk_z[keep], x[keep], z[keep]
+	t, perp, var = t[keep], perp[keep], var[keep]
+
+	scores = log_prior[keep] - 0.5*np.log(x*x + z*z)
+	scores -= _nearer_strongholds(
+		math.hypot(px, pz), np.hypot(x - px, z - pz)
+	)
+	scores -= 0.5*perp*perp/var
+	scores -= 0.5*np.log(var)
+
+	behind = np.zeros(len(scores), dtype=bool)
+	for rx, rz, rdx, rdz in rays[1:]:
+		vx, vz = x - rx, z - rz
+		t = vx*rdx + vz*rdz
+		perp = vx*rdz - vz*rdx
+		var = (t*sigma)**2 + cell_var
+		behind |= t <= 0
+		scores -= 0.5*perp*perp/var
+		scores -= 0.5*np.log(var)
+
+	if behind.any():
+		keep = ~behind
+		if not keep.any():
+			return []
+		scores, chunk_x, chunk_z, ring_ids = (
+			scores[keep], chunk_x[keep], chunk_z[keep], ring_ids[keep]
+		)
+
+	# chunks can be found twice when the search cone overlaps itself
+	keys = chunk_x.astype(np.int64) << 32
+	keys |= chunk_z.astype(np.int64) & 0xFFFFFFFF
+	_, unique = np.unique(keys, return_index=True)
+	scores, chunk_x, chunk_z, ring_ids = (
+		scores[unique], chunk_x[unique], chunk_z[unique], ring_ids[unique]
+	)
+
+	probs = np.exp(scores - scores.max())
+	probs /= probs.sum()
+
+	# converting the few kept rows to Python scalars in one go is much
+	# cheaper than indexing the arrays element by element
+	best = np.argsort(-probs, kind="stable")[:limit]
+	return [
+		Candidate(
+			float(cx*CHUNK + CELL_OFFSET), float(cz*CHUNK + CELL_OFFSET),
+			cx, cz, ring, p
+		)
+		for cx, cz, ring, p in zip(
+			chunk_x[best].tolist(), chunk_z[best].tolist(),
+			ring_ids[best].tolist(), probs[best].tolist()
+		)
+	]
+
+
+def single_throw(
+	x: float, z: float, theta: float,
+	angle_std: float = DEFAULT_ANGLE_STD
+) -> list[Segment]:
+	"""
+	Predicts where a single throw's stronghold lies by intersecting its ray
+	with the stronghold rings.
+
+	Along the ray the posterior density at distance t is the ring prior
+	count/(2*pi*r*width) times the search cone's width at t times the
+	chance that no stronghold is nearer. Each segment's mass comes from a
+	fixed 16-node Gauss-Legendre rule and the precomputed nearer-strongholds
+	table, so a query needs only square roots and table lookups.
+
+	Args:
+		x (float): X-coord of the throw.
+		z (float): Z-coord of the throw.
+		theta (float): Angle of the throw (in Minecraft degrees).
+		angle_std (float): Standard deviation of the angle (in degrees).
+
+	Returns:
+		list[Segment]: The ray's segments inside a ring, most likely first.
+
+	Raises:
+		AngleError: If the angle is out of bounds.
+	"""
+	px, pz, dx, dz = _throw_rays([(x, z, theta)])[0]
+	sigma = math.radians(angle_std)
+	cell_var = CHUNK*CHUNK/12
+
+	spans = [
+		(ring, t0, t1)
+		for ring in RINGS
+		for t0, t1 in _ray_intervals(px, pz, dx, dz, ring)
+	]
+	if not spans:
+		return []
+
+	rings = [ring for ring, _, _ in spans]
+	t0 = np.array([span[1] for span in spans])[:, np.newaxis]
+	t1 = np.array([span[2] for span in spans])[:, np.newaxis]
+	density = np.array([
+		ring.count/(2*math.pi*(ring.outer - ring.inner)) for ring in rings
+	])[:, np.newaxis]
+
+	# sample every segment at the quadrature nodes at once
+	half = (t1 - t0)/2
+	t = t0 + half*(QUADRATURE_NODES + 1)
+	r = np.sqrt((px + t*dx)**2 + (pz + t*dz)**2)
+	f = density/r*np.sqrt((t*sigma)**2 + cell_var)
+	f = f*np.exp(-_nearer_strongholds(math.hypot(px, pz), t))
+
+	mass = (half*(f*QUADRATURE_WEIGHTS)).sum(axis=1)
+	total = float(mass.sum())
+	best = t[np.arange(len(spans)), f.argmax(axis=1)].tolist()
+
+	segments = [
+		Segment(
+			ring.index,
+			px + a*dx, pz + a*dz,
+			px + b*dx, pz + b*dz,
+			px + tb*dx, pz + tb*dz,
+			m/total if total > 0 else 0.0
+		)
+		for ring, (_, a, b), tb, m in zip(rings, spans, best, mass.tolist())
+	]
+	segments.sort(key=lambda segment: -segment.probability)
+	return segments
@@ -0,0 +1,309 @@
+"""
+Outlier-robust throw fusion for endtrace, a Minecraft stronghold prediction
+tool.
+
+A misaligned crosshair produces a throw that points well away from the
+stronghold, and least squares (utils.multithrow) lets that one bad line drag
+the prediction off by hundreds of blocks. fuse_throws instead:
+
+1. intersects every pair of throws and keeps the candidate that best
+   explains all of them (an exhaustive RANSAC: with 20 throws there are
+   only 190 pairs, so no random sampling is needed),
+2. refines it by iteratively reweighted least squares, downweighting
+   throws with Huber or Tukey weights (or dropping outliers outright),
+3. rejects the throws that still miss the prediction by more than the
+   threshold and fits the remaining inliers.
+
+Residuals are measured as angles (how far each throw's heading is from
+pointing at the prediction), since a throw's error is an aiming error: the
+same 0.1 degree puts a far throw's line further off than a near one's.
+Everything is vectorized over sessions (rows) of throws (columns), so
+thousands of sessions are fused in a few NumPy passes.
+"""
+
+from typing import NamedTuple
+from endtrace import MAX_CONDITION
+from utils.batch import transform_minecraft_angles_to_cartesian_rads
+from utils.validators import AngleError
+import numpy as np
+
+# throws pointing further than this (in degrees) from the prediction are
+# outliers; well above the f3 screen's 0.1 degree rounding but far below a
+# misaligned crosshair
+DEFAULT_THRESHOLD = 1.0
+
+METHODS = ("ransac", "huber", "tukey")
+
+# huber weights start falling at this fraction of the threshold (about the
+# f3 screen's rounding for the default), as its convex loss never fully
+# ignores an outlier
+_HUBER_SCALE = 0.1
+
+# session chunks are sized to keep the pair x throw temporaries near this
+# many elements
+_CHUNK_ELEMENTS = 1 << 21
+
+
+class RobustPrediction(NamedTuple):
+	"""
+	The result of fusing many sessions of throws.
+
+	Attributes:
+		x (np.ndarray): Predicted x-coords, one per session (NaN where
+			degenerate).
+		z (np.ndarray): Predicted z-coords (NaN where degenerate).
+		inliers (np.ndarray): Boolean mask (sessions x throws) of the throws
+			kept; the others were rejected as outliers (or were missing).
+		residual (np.ndarray): Root-mean-square distance (in blocks) from
+			each prediction to its inliers' lines.
+		degenerate (np.ndarray): Boolean mask of sessions without two
+			agreeing, non-parallel throws.
+	"""
+	x: np.ndarray
+	z: np.ndarray
+	inliers: np.ndarray
+	residual: np.ndarray
+	degenerate: np.ndarray
+
+
+class RobustFusion(NamedTuple):
+	"""
+	The result of fusing one session of throws.
+
+	Attributes:
+		x (float): X-coord of the prediction.
+		z (float): Z-coord of the prediction.
+		residual (float): Root-mean-square distance (in blocks) from the
+			prediction to the inliers' lines.
+		throws (int): The number of throws used (inliers).
+		rejected (tuple[int, ...]): The indices of the rejected throws.
+	"""
+	x: float
+	z: float
+	residual: float
+	throws: int
+	rejected: tuple[int, ...]
+
+
+def _as_sessions(values) -> np.ndarray:
+	"""Converts values to a float64 array of sessions x throws."""
+	values = np.asarray(values, dtype=np.float64)
+	return values.reshape(1, -1) if values.ndim == 1 else values
+
+
+def _angles(cx, cz, x, z, ux, uz) -> np.ndarray:
+	"""
+	The angle (in radians, 0 to pi) between each throw's heading and the
+	direction from the throw to a candidate point.
+	"""
+	dx, dz = cx - x, cz - z
+	return np.arctan2(np.abs(ux*dz - uz*dx), ux*dx + uz*dz)
+
+
+def _weights(ratio: np.ndarray, method: str) -> np.ndarray:
+	"""Robust weights of residuals given as multiples of the threshold."""
+	if method == "tukey":
+		return np.where(ratio < 1, (1 - ratio*ratio)**2, 0.0)
+	if method == "huber":
+		return np.minimum(1.0, _HUBER_SCALE/np.maximum(ratio, 1e-12))
+	return (ratio <= 1).astype(np.float64)
+
+
+def _fuse_chunk(x, z, ux, uz, valid, method, threshold, iterations):
+	"""Fuses one chunk of sessions (see fuse_throws)."""
+	sessions, throws = x.shape
+	if throws < 2:
+		nan = np.full(sessions, np.nan)
+		return (
+			nan, nan.copy(), np.zeros(x.shape, dtype=bool), nan.copy(),
+			np.ones(sessions, dtype=bool)
+		)
+	first, second = np.triu_indices(throws, 1)
+
+	# 1. intersect every pair (same direction-vector form as
+	# solve_stronghold) and score each candidate against every throw
+	with np.errstate(divide="ignore", invalid="ignore"):
+		ux1, uz1 = ux[:, first], uz[:, first]
+		ux2, uz2 = ux[:, second], uz[:, second]
+		cross = ux1*uz2 - uz1*ux2
+		condition = (1 + np.abs(ux1*ux2 + uz1*uz2))/np.abs(cross)
+		t = (
+			(x[:, second] - x[:, first])*uz2
+			- (z[:, second] - z[:, first])*ux2
+		)/cross
+		cx = x[:, first] + t*ux1
+		cz = z[:, first] + t*uz1
+
+	usable = valid[:, first] & valid[:, second] & (condition <= MAX_CONDITION)
+	usable &= np.isfinite(cx) & np.isfinite(cz)
+	cx, cz = np.where(usable, cx, 0.0), np.where(usable, cz, 0.0)
+
+	angles = _angles(
+		cx[:, :, None], cz[:, :, None],
+		x[:, None, :], z[:, None, :], ux[:, None, :], uz[:, None, :]
+	)
+	# truncated squared error (msac), so each outlier costs the same
+	score = np.where(
+		valid[:, None, :], np.minimum(angles, threshold)**2, 0.0
+	).sum(axis=2)
+	score[~usable] = np.inf
+	best = np.argmin(score, axis=1)
+	rows = np.arange(sessions)
+	degenerate = ~usable[rows, best]
+	px, pz = cx[rows, best], cz[rows, best]
+	px[degenerate] = pz[degenerate] = 0.0
+
+	# 2. iteratively reweighted least squares on the lines' normals
+	nx, nz = -uz, ux
+	d = np.where(valid, nx*x + nz*z, 0.0)
+
+	def refit(px, pz, weights):
+		# dividing by the squared range turns block distances into angles
+		ranges = (px[:, None] - x)**2 + (pz[:, None] - z)**2
+		w = weights/np.maximum(ranges, 1.0)
+		sxx, sxz, szz = (w*nx*nx).sum(1), (w*nx*nz).sum(1), (w*nz*nz).sum(1)
+		bx, bz = (w*nx*d).sum(1), (w*nz*d).sum(1)
+		det = sxx*szz - sxz*sxz
+		trace = sxx + szz
+
+		# keep the previous estimate where the weighted throws are parallel
+		solvable = det > 1e-12*trace*trace
+		with np.errstate(divide="ignore", invalid="ignore"):
+			new_x = (szz*bx - sxz*bz)/det
+			new_z = (sxx*bz - sxz*bx)/det
+		return np.where(solvable, new_x, px), np.where(solvable, new_z, pz)
+
+	for _ in range(iterations):
+		ratio = _angles(px[:, None], pz[:, None], x, z, ux, uz)/threshold
+		px, pz = refit(px, pz, np.where(valid, _weights(ratio, method), 0.0))
+
+	# 3. reject whatever still misses by more than the threshold, then fit
+	# the inliers alone (which also undoes huber's pull towards outliers)
+	angles = _angles(px[:, None], pz[:, None], x, z, ux, uz)
+	inliers = valid & (angles <= threshold) & ~degenerate[:, None]
+	counts = inliers.sum(axis=1)
+	degenerate |= counts < 2
+	px, pz = refit(px, pz, inliers.astype(np.float64))
+
+	distances = np.where(inliers, nx*px[:, None] + nz*pz[:, None] - d, 0.0)
+	with np.errstate(invalid="ignore"):
+		residual = np.sqrt((distances**2).sum(axis=1)/counts)
+
+	px[degenerate] = pz[degenerate] = np.nan
+	residual[degenerate] = np.nan
+	inliers[degenerate] = False
+	return px, pz, inliers, residual, degenerate
+
+
+def fuse_throws(
+	x, z, theta,
+	valid=None,
+	method: str = "tukey",
+	threshold: float = DEFAULT_THRESHOLD,
+	iterations: int = 10
+) -> RobustPrediction:
+	"""
+	Predicts the stronghold of every session from all of its throws while
+	rejecting outliers.
+
+	Args:
+		x: X-coords of the throws, sessions x throws (or one session as a
+			flat sequence).
+		z: Z-coords of the throws, with the same shape.
+		theta: Minecraft angles of the throws (in degrees).
+		valid: Optional boolean mask of the throws that exist, for sessions
+			with fewer throws than others. Non-finite values and out of
+			bounds angles are always left out.
+		method (str): The reweighting of the refinement: "tukey" (outliers
+			get no weight), "huber" (they get less weight) or "ransac"
+			(least squares on the inliers of the best pair).
+		threshold (float): The angle (in degrees) beyond which a throw is
+			an outlier.
+		iterations (int): The number of reweighting passes.
+
+	Returns:
+		RobustPrediction: The predictions, inlier masks and residuals.
+
+	Raises:
+		ValueError: If the shapes differ or the method is unknown.
+	"""
+	if method not in METHODS:
+		raise ValueError(f"method must be one of {', '.join(METHODS)}")
+
+	x, z, theta = _as_sessions(x), _as_sessions(z), _as_sessions(theta)
+	if not x.shape == z.shape == theta.shape:
+		raise ValueError("x, z and theta must have the same shape")
+	valid = (
+		np.ones(x.shape, dtype=bool) if valid is None
+		else np.asarray(valid, dtype=bool).reshape(x.shape)
+	)
+
+	valid = valid & np.isfinite(x) & np.isfinite(z) & np.isfinite(theta)
+	valid &= (theta >= -180) & (theta <= 180)
+
+	# left-out throws get harmless values so they never produce NaNs
+	x, z, theta = (np.where(valid, v, 0.0) for v in (x, z, theta))
+
+	phi = transform_minecraft_angles_to_cartesian_rads(theta).reshape(x.shape)
+	ux, uz = np.cos(phi), np.sin(phi)
+
+	sessions, throws = x.shape
+	pairs = max(throws*(throws - 1)//2, 1)
+	chunk = max(1, _CHUNK_ELEMENTS//(pairs*max(throws, 1)))
+	results = [
+		_fuse_chunk(
+			x[i:i + chunk], z[i:i + chunk],
+			ux[i:i + chunk], uz[i:i + chunk], valid[i:i + chunk],
+			method, np.radians(threshold), iterations
+		)
+		for i in range(0, sessions, chunk)
+	]
+	if not results:
+		empty = np.zeros(0)
+		return RobustPrediction(
+			empty, empty.copy(), np.zeros(x.shape, dtype=bool),
+			empty.copy(), np.zeros(0, dtype=bool)
+		)
+
+	return RobustPrediction(
+		*(np.concatenate(parts) for parts in zip(*results))
+	)
+
+
+def robust_fuse(
+	throws,
+	method: str = "tukey",
+	threshold: float = DEFAULT_THRESHOLD
+) -> RobustFusion:
+	"""
+	Predicts the stronghold from one session's throws, rejecting outliers
+	(see fuse_throws).
+
+	Args:
+		throws: An iterable of (x, z, theta) throws.
+		method (str): "tukey", "huber" or "ransac".
+		threshold (float): The angle (in degrees) beyond which a throw is
+			an outlier.
+
+	Returns:
+		RobustFusion: The prediction and the indices of rejected throws.
+
+	Raises:
+		AngleError: If there are not two agreeing, non-parallel throws.
+	"""
+	throws = np.asarray(list(throws), dtype=np.float64).reshape(-1, 3)
+	result = fuse_throws(
+		throws[:, 0], throws[:, 1], throws[:, 2],
+		method=method, threshold=threshold
+	)
+	if result.degenerate[0]:
+		raise AngleError("need at least two agreeing, non-parallel throws")
+
+	inliers = result.inliers[0]
+	return RobustFusion(
+		float(result.x[0]),
+		float(result.z[0]),
+		float(result.residual[0]),
+		int(inliers.sum()),
+		tuple(np.flatnonzero(~inliers).tolist())
+	)
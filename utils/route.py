@@ -0,0 +1,85 @@
+"""
+Travel routes for endtrace, a Minecraft stronghold prediction tool.
+
+Once the stronghold is predicted, players want to know where to go: the
+Nether coordinates to build a portal at (Overworld coordinates divided by
+8), the yaw to face (in Minecraft's angle convention, as shown on the F3
+screen) and how far away it is. The yaw is the same in both dimensions.
+See utils.batch.plan_routes for the vectorized version.
+"""
+
+from typing import NamedTuple
+from endtrace import _transform_cartesian_rads_to_minecraft_angle
+import math
+
+# one block in the nether is 8 in the overworld
+NETHER_SCALE = 8
+
+# the extra output columns and the decimals each is rounded to
+ROUTE_FIELDS = ("nether_x", "nether_z", "yaw", "distance")
+ROUTE_DIGITS = (2, 2, 1, 1)
+
+
+class Route(NamedTuple):
+	"""
+	The way from a throw to the predicted stronghold.
+
+	Attributes:
+		x (float): X-coord of the stronghold in the Overworld.
+		z (float): Z-coord of the stronghold in the Overworld.
+		nether_x (float): X-coord of the stronghold in the Nether.
+		nether_z (float): Z-coord of the stronghold in the Nether.
+		yaw (float): The Minecraft angle (in degrees) to face from the
+			throw towards the stronghold.
+		distance (float): Overworld blocks from the throw to the
+			stronghold (divide by NETHER_SCALE for the Nether).
+	"""
+	x: float
+	z: float
+	nether_x: float
+	nether_z: float
+	yaw: float
+	distance: float
+
+
+def plan_route(x: float, z: float, from_x: float, from_z: float) -> Route:
+	"""
+	Computes the Nether coords of a prediction and the heading to it.
+
+	Args:
+		x (float): X-coord of the prediction.
+		z (float): Z-coord of the prediction.
+		from_x (float): X-coord of the player (e.g., their last throw).
+		from_z (float): Z-coord of the player.
+
+	Returns:
+		Route: The Overworld and Nether coords, the yaw and the distance.
+	"""
+	dx, dz = x - from_x, z - from_z
+	return Route(
+		x,
+		z,
+		x/NETHER_SCALE,
+		z/NETHER_SCALE,
+		_transform_cartesian_rads_to_minecraft_angle(math.atan2(dz, dx)),
+		math.hypot(dx, dz)
+	)
+
+
+def round_route(route: Route) -> tuple[float, float, float, float]:
+	"""
+	Rounds the Nether coords, yaw and distance for output (see ROUTE_DIGITS;
+	-0.0 becomes 0.0).
+
+	Args:
+		route (Route): The route.
+
+	Returns:
+		tuple[float, float, float, float]: The rounded nether_x, nether_z,
+			yaw and distance.
+	"""
+	values = (route.nether_x, route.nether_z, route.yaw, route.distance)
+	return tuple(
+		round(value, digits) + 0.0
+		for value, digits in zip(values, ROUTE_DIGITS)
+	)
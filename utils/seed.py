@@ -0,0 +1,333 @@
+"""
+Seed-based stronghold placement for endtrace, a Minecraft stronghold
+prediction tool.
+
+When the world seed is known, there is nothing to triangulate: Java Edition
+places its 128 strongholds deterministically. This module replays the
+"concentric_rings" placement in pure Python:
+
+	random = java.util.Random-style LCG seeded with the world seed
+	angle = nextDouble()*2*pi
+	for each stronghold:
+		distance = (4 + 6*ring)*32 + (nextDouble() - 0.5)*32*2.5 chunks
+		chunk = (round(cos(angle)*distance), round(sin(angle)*distance))
+		random.fork()                        # the biome search's random
+		angle += 2*pi/spread
+		after the ring's last stronghold:
+			spread += 2*spread//(ring + 1), capped at the strongholds left
+			angle += nextDouble()*2*pi
+
+This matches Java Edition 1.19 and later, where each stronghold's biome
+search gets its own forked random, so the chunks above are exact for every
+stronghold. What is NOT modeled is the biome search itself: the game then
+moves each stronghold to a random chunk with a suitable biome within
+BIOME_SNAP (112) blocks, which needs the full biome generator. Positions
+are therefore within 112 blocks of the real ones (usually exact on
+stronghold-friendly terrain). Releases before 1.19 drew the biome search
+from the main random, so there every stronghold after the first snapped one
+differs.
+
+Per-seed tables are cached, and seed_strongholds computes the tables of
+many seeds at once with NumPy: every seed makes the same sequence of draws,
+so each draw advances all of the LCG states with a few array operations.
+"""
+
+from typing import NamedTuple
+from utils.rings import (
+	CELL_OFFSET, CHUNK, RING_DISTANCE, RING_SPREAD, RINGS,
+	STRONGHOLD_COUNT
+)
+import functools
+import math
+import numpy as np
+import re
+
+# java.util.Random's 48-bit linear congruential generator
+_MULTIPLIER = 0x5DEECE66D
+_ADDEND = 0xB
+_MASK = (1 << 48) - 1
+
+# how many seeds' tables stay cached
+SEED_CACHE_SIZE = 256
+
+# the ring of every stronghold, by placement order
+STRONGHOLD_RINGS = tuple(
+	ring.index for ring in RINGS for _ in range(ring.count)
+)
+
+_LONG = re.compile(r"[+-]?\d+")
+
+# what Java's String.trim strips: every character up to and including space
+_JAVA_TRIM = "".join(map(chr, range(0x21)))
+
+
+class JavaRandom:
+	"""
+	The linear congruential generator of java.util.Random (and Minecraft's
+	LegacyRandomSource), with only the methods the placement uses.
+	"""
+
+	__slots__ = ("state",)
+
+	def __init__(self, seed: int):
+		"""
+		Args:
+			seed (int): The seed (a Java long; only its low 48 bits count).
+		"""
+		self.state = (seed ^ _MULTIPLIER) & _MASK
+
+	def next(self, bits: int) -> int:
+		"""
+		Returns:
+			int: The next `bits` random bits (as a signed 32-bit int, like
+				Java's).
+		"""
+		self.state = (self.state*_MULTIPLIER + _ADDEND) & _MASK
+		value = self.state >> (48 - bits)
+		return value - (1 << 32) if value >= 1 << 31 else value
+
+	def next_double(self) -> float:
+		"""
+		Returns:
+			float: A uniform double in [0, 1) (53 random bits).
+		"""
+		return ((self.next(26) << 27) + self.next(27))*2.0**-53
+
+	def next_long(self) -> int:
+		"""
+		Returns:
+			int: A random Java long.
+		"""
+		value = (self.next(32) << 32) + self.next(32)
+		return (value + (1 << 63)) % (1 << 64) - (1 << 63)
+
+
+class SeedStronghold(NamedTuple):
+	"""
+	A stronghold generated from a seed (before biome snapping).
+
+	Attributes:
+		index (int): Its position in the placement order (0 to 127).
+		ring (int): The ring it belongs to.
+		chunk_x (int): X-coord of its chunk.
+		chunk_z (int): Z-coord of its chunk.
+		x (float): X-coord of the chunk's center (like utils.rings).
+		z (float): Z-coord of the chunk's center.
+	"""
+	index: int
+	ring: int
+	chunk_x: int
+	chunk_z: int
+	x: float
+	z: float
+
+
+class SnappedPrediction(NamedTuple):
+	"""
+	A prediction moved onto the nearest generated stronghold.
+
+	Attributes:
+		stronghold (SeedStronghold): The nearest generated stronghold.
+		distance (float): Its distance from the prediction (in blocks).
+	"""
+	stronghold: SeedStronghold
+	distance: float
+
+
+class SeedTable(NamedTuple):
+	"""
+	The generated stronghold chunks of many seeds.
+
+	Attributes:
+		chunk_x (np.ndarray): X-coords of the chunks, seeds x 128 (int32).
+		chunk_z (np.ndarray): Z-coords of the chunks, seeds x 128 (int32).
+	"""
+	chunk_x: np.ndarray
+	chunk_z: np.ndarray
+
+
+def parse_seed(text: str) -> int:
+	"""
+	Turns a seed typed into Minecraft's world creation screen into the
+	numeric seed: the text is trimmed like the game does, then numbers that
+	fit a Java long are used as they are, and any other text is hashed like
+	Java's String.hashCode.
+
+	Args:
+		text (str): The seed.
+
+	Returns:
+		int: The numeric seed.
+
+	Raises:
+		ValueError: If the seed is empty or blank (the game would pick a
+			random one).
+	"""
+	text = text.strip(_JAVA_TRIM)
+	if not text:
+		raise ValueError("seed must not be empty")
+	if _LONG.fullmatch(text):
+		seed = int(text)
+		if -(1 << 63) <= seed < 1 << 63:
+			return seed
+
+	value = 0
+	encoded = text.encode("utf-16-le")
+	for i in range(0, len(encoded), 2):
+		value = (31*value + int.from_bytes(encoded[i:i + 2], "little")) \
+			& 0xFFFFFFFF
+	return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def _java_round(value: float) -> int:
+	"""Java's Math.round (halves round up), exactly."""
+	floor = math.floor(value)
+	return floor + 1 if value - floor >= 0.5 else floor
+
+
+@functools.lru_cache(maxsize=SEED_CACHE_SIZE)
+def generate_strongholds(seed: int) -> tuple[SeedStronghold, ...]:
+	"""
+	Replays the stronghold placement of a seed (see the module docstring for
+	what is and is not modeled). Tables are cached per seed.
+
+	Args:
+		seed (int): The world seed.
+
+	Returns:
+		tuple[SeedStronghold, ...]: All 128 strongholds, in placement order.
+	"""
+	random = JavaRandom(seed)
+	angle = random.next_double()*math.pi*2.0
+	spread = RING_SPREAD
+	in_ring = ring = 0
+
+	strongholds = []
+	for index in range(STRONGHOLD_COUNT):
+		distance = (4*RING_DISTANCE + RING_DISTANCE*ring*6) \
+			+ (random.next_double() - 0.5)*(RING_DISTANCE*2.5)
+		chunk_x = _java_round(math.cos(angle)*distance)
+		chunk_z = _java_round(math.sin(angle)*distance)
+		strongholds.append(SeedStronghold(
+			index, ring, chunk_x, chunk_z,
+			chunk_x*CHUNK + CELL_OFFSET, chunk_z*CHUNK + CELL_OFFSET
+		))
+
+		# the biome search's own random is forked off (one nextLong)
+		random.next_long()
+
+		angle += math.pi*2/spread
+		in_ring += 1
+		if in_ring != spread:
+			continue
+		in_ring = 0
+		ring += 1
+		spread += 2*spread//(ring + 1)
+		spread = min(spread, STRONGHOLD_COUNT - index)
+		angle += random.next_double()*math.pi*2.0
+
+	return tuple(strongholds)
+
+
+def snap_prediction(
+	x: float, z: float, seed: int,
+	max_distance: float | None = None
+) -> SnappedPrediction | None:
+	"""
+	Moves a triangulated prediction onto the nearest stronghold generated
+	from the seed.
+
+	Args:
+		x (float): X-coord of the prediction.
+		z (float): Z-coord of the prediction.
+		seed (int): The world seed.
+		max_distance (float | None): Give up if the nearest stronghold is
+			further than this (in blocks; None never gives up).
+
+	Returns:
+		SnappedPrediction | None: The stronghold and its distance from the
+			prediction, or None if it is too far.
+	"""
+	best = min(
+		generate_strongholds(seed),
+		key=lambda s: (s.x - x)*(s.x - x) + (s.z - z)*(s.z - z)
+	)
+	distance = math.hypot(best.x - x, best.z - z)
+	if max_distance is not None and distance > max_distance:
+		return None
+	return SnappedPrediction(best, distance)
+
+
+@functools.cache
+def _jump(steps: int) -> tuple[int, int]:
+	"""
+	The multiplier and addend that advance an LCG state by `steps` draws
+	at once: state_steps = (a*state + c) mod 2^48.
+	"""
+	a, c = 1, 0
+	for _ in range(steps):
+		a, c = (a*_MULTIPLIER) & _MASK, (c*_MULTIPLIER + _ADDEND) & _MASK
+	return a, c
+
+
+def seed_strongholds(seeds) -> SeedTable:
+	"""
+	Vectorized version of generate_strongholds for many seeds at once. The
+	placement consumes the same draws for every seed, so each step advances
+	all of the seeds' LCG states with a few array operations.
+
+	Args:
+		seeds: The world seeds (Java longs).
+
+	Returns:
+		SeedTable: The chunk coords of every seed's strongholds, in
+			placement order (see STRONGHOLD_RINGS for their rings).
+	"""
+	seeds = np.asarray(seeds, dtype=np.int64).reshape(-1).view(np.uint64)
+	state = (seeds ^ np.uint64(_MULTIPLIER)) & np.uint64(_MASK)
+	mask = np.uint64(_MASK)
+
+	def advance(steps):
+		nonlocal state
+		# uint64 products wrap mod 2^64, which keeps them exact mod 2^48
+		a, c = _jump(steps)
+		state = (state*np.uint64(a) + np.uint64(c)) & mask
+
+	def next_double():
+		advance(1)
+		high = (state >> np.uint64(22)).astype(np.int64)
+		advance(1)
+		low = (state >> np.uint64(21)).astype(np.int64)
+		return ((high << 27) + low)*2.0**-53
+
+	chunk_x = np.empty((len(seeds), STRONGHOLD_COUNT), dtype=np.int32)
+	chunk_z = np.empty_like(chunk_x)
+
+	angle = next_double()*math.pi*2.0
+	spread = RING_SPREAD
+	in_ring = ring = 0
+	for index in range(STRONGHOLD_COUNT):
+		distance = (4*RING_DISTANCE + RING_DISTANCE*ring*6) \
+			+ (next_double() - 0.5)*(RING_DISTANCE*2.5)
+		for out, values in (
+			(chunk_x, np.cos(angle)*distance),
+			(chunk_z, np.sin(angle)*distance)
+		):
+			# java's Math.round, exactly (see _java_round)
+			floor = np.floor(values)
+			out[:, index] = floor + (values - floor >= 0.5)
+
+		# the forked random's nextLong is two draws
+		advance(2)
+
+		angle += math.pi*2/spread
+		in_ring += 1
+		if in_ring != spread:
+			continue
+		in_ring = 0
+		ring += 1
+		spread += 2*spread//(ring + 1)
+		spread = min(spread, STRONGHOLD_COUNT - index)
+		angle += next_double()*math.pi*2.0
+
+	return SeedTable(chunk_x, chunk_z)
@@ -0,0 +1,229 @@
+"""
+Persistent prediction server for endtrace, a Minecraft stronghold prediction
+tool.
+
+Keeps one warm process running and answers line-delimited JSON requests from
+stdin, a TCP socket or a Unix socket, so clients do not pay interpreter and
+import startup for every prediction. Many clients can share the process
+since every connection is handled by its own asyncio task.
+
+Protocol (one JSON object per line in each direction):
+	request:  {"id": 1, "x1": 0, "z1": 0, "theta1": -135,
+	           "x2": 100, "z2": 0, "theta2": 135}
+	response: {"id": 1, "x": 50.0, "z": -50.0}
+	error:    {"id": 1, "error": {"type": "AngleError",
+	           "message": "angles must be different"}}
+
+The "id" field is optional and echoed back when present. With a cache
+(`serve --cache-size N`), repeated requests are answered from a
+PredictionCache instead of being solved again.
+"""
+
+from endtrace import solve_stronghold
+from utils.cache import PredictionCache
+from utils.validators import *
+import asyncio
+import functools
+import json
+import math
+import sys
+
+FIELDS = ("x1", "z1", "theta1", "x2", "z2", "theta2")
+
+
+class ProtocolError(ValueError):
+	"""
+	Raised when a request line is not a valid prediction request (bad JSON,
+	missing fields or non-numeric values).
+	"""
+	pass
+
+
+def _parse_request(line: str) -> tuple[object, list[float]]:
+	"""
+	Parses one request line.
+
+	Args:
+		line (str): The raw JSON line.
+
+	Returns:
+		tuple[object, list[float]]: The request id (or None) and the six
+			throw values in FIELDS order.
+
+	Raises:
+		ProtocolError: If the line is not a valid request.
+	"""
+	try:
+		request = json.loads(line)
+	except json.JSONDecodeError as decode_error:
+		raise ProtocolError(f"invalid json: {decode_error.msg}")
+	except ValueError as decode_error:
+		# e.g., integers past python's int/str conversion digit limit
+		raise ProtocolError(f"invalid json: {decode_error}")
+
+	if not isinstance(request, dict):
+		raise ProtocolError("request must be a json object")
+
+	missing = [field for field in FIELDS if field not in request]
+	if missing:
+		raise ProtocolError(f"missing field(s): {', '.join(missing)}")
+
+	values = []
+	for field in FIELDS:
+		value = request[field]
+		if isinstance(value, bool) or not isinstance(value, (int, float)):
+			raise ProtocolError(f"field {field} must be a number")
+		try:
+			values.append(float(value))
+		except OverflowError:
+			raise ProtocolError(f"field {field} is too large")
+
+	return request.get("id"), values
+
+
+def handle_line(line: str, cache: PredictionCache | None = None) -> dict:
+	"""
+	Answers one request line. Never raises for bad input: problems are
+	returned as structured errors instead.
+
+	Args:
+		line (str): The raw JSON line.
+		cache (PredictionCache | None): Optional cache of predictions.
+
+	Returns:
+		dict: The response object.
+	"""
+	request_id = None
+	try:
+		request_id, values = _parse_request(line)
+		x1, z1, theta1, x2, z2, theta2 = values
+		validate_coords(x1, z1, x2, z2)
+		validate_angles(theta1, theta2)
+		if cache is None:
+			prediction = solve_stronghold(*values)
+		else:
+			prediction = cache.predict(*values)
+		if not (
+			math.isfinite(prediction.rounded_x)
+			and math.isfinite(prediction.rounded_z)
+		):
+			# overflowed, which the batch runners report the same way
+			raise validation_error(ValidationCode.PARALLEL)
+		response = {
+			"x": prediction.rounded_x,
+			"z": prediction.rounded_z
+		}
+	except (ProtocolError, CoordsError, AngleError) as error:
+		response = {
+			"error": {"type": type(error).__name__, "message": str(error)}
+		}
+
+	if request_id is not None:
+		response = {"id": request_id, **response}
+	return response
+
+
+def _encode(response: dict) -> bytes:
+	"""Encodes a response as one JSON line."""
+	return (json.dumps(response) + "\n").encode()
+
+
+async def handle_client(
+	reader: asyncio.StreamReader,
+	writer: asyncio.StreamWriter,
+	cache: PredictionCache | None = None
+) -> None:
+	"""
+	Answers every request line from one connected client until it
+	disconnects.
+
+	Args:
+		reader (asyncio.StreamReader): The client's input stream.
+		writer (asyncio.StreamWriter): The client's output stream.
+		cache (PredictionCache | None): Optional cache shared by clients.
+	"""
+	try:
+		while line := await reader.readline():
+			if not line.strip():
+				continue
+			response = handle_line(line.decode(errors="replace"), cache)
+			writer.write(_encode(response))
+			await writer.drain()
+	except ConnectionError:
+		pass
+	finally:
+		writer.close()
+
+
+async def start_server(
+	host: str = "127.0.0.1",
+	port: int | None = None,
+	unix: str | None = None,
+	cache: PredictionCache | None = None
+) -> asyncio.Server:
+	"""
+	Starts listening on a TCP or Unix socket.
+
+	Args:
+		host (str): The host to listen on for TCP.
+		port (int | None): The TCP port (0 picks a free port).
+		unix (str | None): The Unix socket path (takes precedence).
+		cache (PredictionCache | None): Optional cache shared by clients.
+
+	Returns:
+		asyncio.Server: The running server.
+	"""
+	handler = functools.partial(handle_client, cache=cache)
+	if unix is not None:
+		return await asyncio.start_unix_server(handler, path=unix)
+	return await asyncio.start_server(handler, host, port)
+
+
+async def serve_stdin(
+	stdin=None,
+	stdout=None,
+	cache: PredictionCache | None = None
+) -> None:
+	"""
+	Answers request lines from stdin until EOF. Lines are read in a worker
+	thread so the event loop never blocks on the terminal or pipe.
+
+	Args:
+		stdin: The text stream to read (defaults to sys.stdin).
+		stdout: The text stream to write (defaults to sys.stdout).
+		cache (PredictionCache | None): Optional cache of predictions.
+	"""
+	stdin = stdin or sys.stdin
+	stdout = stdout or sys.stdout
+	loop = asyncio.get_running_loop()
+
+	while line := await loop.run_in_executor(None, stdin.readline):
+		if not line.strip():
+			continue
+		stdout.write(json.dumps(handle_line(line, cache)) + "\n")
+		stdout.flush()
+
+
+async def serve(
+	host: str = "127.0.0.1",
+	port: int | None = None,
+	unix: str | None = None,
+	cache_size: int = 0
+) -> None:
+	"""
+	Runs the server until it is cancelled (or stdin reaches EOF).
+
+	Args:
+		host (str): The host to listen on for TCP.
+		port (int | None): The TCP port, or None to use stdin.
+		unix (str | None): The Unix socket path, or None to use stdin.
+		cache_size (int): How many predictions to cache (0 disables it).
+	"""
+	cache = PredictionCache(cache_size) if cache_size > 0 else None
+	if port is None and unix is None:
+		await serve_stdin(cache=cache)
+		return
+
+	server = await start_server(host, port, unix, cache)
+	async with server:
+		await server.serve_forever()
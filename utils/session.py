@@ -0,0 +1,475 @@
+"""
+Stronghold sessions for endtrace, a Minecraft stronghold prediction tool.
+
+predict_stronghold forgets every prediction once it returns, but after the
+first stronghold players (and analysis tools) go looking for the rest of
+the 128. A StrongholdSession remembers the confirmed and predicted
+strongholds found so far:
+
+- a new prediction close to a known stronghold is merged into it (so
+  repeated hunts for the same stronghold refine one entry), otherwise it
+  becomes a new stronghold,
+- each stronghold is assigned to its ring and, once the ring has a known
+  stronghold, to one of the ring's evenly spaced slots (see utils.rings),
+- strongholds live in a grid hash of CELL_SIZE cells, so nearest-stronghold
+  queries only visit the cells around the query point.
+
+Sessions only hold a few flat arrays, and to_bytes/from_bytes (also used
+by pickle) store just those, so a server can keep thousands of them.
+"""
+
+from array import array
+from typing import Iterator, NamedTuple
+from utils.rings import RINGS, ring_of
+import math
+import struct
+import sys
+
+# predictions closer than this (in blocks) to a known stronghold are merged
+# into it; strongholds are thousands of blocks apart, while predictions are
+# off by tens of blocks and biome snapping moves strongholds up to 112
+MERGE_DISTANCE = 256.0
+
+# side of the grid hash's cells (in blocks), about the spacing of
+# neighbouring strongholds in a ring so most cells hold at most one
+CELL_SIZE = 2048
+
+# to_bytes writes a header (magic, version, stronghold count and merge
+# distance), then the x, z (float64) and observations (uint32) columns and a
+# confirmed byte per stronghold, all little-endian
+_HEADER = struct.Struct("<4sBId")
+_MAGIC = b"ETSS"
+_VERSION = 1
+
+
+class Stronghold(NamedTuple):
+	"""
+	A stronghold known to a session.
+
+	Attributes:
+		index (int): The stronghold's position in the session.
+		x (float): X-coord of the stronghold.
+		z (float): Z-coord of the stronghold.
+		confirmed (bool): Whether the stronghold was found (rather than
+			only predicted).
+		observations (int): The number of positions merged into it.
+		ring (int | None): The ring it lies in (None if it is outside
+			every ring).
+		slot (int | None): Its slot in the ring (None outside a ring); see
+			StrongholdSession.slot_of.
+	"""
+	index: int
+	x: float
+	z: float
+	confirmed: bool
+	observations: int
+	ring: int | None
+	slot: int | None
+
+
+class Nearest(NamedTuple):
+	"""
+	The answer to a nearest-stronghold query.
+
+	Attributes:
+		stronghold (Stronghold): The nearest stronghold.
+		distance (float): Its distance from the query point (in blocks).
+	"""
+	stronghold: Stronghold
+	distance: float
+
+
+class Assignment(NamedTuple):
+	"""
+	Where StrongholdSession.add put a position.
+
+	Attributes:
+		stronghold (Stronghold): The stronghold (after merging).
+		new (bool): Whether a new stronghold was started.
+		distance (float): The distance from the position to the stronghold
+			it was merged into (0 for a new stronghold).
+	"""
+	stronghold: Stronghold
+	new: bool
+	distance: float
+
+
+def _cell(x: float, z: float) -> tuple[int, int]:
+	"""The grid hash cell containing a position."""
+	return int(x//CELL_SIZE), int(z//CELL_SIZE)
+
+
+class StrongholdSession:
+	"""
+	The confirmed and predicted strongholds of one world, in a grid hash.
+	"""
+
+	__slots__ = (
+		"merge_distance", "_x", "_z", "_observations", "_confirmed",
+		"_grid", "_bounds", "_anchors"
+	)
+
+	def __init__(self, merge_distance: float = MERGE_DISTANCE):
+		"""
+		Args:
+			merge_distance (float): Positions closer than this (in blocks)
+				to a known stronghold are merged into it.
+		"""
+		self.merge_distance = merge_distance
+		self._x = array("d")
+		self._z = array("d")
+		self._observations = array("I")
+		self._confirmed = bytearray()
+
+		# cell -> indices of the strongholds in it
+		self._grid: dict[tuple[int, int], list[int]] = {}
+
+		# the smallest and largest occupied cell coords (never shrinks)
+		self._bounds = None
+
+		# ring -> index of the stronghold its slots are counted from
+		self._anchors: dict[int, int] = {}
+
+	def __len__(self) -> int:
+		return len(self._x)
+
+	def __iter__(self) -> Iterator[Stronghold]:
+		return (self.stronghold(i) for i in range(len(self._x)))
+
+	def stronghold(self, index: int) -> Stronghold:
+		"""
+		Args:
+			index (int): The stronghold's position in the session.
+
+		Returns:
+			Stronghold: The stronghold with its ring and slot.
+		"""
+		x, z = self._x[index], self._z[index]
+		ring, slot = self.slot_of(x, z)
+		return Stronghold(
+			index, x, z, bool(self._confirmed[index]),
+			self._observations[index], ring, slot
+		)
+
+	def slot_of(self, x: float, z: float) -> tuple[int | None, int | None]:
+		"""
+		Finds the ring and ring slot a position belongs to. Slots are
+		numbered by increasing atan2(z, x) from the ring's anchor: its first
+		confirmed stronghold, or else its first predicted one.
+
+		Args:
+			x (float): X-coord of the position.
+			z (float): Z-coord of the position.
+
+		Returns:
+			tuple[int | None, int | None]: The ring (None outside every
+				ring) and the slot (None if the ring has no known stronghold
+				yet).
+		"""
+		ring = ring_of(math.hypot(x, z))
+		if ring is None:
+			return None, None
+		anchor = self._anchors.get(ring.index)
+		if anchor is None:
+			return ring.index, None
+
+		step = 2*math.pi/ring.slots
+		anchor_angle = math.atan2(self._z[anchor], self._x[anchor])
+		offset = math.atan2(z, x) - anchor_angle
+		return ring.index, round(offset/step) % ring.slots
+
+	def slot_positions(self, ring: int) -> list[tuple[float, float]]:
+		"""
+		Estimates where each slot of a ring is, from the ring's anchor (see
+		slot_of): the slots are evenly spaced in angle, and each lies
+		somewhere between the ring's inner and outer distance.
+
+		Args:
+			ring (int): The ring number.
+
+		Returns:
+			list[tuple[float, float]]: The (x, z) of every slot at the
+				ring's middle distance, by slot number (empty if the ring
+				has no known stronghold yet).
+		"""
+		anchor = self._anchors.get(ring)
+		if anchor is None:
+			return []
+		ring = RINGS[ring]
+		start = math.atan2(self._z[anchor], self._x[anchor])
+		middle = (ring.inner + ring.outer)/2
+		return [
+			(
+				middle*math.cos(start + 2*math.pi*slot/ring.slots),
+				middle*math.sin(start + 2*math.pi*slot/ring.slots)
+			)
+			for slot in range(ring.slots)
+		]
+
+	def _insert(self, index: int) -> None:
+		"""Adds a stronghold to the grid hash."""
+		cell = _cell(self._x[index], self._z[index])
+		self._grid.setdefault(cell, []).append(index)
+		if self._bounds is None:
+			self._bounds = (*cell, *cell)
+		else:
+			min_x, min_z, max_x, max_z = self._bounds
+			self._bounds = (
+				min(min_x, cell[0]), min(min_z, cell[1]),
+				max(max_x, cell[0]), max(max_z, cell[1])
+			)
+
+	def _remove(self, index: int) -> None:
+		"""Takes a stronghold out of the grid hash."""
+		cell = _cell(self._x[index], self._z[index])
+		indices = self._grid[cell]
+		indices.remove(index)
+		if not indices:
+			del self._grid[cell]
+
+	def _anchor(self, index: int) -> None:
+		"""Makes a stronghold its ring's anchor if the ring needs one."""
+		ring = ring_of(math.hypot(self._x[index], self._z[index]))
+		if ring is None:
+			return
+		anchor = self._anchors.get(ring.index)
+		# a confirmed stronghold is a better anchor than a prediction
+		if anchor is None or (
+			self._confirmed[index] and not self._confirmed[anchor]
+		):
+			self._anchors[ring.index] = index
+
+	def _ring_cells(self, cx: int, cz: int, r: int) -> list[tuple[int, int]]:
+		"""
+		The cells on the square r cells around (cx, cz), clipped to the
+		occupied bounds.
+		"""
+		min_x, min_z, max_x, max_z = self._bounds
+		if r == 0:
+			return [(cx, cz)]
+
+		x_range = range(max(cx - r, min_x), min(cx + r, max_x) + 1)
+		z_range = range(max(cz - r + 1, min_z), min(cz + r - 1, max_z) + 1)
+		cells = []
+		if min_z <= cz - r:
+			cells += [(i, cz - r) for i in x_range]
+		if cz + r <= max_z:
+			cells += [(i, cz + r) for i in x_range]
+		if min_x <= cx - r:
+			cells += [(cx - r, i) for i in z_range]
+		if cx + r <= max_x:
+			cells += [(cx + r, i) for i in z_range]
+		return cells
+
+	def _nearest(self, x: float, z: float) -> tuple[int, float]:
+		"""
+		Searches the grid hash in growing squares of cells around the query
+		point, until no unvisited cell can hold anything closer. Once that
+		would visit more cells than are occupied (far from every known
+		stronghold), the occupied cells are scanned instead.
+
+		Returns:
+			tuple[int, float]: The nearest stronghold's index (-1 if there
+				are none) and its squared distance.
+		"""
+		best, best_squared = -1, math.inf
+		if self._bounds is None:
+			return best, best_squared
+
+		xs, zs, grid = self._x, self._z, self._grid
+		cx, cz = _cell(x, z)
+		min_x, min_z, max_x, max_z = self._bounds
+
+		# squares closer than the occupied bounds are all empty
+		first = max(0, min_x - cx, cx - max_x, min_z - cz, cz - max_z)
+		last = max(cx - min_x, max_x - cx, cz - min_z, max_z - cz)
+
+		visited = 0
+		for r in range(first, last + 1):
+			# every cell r squares away is at least (r - 1) cells away
+			if best_squared <= ((r - 1)*CELL_SIZE)**2:
+				break
+			# the square has at most 8r cells
+			if visited + max(8*r, 1) > len(grid):
+				cells = grid
+			else:
+				cells = self._ring_cells(cx, cz, r)
+				visited += len(cells)
+			for cell in cells:
+				for i in grid.get(cell, ()):
+					squared = (xs[i] - x)**2 + (zs[i] - z)**2
+					if squared < best_squared:
+						best, best_squared = i, squared
+			if cells is grid:
+				break
+
+		return best, best_squared
+
+	def nearest(self, x: float, z: float) -> Nearest | None:
+		"""
+		Finds the known stronghold nearest to a position.
+
+		Args:
+			x (float): X-coord of the position.
+			z (float): Z-coord of the position.
+
+		Returns:
+			Nearest | None: The stronghold and its distance, or None if the
+				session is empty.
+		"""
+		index, squared = self._nearest(x, z)
+		if index < 0:
+			return None
+		return Nearest(self.stronghold(index), math.sqrt(squared))
+
+	def add(self, x: float, z: float, confirmed: bool = False) -> Assignment:
+		"""
+		Adds a predicted or confirmed stronghold position, merging it into
+		the nearest known stronghold if that is within merge_distance.
+		Merged predictions are averaged; a confirmed position replaces any
+		prediction and is never moved by later ones.
+
+		Args:
+			x (float): X-coord of the stronghold.
+			z (float): Z-coord of the stronghold.
+			confirmed (bool): Whether the stronghold was found.
+
+		Returns:
+			Assignment: The stronghold the position was assigned to.
+
+		Raises:
+			ValueError: If the coords are not finite.
+		"""
+		if not (math.isfinite(x) and math.isfinite(z)):
+			raise ValueError("coords must be finite")
+
+		index, squared = self._nearest(x, z)
+		if index < 0 or squared > self.merge_distance**2:
+			index = len(self._x)
+			self._x.append(x)
+			self._z.append(z)
+			self._observations.append(1)
+			self._confirmed.append(confirmed)
+			self._insert(index)
+			self._anchor(index)
+			return Assignment(self.stronghold(index), True, 0.0)
+
+		count = self._observations[index]
+		if confirmed or not self._confirmed[index]:
+			self._remove(index)
+			if confirmed and not self._confirmed[index]:
+				self._x[index], self._z[index] = x, z
+			elif not confirmed:
+				self._x[index] += (x - self._x[index])/(count + 1)
+				self._z[index] += (z - self._z[index])/(count + 1)
+			self._insert(index)
+		self._observations[index] = count + 1
+		self._confirmed[index] |= confirmed
+		self._anchor(index)
+		return Assignment(self.stronghold(index), False, math.sqrt(squared))
+
+	def to_dict(self) -> dict:
+		"""
+		Returns:
+			dict: The merge distance and every stronghold, ready for
+				json.dumps.
+		"""
+		return {
+			"merge_distance": self.merge_distance,
+			"strongholds": [
+				{
+					"x": self._x[i],
+					"z": self._z[i],
+					"confirmed": bool(self._confirmed[i]),
+					"observations": self._observations[i]
+				}
+				for i in range(len(self._x))
+			]
+		}
+
+	@classmethod
+	def from_dict(cls, data: dict) -> "StrongholdSession":
+		"""
+		Args:
+			data (dict): The output of to_dict.
+
+		Returns:
+			StrongholdSession: The restored session.
+		"""
+		session = cls(data.get("merge_distance", MERGE_DISTANCE))
+		for stronghold in data["strongholds"]:
+			session._append(
+				stronghold["x"], stronghold["z"],
+				stronghold.get("confirmed", False),
+				stronghold.get("observations", 1)
+			)
+		return session
+
+	def _append(
+		self, x: float, z: float, confirmed: bool, observations: int
+	) -> None:
+		"""Restores a stronghold as it was saved, without merging."""
+		index = len(self._x)
+		self._x.append(x)
+		self._z.append(z)
+		self._observations.append(observations)
+		self._confirmed.append(confirmed)
+		self._insert(index)
+		self._anchor(index)
+
+	def to_bytes(self) -> bytes:
+		"""
+		Returns:
+			bytes: A compact binary copy of the session (a 17-byte header,
+				then 21 bytes per stronghold).
+		"""
+		columns = [self._x, self._z, self._observations]
+		if sys.byteorder == "big":
+			columns = [array(column.typecode, column) for column in columns]
+			for column in columns:
+				column.byteswap()
+		return b"".join((
+			_HEADER.pack(_MAGIC, _VERSION, len(self._x), self.merge_distance),
+			*(column.tobytes() for column in columns),
+			bytes(self._confirmed)
+		))
+
+	@classmethod
+	def from_bytes(cls, data: bytes) -> "StrongholdSession":
+		"""
+		Args:
+			data (bytes): The output of to_bytes.
+
+		Returns:
+			StrongholdSession: The restored session.
+
+		Raises:
+			ValueError: If the data is not a saved session.
+		"""
+		if len(data) < _HEADER.size:
+			raise ValueError("truncated session data")
+		magic, version, count, merge_distance = _HEADER.unpack_from(data)
+		if magic != _MAGIC or version != _VERSION:
+			raise ValueError("not a saved endtrace session")
+		if len(data) != _HEADER.size + 21*count:
+			raise ValueError("truncated session data")
+
+		columns = []
+		offset = _HEADER.size
+		for typecode, size in (("d", 8), ("d", 8), ("I", 4)):
+			column = array(typecode)
+			column.frombytes(data[offset:offset + size*count])
+			if sys.byteorder == "big":
+				column.byteswap()
+			columns.append(column)
+			offset += size*count
+		confirmed = data[offset:offset + count]
+
+		session = cls(merge_distance)
+		for x, z, observations, found in zip(*columns, confirmed):
+			session._append(x, z, bool(found), observations)
+		return session
+
+	def __reduce__(self):
+		# pickle the compact binary form rather than the derived grid hash
+		return (StrongholdSession.from_bytes, (self.to_bytes(),))
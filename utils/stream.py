@@ -0,0 +1,251 @@
+"""
+Streaming file mode for endtrace, a Minecraft stronghold prediction tool.
+
+Triangulates CSV or JSONL throw logs (or stdin) through a generator pipeline:
+rows are read, validated, predicted and written one at a time, so memory use
+stays constant no matter how large the log is. Invalid rows are reported
+with their line number instead of aborting the run.
+
+CSV input has the columns x1, z1, theta1, x2, z2, theta2, either in that
+order or named by a header row. JSONL input has one object per line with
+the same fields (see utils.server).
+"""
+
+from endtrace import solve_stronghold
+from utils.route import ROUTE_FIELDS, plan_route, round_route
+from utils.server import FIELDS, ProtocolError, _parse_request
+from utils.validators import *
+import csv
+import json
+import math
+import sys
+import time
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+
+class StreamStats(NamedTuple):
+	"""
+	Summary of a streaming run.
+
+	Attributes:
+		rows (int): The number of rows read.
+		errors (int): The number of invalid rows.
+		seconds (float): The wall-clock time of the run.
+	"""
+	rows: int
+	errors: int
+	seconds: float
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.rows/self.seconds if self.seconds > 0 else float("inf")
+
+
+def detect_format(path: str) -> str:
+	"""
+	Guesses the input format from a file extension.
+
+	Args:
+		path (str): The file path ("-" for stdin).
+
+	Returns:
+		str: "jsonl" for .jsonl/.ndjson/.json files, "binary" for .etb
+			files (see utils.binary), otherwise "csv".
+	"""
+	if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+		return "jsonl"
+	if path.lower().endswith(".etb"):
+		return "binary"
+	return "csv"
+
+
+def _parse_csv_values(fields: list[str]) -> list[float]:
+	"""
+	Parses the six float fields of a CSV row.
+
+	Raises:
+		ProtocolError: If the row does not have six numeric fields.
+	"""
+	if len(fields) != len(FIELDS):
+		raise ProtocolError(
+			f"expected {len(FIELDS)} fields, got {len(fields)}"
+		)
+	try:
+		return [float(field) for field in fields]
+	except ValueError:
+		raise ProtocolError("fields must be numbers")
+
+
+def _csv_header_order(fields: list[str]) -> list[int] | None:
+	"""
+	Checks whether a CSV row is a header naming all six columns.
+
+	Args:
+		fields (list[str]): The fields of the row.
+
+	Returns:
+		list[int] | None: The index of each of FIELDS in the row, or None
+			if the row is not a header.
+	"""
+	names = [field.strip().lower() for field in fields]
+	if set(FIELDS) <= set(names):
+		return [names.index(field) for field in FIELDS]
+	return None
+
+
+def read_csv(
+	lines: Iterable[str],
+	order: list[int] | None = None,
+	header: bool = True
+) -> Iterator[tuple[int, object]]:
+	"""
+	Lazily parses CSV throw rows. A first non-blank row naming all six
+	columns is treated as a header.
+
+	Args:
+		lines (Iterable[str]): The lines of the CSV input.
+		order (list[int] | None): Column order from a header read earlier
+			(e.g., by another shard of the same file).
+		header (bool): Whether the first non-blank row may be a header.
+			Ignored when order is given.
+
+	Yields:
+		tuple[int, object]: The line number and either the six throw
+			values or the ProtocolError for that row.
+	"""
+	reader = csv.reader(lines)
+	detect_header = header and order is None
+	for fields in reader:
+		if not fields or not "".join(fields).strip():
+			continue
+
+		# only the first non-blank row may be the header
+		if detect_header:
+			detect_header = False
+			order = _csv_header_order(fields)
+			if order is not None:
+				continue
+
+		try:
+			if order is not None:
+				if len(fields) <= max(order):
+					raise ProtocolError("row is missing field(s)")
+				fields = [fields[i] for i in order]
+			yield reader.line_num, _parse_csv_values(fields)
+		except ProtocolError as error:
+			yield reader.line_num, error
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[tuple[int, object]]:
+	"""
+	Lazily parses JSONL throw rows.
+
+	Args:
+		lines (Iterable[str]): The lines of the JSONL input.
+
+	Yields:
+		tuple[int, object]: The line number and either the six throw
+			values or the ProtocolError for that row.
+	"""
+	for line_no, line in enumerate(lines, start=1):
+		if not line.strip():
+			continue
+		try:
+			yield line_no, _parse_request(line)[1]
+		except ProtocolError as error:
+			yield line_no, error
+
+
+def predict_rows(
+	rows: Iterable[tuple[int, object]],
+	route: bool = False
+) -> Iterator[tuple[int, object]]:
+	"""
+	Validates and predicts each parsed row.
+
+	Args:
+		rows (Iterable[tuple[int, object]]): Output of read_csv/read_jsonl.
+		route (bool): Whether to add the rounded Nether coords, yaw and
+			distance from the second throw (see utils.route).
+
+	Yields:
+		tuple[int, object]: The line number and either the rounded (x, z)
+			prediction (followed by the route values if asked for) or the
+			exception explaining why the row is invalid.
+	"""
+	for line_no, values in rows:
+		if isinstance(values, Exception):
+			yield line_no, values
+			continue
+
+		x1, z1, theta1, x2, z2, theta2 = values
+		try:
+			validate_coords(x1, z1, x2, z2)
+			validate_angles(theta1, theta2)
+			prediction = solve_stronghold(*values)
+			if not (
+				math.isfinite(prediction.rounded_x)
+				and math.isfinite(prediction.rounded_z)
+			):
+				# overflowed, like the rows the batch runners reject
+				raise validation_error(ValidationCode.PARALLEL)
+		except (CoordsError, AngleError) as error:
+			yield line_no, error
+			continue
+
+		result = (prediction.rounded_x, prediction.rounded_z)
+		if route:
+			result += round_route(
+				plan_route(prediction.x, prediction.z, x2, z2)
+			)
+		yield line_no, result
+
+
+def stream_file(
+	lines: Iterable[str],
+	out: TextIO,
+	fmt: str = "csv",
+	err: TextIO | None = None,
+	route: bool = False
+) -> StreamStats:
+	"""
+	Runs the whole pipeline, writing each prediction as soon as it is
+	made. Output uses the input's format: `line,x,z` CSV rows or
+	{"line", "x", "z"} JSON lines (plus the ROUTE_FIELDS if route is set).
+	Invalid rows are reported to err.
+
+	Args:
+		lines (Iterable[str]): The input lines.
+		out (TextIO): Where predictions are written.
+		fmt (str): The input format, "csv" or "jsonl".
+		err (TextIO | None): Where invalid rows are reported (defaults to
+			sys.stderr).
+		route (bool): Whether to add the Nether coords, yaw and distance
+			from the second throw.
+
+	Returns:
+		StreamStats: The row and error counts and the elapsed time.
+	"""
+	err = err or sys.stderr
+	rows = read_jsonl(lines) if fmt == "jsonl" else read_csv(lines)
+	columns = ["line", "x", "z"] + (list(ROUTE_FIELDS) if route else [])
+
+	if fmt == "csv":
+		writer = csv.writer(out, lineterminator="\n")
+		writer.writerow(columns)
+
+	count = errors = 0
+	start = time.perf_counter()
+	for line_no, result in predict_rows(rows, route):
+		count += 1
+		if isinstance(result, Exception):
+			errors += 1
+			name = type(result).__name__
+			print(f"line {line_no}: {name}: {result}", file=err)
+		elif fmt == "csv":
+			writer.writerow([line_no, *result])
+		else:
+			record = dict(zip(columns, (line_no, *result)))
+			out.write(json.dumps(record) + "\n")
+
+	return StreamStats(count, errors, time.perf_counter() - start)
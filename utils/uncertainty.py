@@ -0,0 +1,309 @@
+"""
+Uncertainty estimates for endtrace, a Minecraft stronghold prediction tool.
+
+The F3 screen shows angles to 0.1 degrees, so every throw's line is only
+known to within a small angle. At long distances that turns into hundreds
+of blocks. This module propagates angle and position errors to the
+prediction, either analytically (first-order, pure Python and fast enough
+to run every frame) or with a vectorized Monte Carlo simulation, and turns
+the result into an error ellipse or a probability grid.
+"""
+
+from typing import NamedTuple
+from endtrace import (
+	Prediction,
+	_transform_minecraft_angle_to_cartesian_rads,
+	solve_stronghold
+)
+from utils.validators import AngleError
+import math
+
+# the f3 screen rounds angles to 0.1 degrees, i.e. a uniform error of
+# +-0.05 degrees with a standard deviation of 0.1/sqrt(12)
+ANGLE_STEP = 0.1
+DEFAULT_ANGLE_STD = ANGLE_STEP/math.sqrt(12)
+
+# probability grids with more cells are coarsened (nearly parallel throws
+# have enormous error ellipses)
+MAX_GRID_CELLS = 1 << 20
+
+
+class UncertaintyEstimate(NamedTuple):
+	"""
+	A stronghold prediction with a 2-D Gaussian error model.
+
+	Attributes:
+		x (float): X-coord of the prediction.
+		z (float): Z-coord of the prediction.
+		var_x (float): Variance of the x-coord (in blocks^2).
+		var_z (float): Variance of the z-coord (in blocks^2).
+		cov_xz (float): Covariance of the x- and z-coords.
+	"""
+	x: float
+	z: float
+	var_x: float
+	var_z: float
+	cov_xz: float
+
+
+class ErrorEllipse(NamedTuple):
+	"""
+	A confidence ellipse around a prediction.
+
+	Attributes:
+		x (float): X-coord of the center.
+		z (float): Z-coord of the center.
+		semi_major (float): Length of the semi-major axis (in blocks).
+		semi_minor (float): Length of the semi-minor axis (in blocks).
+		angle (float): Angle of the major axis from the +x axis towards
+			the +z axis (in degrees).
+		confidence (float): The probability mass inside the ellipse.
+	"""
+	x: float
+	z: float
+	semi_major: float
+	semi_minor: float
+	angle: float
+	confidence: float
+
+
+def estimate_uncertainty(
+	x1: float, z1: float, theta1: float,
+	x2: float, z2: float, theta2: float,
+	angle_std: float = DEFAULT_ANGLE_STD,
+	position_std: float = 0.0,
+	prediction: Prediction | None = None
+) -> UncertaintyEstimate:
+	"""
+	Propagates throw errors to the prediction to first order.
+
+	Each throw's line n . p = n . p_i is shifted perpendicular to itself by
+	position errors (std position_std) and by angle errors times the
+	distance r_i from the throw to the prediction (std r_i*angle_std), so
+	the covariance is A^-1 diag(s1^2, s2^2) A^-T with A = [n1; n2].
+
+	Args:
+		x1 (float): X-coord of the first throw.
+		z1 (float): Z-coord of the first throw.
+		theta1 (float): Angle of the first throw (in Minecraft degrees).
+		x2 (float): X-coord of the second throw.
+		z2 (float): Z-coord of the second throw.
+		theta2 (float): Angle of the second throw (in Minecraft degrees).
+		angle_std (float): Standard deviation of each angle (in degrees).
+		position_std (float): Standard deviation of each coord (in blocks).
+		prediction (Prediction | None): The throws' solve_stronghold result,
+			if it was already computed (it is not solved again).
+
+	Returns:
+		UncertaintyEstimate: The prediction and its covariance.
+
+	Raises:
+		AngleError: If the throws are parallel.
+	"""
+	phi1 = _transform_minecraft_angle_to_cartesian_rads(theta1)
+	phi2 = _transform_minecraft_angle_to_cartesian_rads(theta2)
+	cos1, sin1 = math.cos(phi1), math.sin(phi1)
+	cos2, sin2 = math.cos(phi2), math.sin(phi2)
+
+	# raises an AngleError for (numerically) parallel throws
+	if prediction is None:
+		prediction = solve_stronghold(x1, z1, theta1, x2, z2, theta2)
+
+	# sine of the angle between the throws
+	det = cos1*sin2 - sin1*cos2
+
+	# distance along each ray from the throw to the prediction
+	r1 = cos1*(prediction.x - x1) + sin1*(prediction.z - z1)
+	r2 = cos2*(prediction.x - x2) + sin2*(prediction.z - z2)
+
+	sigma = math.radians(angle_std)
+	s1 = position_std**2 + (r1*sigma)**2
+	s2 = position_std**2 + (r2*sigma)**2
+
+	# columns of A^-1 are (cos2, sin2)/det and -(cos1, sin1)/det
+	det2 = det*det
+	var_x = (s1*cos2*cos2 + s2*cos1*cos1)/det2
+	var_z = (s1*sin2*sin2 + s2*sin1*sin1)/det2
+	cov_xz = (s1*cos2*sin2 + s2*cos1*sin1)/det2
+
+	return UncertaintyEstimate(
+		prediction.x, prediction.z, var_x, var_z, cov_xz
+	)
+
+
+def monte_carlo_uncertainty(
+	x1: float, z1: float, theta1: float,
+	x2: float, z2: float, theta2: float,
+	angle_std: float = DEFAULT_ANGLE_STD,
+	position_std: float = 0.0,
+	samples: int = 10000,
+	seed: int | None = None
+) -> UncertaintyEstimate:
+	"""
+	Estimates the prediction's covariance by simulating noisy throws with
+	the vectorized batch API. Slower than estimate_uncertainty but does not
+	linearize, which matters for nearly parallel throws.
+
+	Args:
+		x1 (float): X-coord of the first throw.
+		z1 (float): Z-coord of the first throw.
+		theta1 (float): Angle of the first throw (in Minecraft degrees).
+		x2 (float): X-coord of the second throw.
+		z2 (float): Z-coord of the second throw.
+		theta2 (float): Angle of the second throw (in Minecraft degrees).
+		angle_std (float): Standard deviation of each angle (in degrees).
+		position_std (float): Standard deviation of each coord (in blocks).
+		samples (int): The number of simulated throw pairs.
+		seed (int | None): Seed for reproducible simulations.
+
+	Returns:
+		UncertaintyEstimate: The mean prediction and sample covariance.
+
+	Raises:
+		AngleError: If fewer than two simulated pairs can be triangulated.
+	"""
+	import numpy as np
+	from utils.batch import predict_strongholds
+
+	rng = np.random.default_rng(seed)
+
+	def noisy(value, std):
+		if not std:
+			return np.full(samples, float(value))
+		return value + rng.normal(0.0, std, samples)
+
+	def noisy_angle(theta):
+		# wrap back into [-180, 180) so noise never leaves the valid range
+		return (noisy(theta, angle_std) + 180) % 360 - 180
+
+	result = predict_strongholds(
+		noisy(x1, position_std), noisy(z1, position_std), noisy_angle(theta1),
+		noisy(x2, position_std), noisy(z2, position_std), noisy_angle(theta2)
+	)
+	xs = result.x[~result.degenerate]
+	zs = result.z[~result.degenerate]
+	if len(xs) < 2:
+		raise AngleError("throws must not be parallel")
+
+	cov = np.cov(xs, zs)
+	return UncertaintyEstimate(
+		float(xs.mean()), float(zs.mean()),
+		float(cov[0, 0]), float(cov[1, 1]), float(cov[0, 1])
+	)
+
+
+def error_ellipse(
+	estimate: UncertaintyEstimate,
+	confidence: float = 0.95
+) -> ErrorEllipse:
+	"""
+	Converts a covariance into the ellipse holding `confidence` of the
+	probability mass.
+
+	Args:
+		estimate (UncertaintyEstimate): The prediction and covariance.
+		confidence (float): The probability inside the ellipse, in (0, 1).
+
+	Returns:
+		ErrorEllipse: The confidence ellipse.
+	"""
+	a, b, c = estimate.var_x, estimate.cov_xz, estimate.var_z
+
+	# eigenvalues of [[a, b], [b, c]]
+	mean = (a + c)/2
+	spread = math.hypot((a - c)/2, b)
+	major = max(mean + spread, 0.0)
+	minor = max(mean - spread, 0.0)
+
+	# a 2-D gaussian's mahalanobis radius for the given confidence
+	k = math.sqrt(-2*math.log(1 - confidence))
+
+	return ErrorEllipse(
+		estimate.x,
+		estimate.z,
+		k*math.sqrt(major),
+		k*math.sqrt(minor),
+		math.degrees(0.5*math.atan2(2*b, a - c)),
+		confidence
+	)
+
+
+def probability_grid(
+	estimate: UncertaintyEstimate,
+	cell_size: float = 16.0,
+	sigmas: float = 3.0,
+	max_cells: int = MAX_GRID_CELLS
+):
+	"""
+	Spreads the prediction's probability over a grid of cells (chunks by
+	default) covering +-`sigmas` standard deviations. If that would take
+	more than `max_cells` cells, the cells are widened to a whole multiple
+	of `cell_size` until it does not.
+
+	Args:
+		estimate (UncertaintyEstimate): The prediction and covariance.
+		cell_size (float): The width of each cell (in blocks).
+		sigmas (float): How many standard deviations the grid covers.
+		max_cells (int): The most cells the grid may have.
+
+	Returns:
+		tuple[np.ndarray, np.ndarray, np.ndarray]: The x- and z-coords of
+			the cell centers and a (len(z), len(x)) array of probabilities
+			that sums to 1.
+
+	Raises:
+		ValueError: If the grid cannot fit in `max_cells` (fewer than 4, or
+			an infinite error model).
+	"""
+	import numpy as np
+
+	std_x = math.sqrt(max(estimate.var_x, 0.0))
+	std_z = math.sqrt(max(estimate.var_z, 0.0))
+
+	def bounds(mean, std, size):
+		return (
+			math.floor((mean - sigmas*std)/size),
+			math.floor((mean + sigmas*std)/size)
+		)
+
+	def cells(size):
+		x0, x1 = bounds(estimate.x, std_x, size)
+		z0, z1 = bounds(estimate.z, std_z, size)
+		return (x1 - x0 + 1)*(z1 - z0 + 1)
+
+	# wide enough cells always cover the grid with at most 2x2 of them
+	if max_cells < 4:
+		raise ValueError("max_cells must be at least 4")
+	edges = (
+		estimate.x - sigmas*std_x, estimate.x + sigmas*std_x,
+		estimate.z - sigmas*std_z, estimate.z + sigmas*std_z
+	)
+	if not all(map(math.isfinite, edges)):
+		raise ValueError("the error model must be finite")
+
+	# widen the cells by whole multiples so the grid stays aligned to them
+	scale = 1
+	count = cells(cell_size)
+	while count > max_cells:
+		scale = max(scale + 1, math.ceil(scale*math.sqrt(count/max_cells)))
+		count = cells(scale*cell_size)
+	cell_size *= scale
+
+	def centers(mean, std):
+		lo, hi = bounds(mean, std, cell_size)
+		return (np.arange(lo, hi + 1) + 0.5)*cell_size
+
+	xs = centers(estimate.x, std_x)
+	zs = centers(estimate.z, std_z)
+	dx = xs[np.newaxis, :] - estimate.x
+	dz = zs[:, np.newaxis] - estimate.z
+
+	# evaluate the gaussian density at each cell center (the covariance
+	# is regularized so a degenerate error model still gives one cell)
+	eps = (cell_size/4)**2
+	a, b, c = estimate.var_x + eps, estimate.cov_xz, estimate.var_z + eps
+	det = a*c - b*b
+	mahalanobis = (c*dx*dx - 2*b*dx*dz + a*dz*dz)/det
+	density = np.exp(-0.5*mahalanobis)
+
+	return xs, zs, density/density.sum()
@@ -2,9 +2,15 @@
 Validation utilities for endtrace, a Minecraft stronghold prediction tool.
 
 Provides exceptions and functions to validate coordinates and angles
-used in triangulation-based stronghold location logic.
+used in triangulation-based stronghold location logic. Each problem has a
+ValidationCode, shared with the vectorized utils.batch.validate_throws, so
+single pairs and whole columns are judged by the same rules.
 """
 
+from enum import IntEnum
+from utils import profiling
+import math
+
 class CoordsError(Exception):
 	"""
 	Raised when input coordinates are invalid or degenerate (and will cause
@@ -22,6 +28,84 @@ class AngleError(Exception):
 	pass
 
 
+class ValidationCode(IntEnum):
+	"""
+	Why a pair of throws cannot be triangulated. When several problems
+	apply, a pair gets the first one in this order (which is also the order
+	the validators check them in).
+	"""
+	OK = 0
+	IDENTICAL_COORDS = 1
+	NON_FINITE_COORDS = 2
+	IDENTICAL_ANGLES = 3
+	ANGLE_OUT_OF_BOUNDS = 4
+	PARALLEL = 5
+
+
+# enum attribute lookups are slow, so the checks use module globals
+_OK = ValidationCode.OK
+_IDENTICAL_COORDS = ValidationCode.IDENTICAL_COORDS
+_NON_FINITE_COORDS = ValidationCode.NON_FINITE_COORDS
+_IDENTICAL_ANGLES = ValidationCode.IDENTICAL_ANGLES
+_ANGLE_OUT_OF_BOUNDS = ValidationCode.ANGLE_OUT_OF_BOUNDS
+
+# the exception (and message) raised for each code
+_ERRORS = {
+	ValidationCode.IDENTICAL_COORDS: (CoordsError, "coords must be different"),
+	ValidationCode.NON_FINITE_COORDS: (CoordsError, "coords must be finite"),
+	ValidationCode.IDENTICAL_ANGLES: (AngleError, "angles must be different"),
+	ValidationCode.ANGLE_OUT_OF_BOUNDS: (AngleError, "angle(s) out of bounds"),
+	ValidationCode.PARALLEL: (AngleError, "throws must not be parallel")
+}
+
+
+def validation_error(code: int) -> Exception | None:
+	"""
+	Builds the exception describing a validation code.
+
+	Args:
+		code (int): A ValidationCode.
+
+	Returns:
+		Exception | None: The CoordsError or AngleError for the code, or
+			None for ValidationCode.OK.
+	"""
+	if not code:
+		return None
+	error, message = _ERRORS[code]
+	return error(message)
+
+
+def _fail(code: ValidationCode) -> Exception:
+	"""Counts a validation failure and returns its exception to raise."""
+	error = validation_error(code)
+	profiling.count("validation_failures", error=type(error).__name__)
+	return error
+
+
+def check_coords(x1: float, z1: float, x2: float, z2: float) -> ValidationCode:
+	"""
+	Checks two Minecraft coordinates without raising.
+
+	Args:
+		x1 (float): X-coord of the first throw.
+		z1 (float): Z-coord of the first throw.
+		x2 (float): X-coord of the second throw.
+		z2 (float): Z-coord of the second throw.
+
+	Returns:
+		ValidationCode: The first problem found, or ValidationCode.OK.
+	"""
+	if (x1, z1) == (x2, z2):
+		return _IDENTICAL_COORDS
+	if not (
+		math.isfinite(x1) and math.isfinite(z1)
+		and math.isfinite(x2) and math.isfinite(z2)
+	):
+		return _NON_FINITE_COORDS
+	return _OK
+
+
 def validate_coords(x1: float, z1: float, x2: float, z2: float) -> None:
 	"""
 	Checks that two Minecraft coordinates are valid for a stronghold
@@ -34,10 +118,11 @@ def validate_coords(x1: float, z1: float, x2: float, z2: float) -> None:
 		z2 (float): Z-coord of the second throw.
 	
 	Raises:
-		CoordsError: If the coords are invalid for a prediction.
+		CoordsError: If the coords are identical or not finite.
 	"""
-	if (x1, z1) == (x2, z2):
-		raise CoordsError("coords must be different")
+	code = check_coords(x1, z1, x2, z2)
+	if code:
+		raise _fail(code)
 
 
 def _angle_out_of_bounds(theta: float) -> bool:
@@ -54,6 +139,24 @@ def _angle_out_of_bounds(theta: float) -> bool:
 	return not (-180 <= theta <= 180)
 
 
+def check_angles(theta1: float, theta2: float) -> ValidationCode:
+	"""
+	Checks two Minecraft angles without raising.
+
+	Args:
+		theta1 (float): The first angle (in degrees).
+		theta2 (float): The second angle (in degrees).
+
+	Returns:
+		ValidationCode: The first problem found, or ValidationCode.OK.
+	"""
+	if theta1 == theta2:
+		return _IDENTICAL_ANGLES
+	if _angle_out_of_bounds(theta1) or _angle_out_of_bounds(theta2):
+		return _ANGLE_OUT_OF_BOUNDS
+	return _OK
+
+
 def validate_angles(theta1: float, theta2: float) -> None:
 	"""
 	Checks that two Minecraft angles are valid for a stronghold
@@ -70,7 +173,6 @@ def validate_angles(theta1: float, theta2: float) -> None:
 		AngleError: If the angles are identical or if one or more
 			angles are outside of the angle bounds in Minecraft.
 	"""
-	if (theta1 == theta2):
-		raise AngleError("angles must be different")
-	elif _angle_out_of_bounds(theta1) or _angle_out_of_bounds(theta2):
-		raise AngleError("angle(s) out of bounds")
+	code = check_angles(theta1, theta2)
+	if code:
+		raise _fail(code)
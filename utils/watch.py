@@ -0,0 +1,313 @@
+"""
+Watch mode for endtrace, a Minecraft stronghold prediction tool.
+
+Instead of retyping coordinates from the F3 screen, players can press F3+C
+after each throw: the game (or a client mod) copies a command like
+
+	/execute in minecraft:overworld run tp @s 116.70 75.00 -73.42 -61.80 -31.65
+
+holding the position and yaw. Watch mode follows a file that such commands
+end up in (a game log, or a file a clipboard tool keeps overwriting) or
+stdin, parses every new throw and updates the prediction incrementally with
+the multi-throw solver, so each line costs a few microseconds. In robust
+mode, throws that disagree with the rest are rejected (see utils.robust).
+
+Files are followed with an asyncio poll of os.stat: the loop sleeps between
+checks instead of busy-waiting, and handles files that are appended to,
+truncated, rewritten in place or replaced.
+"""
+
+from typing import AsyncIterator, NamedTuple, TextIO
+from endtrace import _clean_zero
+from utils.multithrow import MultiThrowSolver
+from utils.validators import AngleError
+import asyncio
+import os
+import re
+import sys
+import time
+
+# seconds between checks of a followed file
+POLL_INTERVAL = 0.05
+
+# how much of a followed file's end is compared to tell appends from rewrites
+_TAIL_BYTES = 256
+
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+_TP_COMMAND = re.compile(
+	r"/execute in (\S+) run tp @s "
+	+ " ".join([_NUMBER]*5)
+)
+
+
+class Throw(NamedTuple):
+	"""
+	One Eye of Ender throw read from an F3+C command.
+
+	Attributes:
+		x (float): X-coord of the throw.
+		z (float): Z-coord of the throw.
+		theta (float): Angle of the throw (in Minecraft degrees, wrapped
+			into [-180, 180)).
+		dimension (str): The dimension id (e.g., "minecraft:overworld").
+	"""
+	x: float
+	z: float
+	theta: float
+	dimension: str
+
+
+def parse_throw(line: str) -> Throw | None:
+	"""
+	Finds an F3+C `/execute ... tp` command anywhere in a line (so log
+	prefixes and chat formatting are ignored).
+
+	Args:
+		line (str): A line of the followed file.
+
+	Returns:
+		Throw | None: The throw, or None if the line holds no command.
+	"""
+	match = _TP_COMMAND.search(line)
+	if match is None:
+		return None
+
+	dimension, x, _, z, yaw, _ = match.groups()
+
+	# the game does not wrap the player's yaw, so it can be any angle
+	theta = (float(yaw) + 180) % 360 - 180
+	return Throw(float(x), float(z), theta, dimension)
+
+
+class ThrowTracker:
+	"""
+	Keeps the throws of the current stronghold hunt and predicts from all
+	of them as each one arrives.
+	"""
+
+	__slots__ = ("_solver", "_last", "_throws", "_robust")
+
+	def __init__(self, robust: bool = False):
+		"""
+		Args:
+			robust (bool): Whether to reject outlier throws (see
+				utils.robust) once there are three or more.
+		"""
+		self._solver = MultiThrowSolver()
+		self._last = None
+		self._throws = []
+		self._robust = robust
+
+	def __len__(self) -> int:
+		return len(self._solver)
+
+	def reset(self) -> None:
+		"""Forgets every throw (e.g., to start on the next stronghold)."""
+		self._solver.reset()
+		self._last = None
+		self._throws.clear()
+
+	def add(self, throw: Throw) -> bool:
+		"""
+		Adds a throw unless it repeats the previous one (a rewritten
+		clipboard file or a repeated F3+C).
+
+		Args:
+			throw (Throw): The throw.
+
+		Returns:
+			bool: Whether the throw was added.
+
+		Raises:
+			AngleError: If the angle is out of bounds.
+		"""
+		if throw == self._last:
+			return False
+		self._solver.add_throw(throw.x, throw.z, throw.theta)
+		self._last = throw
+		if self._robust:
+			self._throws.append((throw.x, throw.z, throw.theta))
+		return True
+
+	def predict(self):
+		"""
+		Returns:
+			MultiThrowPrediction | RobustFusion | None: The prediction from
+				every throw so far (a RobustFusion, which also lists the
+				rejected throws, in robust mode with three or more), or None
+				until there are two non-parallel (agreeing) throws.
+		"""
+		if len(self._solver) < 2:
+			return None
+		try:
+			if self._robust and len(self._throws) >= 3:
+				# imported lazily so plain watch mode never loads numpy
+				from utils.robust import robust_fuse
+				return robust_fuse(self._throws)
+			return self._solver.solve()
+		except AngleError:
+			return None
+
+
+async def follow(
+	path: str,
+	interval: float = POLL_INTERVAL,
+	from_start: bool = False
+) -> AsyncIterator[str]:
+	"""
+	Yields the lines written to a file from now on (like `tail -F`),
+	sleeping between polls. A file that is replaced, shrinks or is
+	rewritten in place (like a clipboard export) is read again from the
+	start.
+
+	Args:
+		path (str): The file to follow (it may not exist yet).
+		interval (float): Seconds between checks for new data.
+		from_start (bool): Whether to yield the lines already in the file.
+
+	Yields:
+		str: Each complete line, without the line ending.
+	"""
+	inode = mtime = None
+	offset = 0
+	tail = b""
+	partial = ""
+
+	while True:
+		try:
+			stat = os.stat(path)
+		except FileNotFoundError:
+			await asyncio.sleep(interval)
+			continue
+
+		if inode is None:
+			# first sight of the file
+			inode, mtime = stat.st_ino, stat.st_mtime_ns
+			if not from_start:
+				offset = stat.st_size
+				with open(path, "rb") as f:
+					f.seek(max(offset - _TAIL_BYTES, 0))
+					tail = f.read(offset - f.tell())
+
+		if stat.st_ino == inode and stat.st_mtime_ns == mtime \
+				and stat.st_size == offset:
+			await asyncio.sleep(interval)
+			continue
+
+		with open(path, "rb") as f:
+			# only an append if the bytes before the offset are unchanged
+			f.seek(max(offset - len(tail), 0))
+			appended = (
+				stat.st_ino == inode
+				and stat.st_size >= offset
+				and f.read(len(tail)) == tail
+			)
+			if not appended:
+				f.seek(0)
+				offset, partial = 0, ""
+			data = f.read()
+
+		inode, mtime = stat.st_ino, stat.st_mtime_ns
+		offset += len(data)
+		tail = (tail + data)[-_TAIL_BYTES:]
+
+		lines = (partial + data.decode(errors="replace")).split("\n")
+		partial = lines.pop()
+		for line in lines:
+			yield line.rstrip("\r")
+
+		# a rewritten file (e.g., a clipboard export) may not end with a
+		# newline, so its last line is complete as well
+		if not appended and partial:
+			yield partial.rstrip("\r")
+			partial = ""
+
+
+async def _stdin_lines(stdin: TextIO) -> AsyncIterator[str]:
+	"""Yields stdin lines, reading them in a worker thread."""
+	loop = asyncio.get_running_loop()
+	while line := await loop.run_in_executor(None, stdin.readline):
+		yield line.rstrip("\r\n")
+
+
+def _format(prediction) -> str:
+	"""Formats a prediction like predict_stronghold prints it."""
+	x = _clean_zero(round(prediction.x, 2))
+	z = _clean_zero(round(prediction.z, 2))
+	text = (
+		f"predicted stronghold coords: (x={x}, y=?, z={z}) from "
+		f"{prediction.throws} throws (residual "
+		f"{round(prediction.residual, 2)} blocks)"
+	)
+	rejected = getattr(prediction, "rejected", ())
+	if rejected:
+		numbers = ", ".join(str(i + 1) for i in rejected)
+		text += f", rejected throw(s) {numbers}"
+	return text
+
+
+async def watch(
+	path: str,
+	out: TextIO | None = None,
+	interval: float = POLL_INTERVAL,
+	from_start: bool = False,
+	reset_after: float | None = None,
+	stdin: TextIO | None = None,
+	robust: bool = False
+) -> ThrowTracker:
+	"""
+	Follows a file (or stdin) and prints the updated prediction after every
+	new throw, until cancelled (or stdin reaches EOF).
+
+	Args:
+		path (str): The file to follow ("-" for stdin).
+		out (TextIO | None): Where updates are printed (defaults to
+			sys.stdout).
+		interval (float): Seconds between checks for new data.
+		from_start (bool): Whether to use the throws already in the file.
+		reset_after (float | None): Start a new hunt when no throw has
+			arrived for this many seconds (None keeps every throw).
+		stdin: The text stream read for "-" (defaults to sys.stdin).
+		robust (bool): Whether to reject outlier throws (see ThrowTracker).
+
+	Returns:
+		ThrowTracker: The throws seen (once stdin reaches EOF).
+	"""
+	out = out or sys.stdout
+	if path == "-":
+		lines = _stdin_lines(stdin or sys.stdin)
+	else:
+		lines = follow(path, interval, from_start)
+
+	tracker = ThrowTracker(robust)
+	last_throw = time.monotonic()
+	async for line in lines:
+		throw = parse_throw(line)
+		if throw is None:
+			continue
+		if throw.dimension != "minecraft:overworld":
+			print(f"ignoring throw in {throw.dimension}", file=out)
+			continue
+
+		now = time.monotonic()
+		if reset_after is not None and len(tracker) \
+				and now - last_throw > reset_after:
+			tracker.reset()
+			print("starting a new stronghold", file=out)
+		if not tracker.add(throw):
+			continue
+		last_throw = now
+
+		print(
+			f"throw {len(tracker)}: (x={throw.x}, z={throw.z},",
+			f"angle={round(throw.theta, 2)})",
+			file=out
+		)
+		prediction = tracker.predict()
+		if prediction is None:
+			print("waiting for another (non-parallel) throw", file=out)
+		else:
+			print(_format(prediction), file=out)
+		out.flush()
+
+	return tracker